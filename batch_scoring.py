@@ -0,0 +1,214 @@
+"""
+Batch scoring of whole MongoDB collections or Parquet files.
+
+Input is streamed in chunks and scored across a process pool. Each worker
+loads the model and preprocessor once from the joblib file of the local
+model cache, so only the chunks travel between processes. Every worker
+holds its own copy of the trees (scikit-learn rebuilds each tree's node
+arrays when it is unpickled, so they cannot be shared through a memory
+map); budget one model's memory per worker when choosing ``--workers``. At most
+``max_in_flight`` chunks are queued at a time, which bounds memory no
+matter how large the input is. Results are written in input order to a
+Parquet file or appended to a MongoDB collection with unordered bulk
+inserts::
+
+    python batch_scoring.py --collection vehicle-insurance-data --batch-tag batch_2 \\
+        --output-parquet scores.parquet --workers 4
+"""
+
+import argparse
+import logging
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from constant import COLLECTION_NAME, FEATURE_COLUMNS
+from utils.db_utils import MongoDBClient, build_query
+from utils.model_cache import cached_model_file
+from utils.parallel import available_cores
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+ID_COLUMN = "id"
+
+# Set in each worker process by _init_worker.
+_model = None
+_preprocessor = None
+
+
+def _init_worker(model_file: str) -> None:
+    """Load the model and preprocessor once per worker process."""
+    global _model, _preprocessor
+    _model, _preprocessor = joblib.load(model_file)
+    # Parallelism comes from the process pool; keep each worker single-threaded.
+    if hasattr(_model, "n_jobs"):
+        _model.n_jobs = 1
+
+
+def _score_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Transform and score one chunk in a worker."""
+    features = getattr(_preprocessor, "feature_names_in_", FEATURE_COLUMNS)
+    X = _preprocessor.transform(chunk[list(features)])
+    proba = _model.predict_proba(X)
+
+    # Same labels as model.predict, without a second pass over the trees.
+    scores = pd.DataFrame({
+        "prediction": _model.classes_[np.argmax(proba, axis=1)],
+        "probability": proba[:, 1],
+    })
+    if ID_COLUMN in chunk.columns:
+        scores.insert(0, ID_COLUMN, chunk[ID_COLUMN].to_numpy())
+    return scores
+
+
+def iter_mongo_chunks(
+    collection_name: str,
+    batch_tag: Optional[str],
+    chunk_size: int,
+) -> Iterator[pd.DataFrame]:
+    """Stream a collection (optionally one batch) in chunks of ``chunk_size`` rows."""
+    yield from MongoDBClient().iter_dataframes(
+        collection_name,
+        build_query(batch_tag=batch_tag),
+        columns=[ID_COLUMN] + FEATURE_COLUMNS,
+        batch_size=chunk_size,
+    )
+
+
+def iter_parquet_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream a Parquet file in chunks of ``chunk_size`` rows."""
+    parquet_file = pq.ParquetFile(path)
+    columns = [c for c in [ID_COLUMN] + FEATURE_COLUMNS if c in parquet_file.schema_arrow.names]
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+        yield batch.to_pandas(self_destruct=True, split_blocks=True)
+
+
+class ParquetSink:
+    """Appends score chunks to one Parquet file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.writer = None
+
+    def write(self, scores: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(scores, preserve_index=False)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+class MongoSink:
+    """Appends score chunks to a MongoDB collection with unordered bulk inserts."""
+
+    def __init__(self, collection_name: str):
+        self.collection = MongoDBClient().database[collection_name]
+
+    def write(self, scores: pd.DataFrame) -> None:
+        if len(scores):
+            self.collection.insert_many(scores.to_dict("records"), ordered=False)
+
+    def close(self) -> None:
+        pass
+
+
+def score_chunks(
+    chunks: Iterator[pd.DataFrame],
+    model_file: str,
+    sink,
+    n_workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+) -> int:
+    """
+    Score ``chunks`` on ``n_workers`` processes and write them to ``sink``
+    in input order (default: every available core). Returns the number
+    of rows scored.
+    """
+    n_workers = n_workers or available_cores()
+    max_in_flight = max_in_flight or 2 * n_workers
+    pending = deque()
+    rows = 0
+    start = time.perf_counter()
+
+    def drain_one() -> None:
+        nonlocal rows
+        scores = pending.popleft().result()
+        sink.write(scores)
+        rows += len(scores)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Scored {rows:,} rows | {rows / elapsed:,.0f} rows/s")
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers, initializer=_init_worker, initargs=(model_file,)
+    ) as executor:
+        for chunk in chunks:
+            if len(pending) >= max_in_flight:
+                drain_one()
+            pending.append(executor.submit(_score_chunk, chunk))
+        while pending:
+            drain_one()
+
+    sink.close()
+    return rows
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Score a MongoDB collection or a Parquet file.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--collection", default=COLLECTION_NAME, help="MongoDB collection to score")
+    source.add_argument("--input-parquet", help="Parquet file to score instead of MongoDB")
+    parser.add_argument("--batch-tag", help="Score only this batch of the collection")
+
+    sink = parser.add_mutually_exclusive_group(required=True)
+    sink.add_argument("--output-parquet", help="Parquet file to write scores to")
+    sink.add_argument("--output-collection", help="MongoDB collection to append scores to")
+
+    parser.add_argument(
+        "--model-file",
+        help="joblib file with (model, preprocessor); default: current registry version via the local model cache",
+    )
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=available_cores())
+    parser.add_argument("--max-in-flight", type=int, help="Chunks queued at once (default 2 x workers)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    args = parse_args(argv)
+
+    if args.input_parquet:
+        chunks = iter_parquet_chunks(args.input_parquet, args.chunk_size)
+    else:
+        chunks = iter_mongo_chunks(args.collection, args.batch_tag, args.chunk_size)
+
+    if args.output_parquet:
+        sink = ParquetSink(args.output_parquet)
+    else:
+        sink = MongoSink(args.output_collection)
+
+    model_file = args.model_file
+    if model_file is None:
+        model_file, version_id = cached_model_file()
+        logger.info(f"Scoring with model version {version_id}")
+
+    start = time.perf_counter()
+    rows = score_chunks(chunks, model_file, sink, args.workers, args.max_in_flight)
+    elapsed = time.perf_counter() - start
+
+    print(f"Scored {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# Initializes the benchmarks package.
+"""Standalone performance benchmarks; run with ``python -m benchmarks.<name>``."""
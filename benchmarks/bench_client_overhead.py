@@ -0,0 +1,72 @@
+# Microbenchmark for per-call MongoDB client overhead.
+# Compares a fresh client per call with the shared, pooled client.
+
+"""Measures the fixed cost of one small ingestion call, before and after pooling.
+
+"before" reproduces the previous behaviour: a new ``pymongo.MongoClient`` per
+call plus two ``list_collection_names`` round trips. "after" goes through
+``get_data_as_dataframe``, which reuses the process-wide client and the
+cached collection names. Needs a reachable mongod (``MONGODB_URL``)::
+
+    python -m benchmarks.bench_client_overhead --calls 200
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import pandas as pd
+import pymongo
+
+from constant import DATABASE_NAME, MONGODB_URL_KEY
+from utils.db_utils import MongoDBClient, get_data_as_dataframe
+from benchmarks.synthetic import make_documents
+
+BENCH_COLLECTION = "bench_client_overhead"
+
+
+def fetch_with_new_client(collection_name: str) -> pd.DataFrame:
+    client = pymongo.MongoClient(os.getenv(MONGODB_URL_KEY, "mongodb://localhost:27017"))
+    try:
+        database = client[DATABASE_NAME]
+        if collection_name not in database.list_collection_names():
+            database.list_collection_names()
+        return pd.DataFrame(list(database[collection_name].find({}, {"_id": 0}).limit(10)))
+    finally:
+        client.close()
+
+
+def fetch_with_shared_client(collection_name: str) -> pd.DataFrame:
+    return get_data_as_dataframe(collection_name, limit=10, database_name=DATABASE_NAME)
+
+
+def time_calls(fn, calls: int) -> list:
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn(BENCH_COLLECTION)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    client = MongoDBClient(database_name=DATABASE_NAME)
+    client.database[BENCH_COLLECTION].drop()
+    client.database[BENCH_COLLECTION].insert_many(make_documents(100))
+
+    print(f"{'mode':>8} {'mean_ms':>9} {'p50_ms':>8} {'p99_ms':>8}")
+    for mode, fn in (("before", fetch_with_new_client), ("after", fetch_with_shared_client)):
+        timings = time_calls(fn, args.calls)
+        p99 = statistics.quantiles(timings, n=100)[98]
+        print(f"{mode:>8} {statistics.mean(timings):>9.2f} {statistics.median(timings):>8.2f} {p99:>8.2f}")
+
+    client.database[BENCH_COLLECTION].drop()
+
+
+if __name__ == "__main__":
+    main()
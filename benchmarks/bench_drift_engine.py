@@ -0,0 +1,75 @@
+# Benchmark for the vectorized drift engine.
+# Times histogram binning plus PSI/KS/JS for every feature at growing batch sizes.
+
+"""Shows that drift detection scales linearly with the incoming batch size.
+
+A reference profile is built once; incoming batches of each size are then
+binned on its layout and compared. Categorical columns use pandas
+categoricals so the largest batches fit in memory::
+
+    python -m benchmarks.bench_drift_engine --rows 1000000 10000000 50000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.drift_engine import compare_profiles, histograms, layout_from_profile
+from utils.profile_utils import build_profile
+
+CATEGORIES = {
+    "Gender": ["Male", "Female"],
+    "Vehicle_Age": ["< 1 Year", "1-2 Year", "> 2 Years"],
+    "Vehicle_Damage": ["Yes", "No"],
+}
+
+
+def make_batch(n_rows: int, seed: int, shift: float = 0.0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {
+        "Age": rng.integers(20, 85, size=n_rows).astype(np.float64) + shift,
+        "Annual_Premium": rng.gamma(4.0, 7_500.0, size=n_rows),
+        "Vintage": rng.integers(10, 300, size=n_rows).astype(np.float64),
+        "Region_Code": rng.integers(0, 53, size=n_rows).astype(np.float64),
+        "Policy_Sales_Channel": rng.integers(1, 164, size=n_rows).astype(np.float64),
+    }
+    for name, categories in CATEGORIES.items():
+        codes = rng.integers(0, len(categories), size=n_rows).astype(np.int8)
+        data[name] = pd.Categorical.from_codes(codes, categories=categories)
+    return pd.DataFrame(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--reference-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    reference = build_profile(make_batch(args.reference_rows, seed=0))
+    layout = layout_from_profile(reference)
+    print(f"Reference: {args.reference_rows:,} rows, {len(layout)} features")
+
+    print(f"{'rows':>12} {'bin_s':>8} {'metrics_ms':>11} {'Mrows/s':>9} {'ns/row':>7}")
+    for n_rows in args.rows:
+        batch = make_batch(n_rows, seed=1, shift=2.0)
+
+        start = time.perf_counter()
+        counts = histograms(batch, layout)
+        binned = time.perf_counter() - start
+
+        incoming = {"histograms": {bins.name: counts[i, :bins.n_bins].tolist() for i, bins in enumerate(layout)}}
+        start = time.perf_counter()
+        compare_profiles(reference, incoming)
+        metrics_ms = (time.perf_counter() - start) * 1000
+
+        print(
+            f"{n_rows:>12,} {binned:>8.2f} {metrics_ms:>11.2f} "
+            f"{n_rows / binned / 1e6:>9.1f} {binned / n_rows * 1e9:>7.0f}"
+        )
+        del batch
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# Peak memory benchmark for the ingestion dtype policy and float32 features.
+# Runs the training pipeline's data steps with and without utils.dtype_policy.
+
+"""Measures the peak RSS of each data step, before and after the dtype policy.
+
+``before`` is the previous behaviour: the frame as the reader builds it
+(int64/float64 numbers, string columns) and float64 ``fit_transform``
+output. ``after`` applies ``COLUMN_DTYPES`` at ingestion and produces
+float32 matrices with ``transform_to_float32``. Each configuration runs
+in a fresh process. On Linux the peak is reset before every step (via
+``/proc/self/clear_refs``), so each step's peak above its starting RSS is
+its own; elsewhere the peak is cumulative::
+
+    python -m benchmarks.bench_dtype_policy --rows 1000000 --trees 10
+"""
+
+import argparse
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from constant import TARGET_COLUMN
+from utils.dtype_policy import apply_dtype_policy, as_model_input, transform_to_float32
+from utils.main_utils import drop_id_column
+from benchmarks.synthetic import fit_preprocessor, make_dataframe
+
+CONFIGURATIONS = ("before", "after")
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def reset_peak() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def rss_mb() -> float:
+    return _status_kb("VmRSS") * 1024 / 1e6
+
+
+def peak_mb() -> float:
+    try:
+        return _status_kb("VmHWM") * 1024 / 1e6
+    except (OSError, KeyError):
+        # ru_maxrss is in KiB on Linux and bytes on macOS.
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+def run_configuration(configuration: str, rows: int, trees: int) -> list:
+    typed = configuration == "after"
+    table = pa.Table.from_pandas(make_dataframe(rows, seed=0, signal=True), preserve_index=False)
+    results = []
+
+    def measure(step, fn):
+        per_step = reset_peak()
+        start_mb = rss_mb()
+        start = time.perf_counter()
+        output = fn()
+        results.append({
+            "configuration": configuration,
+            "step": step,
+            "seconds": time.perf_counter() - start,
+            "peak_above_start_mb": peak_mb() - start_mb if per_step else float("nan"),
+            "output_mb": sum(_output_mb(part) for part in (output if isinstance(output, tuple) else (output,))),
+        })
+        return output
+
+    def ingest():
+        df = table.to_pandas()
+        return apply_dtype_policy(df) if typed else df
+
+    df = measure("ingest", ingest)
+    del table
+
+    def split():
+        X = df.drop(columns=[TARGET_COLUMN, "batch_tag"])
+        return tuple(train_test_split(drop_id_column(X), df[TARGET_COLUMN], test_size=0.2, random_state=42))
+
+    X_train, X_test, y_train, y_test = measure("split", split)
+    del df
+
+    def transform():
+        if typed:
+            preprocessor = fit_preprocessor(as_model_input(X_train))
+            return transform_to_float32(preprocessor, X_train), transform_to_float32(preprocessor, X_test)
+        preprocessor = fit_preprocessor(X_train)
+        return preprocessor.transform(X_train), preprocessor.transform(X_test)
+
+    X_train_arr, _ = measure("transform", transform)
+    del X_train, X_test
+
+    y = pd.to_numeric(y_train, downcast="unsigned").to_numpy() if typed else np.array(y_train)
+
+    def train():
+        RandomForestClassifier(n_estimators=trees, random_state=42).fit(X_train_arr, y)
+        return ()
+
+    measure("train", train)
+    return results
+
+
+def _output_mb(obj) -> float:
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes / 1e6
+    return float(np.sum(obj.memory_usage(deep=True))) / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--trees", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"rows={args.rows} trees={args.trees}")
+    print(f"{'config':>7} {'step':>10} {'seconds':>8} {'peak_MB':>8} {'output_MB':>9}")
+    for configuration in CONFIGURATIONS:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results = pool.submit(run_configuration, configuration, args.rows, args.trees).result()
+        for r in results:
+            print(f"{r['configuration']:>7} {r['step']:>10} {r['seconds']:>8.2f} "
+                  f"{r['peak_above_start_mb']:>8.0f} {r['output_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
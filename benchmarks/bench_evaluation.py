@@ -0,0 +1,86 @@
+# Cost benchmark for the single-pass evaluation engine.
+# Compares the metrics' cost with one forest inference pass.
+
+"""Times the old evaluation (``predict_proba`` + ``predict``) against one pass plus every metric.
+
+Trains a forest on synthetic rows, then on ``--test-rows`` rows reports:
+
+* ``predict_proba`` and ``predict`` (the old step ran both);
+* the threshold sweep, calibration table and ``--bootstrap`` resamples
+  from ``utils.evaluation_engine``, checked against sklearn's
+  ``roc_auc_score`` and ``average_precision_score``::
+
+    python -m benchmarks.bench_evaluation --trees 350 --test-rows 200000
+"""
+
+import argparse
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import average_precision_score, roc_auc_score
+
+from constant import FEATURE_COLUMNS, TARGET_COLUMN
+from utils.evaluation_engine import (
+    bootstrap_metrics,
+    calibration_bins,
+    confidence_intervals,
+    group_scores,
+    metrics_at,
+    threshold_sweep,
+)
+from benchmarks.synthetic import fit_preprocessor, make_dataframe
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trees", type=int, default=350)
+    parser.add_argument("--train-rows", type=int, default=50_000)
+    parser.add_argument("--test-rows", type=int, default=200_000)
+    parser.add_argument("--bootstrap", type=int, default=200)
+    args = parser.parse_args()
+
+    train = make_dataframe(args.train_rows, seed=0)
+    preprocessor = fit_preprocessor(train[FEATURE_COLUMNS])
+    model = RandomForestClassifier(n_estimators=args.trees, random_state=42, n_jobs=-1)
+    model.fit(preprocessor.transform(train[FEATURE_COLUMNS]), train[TARGET_COLUMN])
+
+    test = make_dataframe(args.test_rows, seed=1)
+    X = preprocessor.transform(test[FEATURE_COLUMNS])
+    y_true = test[TARGET_COLUMN].to_numpy() == 1
+
+    proba, proba_seconds = timed(lambda: model.predict_proba(X))
+    _, predict_seconds = timed(lambda: model.predict(X))
+    score = proba[:, 1]
+    y_pred = model.classes_[np.argmax(proba, axis=1)] == 1
+
+    groups, group_seconds = timed(lambda: group_scores(score))
+    sweep, sweep_seconds = timed(lambda: threshold_sweep(y_true, score, groups))
+    _, default_seconds = timed(lambda: metrics_at(y_true, y_pred))
+    _, calibration_seconds = timed(lambda: calibration_bins(y_true, score))
+    samples, bootstrap_seconds = timed(
+        lambda: bootstrap_metrics(y_true, score, y_pred, args.bootstrap, random_state=0, groups=groups)
+    )
+    metrics_seconds = group_seconds + sweep_seconds + default_seconds + calibration_seconds + bootstrap_seconds
+
+    print(f"rows={args.test_rows} trees={args.trees} distinct_scores={len(groups.starts)}")
+    print(f"{'predict_proba':>24} {proba_seconds:>8.3f}s")
+    print(f"{'predict (old 2nd pass)':>24} {predict_seconds:>8.3f}s")
+    print(f"{'sort + threshold sweep':>24} {group_seconds + sweep_seconds:>8.3f}s")
+    print(f"{'metrics at 0.5':>24} {default_seconds:>8.3f}s")
+    print(f"{'calibration bins':>24} {calibration_seconds:>8.3f}s")
+    print(f"{f'bootstrap x{args.bootstrap}':>24} {bootstrap_seconds:>8.3f}s")
+    print(f"{'all metrics':>24} {metrics_seconds:>8.3f}s ({metrics_seconds / proba_seconds:.0%} of one forest pass)")
+    print(f"roc_auc diff vs sklearn: {sweep['roc_auc'] - roc_auc_score(y_true, score):.2e}")
+    print(f"pr_auc diff vs sklearn:  {sweep['pr_auc'] - average_precision_score(y_true, score):.2e}")
+    print(f"CIs: {confidence_intervals(samples)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Latency benchmark for the compiled preprocessor.
+# Compares CompiledPreprocessor with the fitted sklearn preprocessor.
+
+"""Times ``preprocessor.transform`` against ``CompiledPreprocessor.transform``.
+
+For each batch size, sklearn gets a DataFrame (as in ``prediction_script``)
+while the compiled plan gets plain dicts and a NumPy record array. Every
+output is checked to be identical to sklearn's::
+
+    python -m benchmarks.bench_fast_preprocessor --batch-sizes 1 10 100 10000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from constant import FEATURE_COLUMNS
+from utils.fast_preprocessor import CompiledPreprocessor
+from benchmarks.synthetic import fit_preprocessor, make_dataframe
+
+
+def per_call_us(fn, min_seconds: float = 0.5) -> float:
+    """Mean wall time of ``fn()`` in microseconds over at least ``min_seconds``."""
+    calls, start = 0, time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1_000, 100_000])
+    args = parser.parse_args()
+
+    preprocessor = fit_preprocessor(make_dataframe(100_000, seed=0)[FEATURE_COLUMNS])
+    compiled = CompiledPreprocessor.from_sklearn(preprocessor)
+
+    print(
+        f"{'rows':>8} {'sklearn_us':>11} {'dicts_us':>10} {'records_us':>11} "
+        f"{'speedup_dicts':>14} {'speedup_records':>16} {'exact':>6}"
+    )
+    for batch_size in args.batch_sizes:
+        df = make_dataframe(batch_size, seed=1)[FEATURE_COLUMNS]
+        dicts = df.to_dict("records")
+        records = df.to_records(index=False)
+
+        expected = preprocessor.transform(pd.DataFrame.from_records(dicts, columns=FEATURE_COLUMNS))
+        exact = np.array_equal(expected, compiled.transform(dicts)) and np.array_equal(
+            expected, compiled.transform(records)
+        )
+
+        sklearn_us = per_call_us(
+            lambda: preprocessor.transform(pd.DataFrame.from_records(dicts, columns=FEATURE_COLUMNS))
+        )
+        dicts_us = per_call_us(lambda: compiled.transform(dicts))
+        records_us = per_call_us(lambda: compiled.transform(records))
+        print(
+            f"{batch_size:>8,} {sklearn_us:>11.1f} {dicts_us:>10.1f} {records_us:>11.1f} "
+            f"{sklearn_us / dicts_us:>13.1f}x {sklearn_us / records_us:>15.1f}x {str(exact):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Size, load-time and throughput benchmark for the flat forest engine.
+# Compares FlatForest with the fitted sklearn RandomForestClassifier.
+
+"""Compares a pickled ``RandomForestClassifier`` with its ``FlatForest``.
+
+Trains a forest on synthetic rows (``--trees``, default the trainer's 350),
+then reports:
+
+* artifact size: the joblib pickle vs. the directory of ``.npy`` files;
+* load time: ``joblib.load`` vs. ``FlatForest.load`` (memory-mapped and
+  fully read);
+* batch throughput of ``predict_proba`` at several batch sizes, with
+  every output checked to be identical to sklearn's::
+
+    python -m benchmarks.bench_forest_engine --trees 350 --batch-sizes 1 100 10000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from constant import FEATURE_COLUMNS, TARGET_COLUMN
+from utils.forest_engine import FlatForest
+from benchmarks.synthetic import fit_preprocessor, make_dataframe
+from benchmarks.bench_fast_preprocessor import per_call_us
+
+
+def directory_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def load_ms(fn, repeats: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trees", type=int, default=350)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    args = parser.parse_args()
+
+    df = make_dataframe(args.rows, seed=0)
+    preprocessor = fit_preprocessor(df[FEATURE_COLUMNS])
+    model = RandomForestClassifier(n_estimators=args.trees, random_state=42, n_jobs=-1)
+    model.fit(preprocessor.transform(df[FEATURE_COLUMNS]), df[TARGET_COLUMN])
+    model.n_jobs = None
+    forest = FlatForest.from_sklearn(model)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_file = os.path.join(tmp, "model.joblib")
+        forest_dir = os.path.join(tmp, "flat_forest")
+        joblib.dump(model, pickle_file)
+        forest.save(forest_dir)
+
+        print(f"trees={forest.n_estimators} nodes={forest.n_nodes}")
+        print(f"{'artifact':>16} {'MB':>8} {'load_ms':>9}")
+        print(f"{'joblib pickle':>16} {os.path.getsize(pickle_file) / 1e6:>8.1f} "
+              f"{load_ms(lambda: joblib.load(pickle_file)):>9.1f}")
+        flat_mb = directory_bytes(forest_dir) / 1e6
+        print(f"{'flat (mmap)':>16} {flat_mb:>8.1f} {load_ms(lambda: FlatForest.load(forest_dir)):>9.1f}")
+        print(f"{'flat (read)':>16} {flat_mb:>8.1f} "
+              f"{load_ms(lambda: FlatForest.load(forest_dir, mmap_mode=None)):>9.1f}")
+
+        mapped = FlatForest.load(forest_dir)
+        X_all = preprocessor.transform(make_dataframe(max(args.batch_sizes), seed=1)[FEATURE_COLUMNS])
+        print(f"\n{'batch':>7} {'sklearn_ms':>11} {'flat_ms':>9} {'speedup':>8} {'identical':>9}")
+        for batch_size in args.batch_sizes:
+            X = X_all[:batch_size]
+            identical = np.array_equal(model.predict_proba(X), mapped.predict_proba(X))
+            sklearn_ms = per_call_us(lambda: model.predict_proba(X)) / 1000
+            flat_ms = per_call_us(lambda: mapped.predict_proba(X)) / 1000
+            print(f"{batch_size:>7} {sklearn_ms:>11.2f} {flat_ms:>9.2f} {sklearn_ms / flat_ms:>7.2f}x {str(identical):>9}")
+
+
+if __name__ == "__main__":
+    main()
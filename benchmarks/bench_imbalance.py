@@ -0,0 +1,100 @@
+# Wall time, peak memory and quality benchmark for the imbalance strategies.
+# Runs each strategy of utils.imbalance in its own process.
+
+"""Compares the trainer's ``imbalance_strategy`` options end to end.
+
+Rows come from the synthetic generator with an informative ``Response``
+(``signal=True``). Every strategy runs in a fresh process, so its peak
+RSS is measured on its own. Each one resamples (or reweights), fits a
+forest and is scored on a held-out split with the metrics that
+``model_evaluation`` reports::
+
+    python -m benchmarks.bench_imbalance --rows 200000 --trees 100 --subsample-rows 50000
+"""
+
+import argparse
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from constant import FEATURE_COLUMNS, TARGET_COLUMN
+from utils.evaluation_engine import metrics_at, threshold_sweep
+from utils.imbalance import IMBALANCE_STRATEGIES, rebalance
+from benchmarks.synthetic import fit_preprocessor, make_dataframe
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+def run_strategy(strategy: str, rows: int, test_rows: int, trees: int, subsample_rows: int) -> dict:
+    train = make_dataframe(rows, seed=0, signal=True)
+    test = make_dataframe(test_rows, seed=1, signal=True)
+    preprocessor = fit_preprocessor(train[FEATURE_COLUMNS])
+    X_train = preprocessor.transform(train[FEATURE_COLUMNS])
+    y_train = train[TARGET_COLUMN].to_numpy()
+    X_test = preprocessor.transform(test[FEATURE_COLUMNS])
+    y_test = test[TARGET_COLUMN].to_numpy() == 1
+    del train, test
+    baseline_mb = peak_rss_mb()
+
+    start = time.perf_counter()
+    X_res, y_res, class_weight = rebalance(
+        X_train, y_train, strategy=strategy, random_state=42, subsample_rows=subsample_rows
+    )
+    resample_seconds = time.perf_counter() - start
+
+    model = RandomForestClassifier(n_estimators=trees, random_state=42, class_weight=class_weight)
+    start = time.perf_counter()
+    model.fit(X_res, y_res)
+    fit_seconds = time.perf_counter() - start
+
+    proba = model.predict_proba(X_test)
+    y_pred = model.classes_[np.argmax(proba, axis=1)] == 1
+    at_default = metrics_at(y_test, y_pred)
+    sweep = threshold_sweep(y_test, proba[:, 1])
+    return {
+        "strategy": strategy,
+        "train_rows": len(y_res),
+        "resample_s": resample_seconds,
+        "fit_s": fit_seconds,
+        "peak_mb": peak_rss_mb(),
+        "delta_mb": peak_rss_mb() - baseline_mb,
+        "roc_auc": sweep["roc_auc"],
+        "pr_auc": sweep["pr_auc"],
+        "recall": at_default["recall"],
+        "precision": at_default["precision"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--test-rows", type=int, default=50_000)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--subsample-rows", type=int, default=50_000)
+    parser.add_argument("--strategies", nargs="+", default=list(IMBALANCE_STRATEGIES), choices=IMBALANCE_STRATEGIES)
+    args = parser.parse_args()
+
+    print(f"rows={args.rows} test_rows={args.test_rows} trees={args.trees} subsample_rows={args.subsample_rows}")
+    print(f"{'strategy':>19} {'fit_rows':>9} {'resample_s':>10} {'fit_s':>7} {'peak_MB':>8} {'delta_MB':>8} "
+          f"{'roc_auc':>7} {'pr_auc':>7} {'recall':>7} {'precision':>9}")
+    for strategy in args.strategies:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            r = pool.submit(
+                run_strategy, strategy, args.rows, args.test_rows, args.trees, args.subsample_rows
+            ).result()
+        print(f"{r['strategy']:>19} {r['train_rows']:>9} {r['resample_s']:>10.2f} {r['fit_s']:>7.2f} "
+              f"{r['peak_mb']:>8.0f} {r['delta_mb']:>8.0f} {r['roc_auc']:>7.4f} {r['pr_auc']:>7.4f} "
+              f"{r['recall']:>7.4f} {r['precision']:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Wall-time benchmark for incremental retraining.
+# Compares refreshing the production forest with a full retrain on the same data.
+
+"""Times a full retrain against ``refresh_forest`` after a drifted batch arrives.
+
+A production model (preprocessor, SMOTEENN, ``--trees`` trees) is fitted
+on a synthetic reference batch. A drifted batch is then generated (older
+drivers, higher premiums), and both retraining paths are timed on the
+same data:
+
+* full: refit the preprocessor, SMOTEENN and every tree on reference +
+  drifted training rows (what ``run_training`` does);
+* incremental: transform the drifted rows plus a ``--reference-fraction``
+  sample of the reference with the production preprocessor, SMOTEENN
+  them and replace the oldest ``--new-trees`` trees.
+
+Both are scored on held-out drifted rows, next to the unchanged model::
+
+    python -m benchmarks.bench_incremental_retrain --reference-rows 200000 --drift-rows 20000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from constant import FEATURE_COLUMNS, TARGET_COLUMN
+from utils.evaluation_engine import threshold_sweep
+from utils.forest_update import refresh_forest
+from utils.imbalance import rebalance
+from benchmarks.synthetic import fit_preprocessor, make_dataframe
+
+
+def drifted_batch(n_rows: int, seed: int) -> pd.DataFrame:
+    df = make_dataframe(n_rows, seed=seed, batch_tag="batch_2_drifted", signal=True)
+    df["Age"] = np.minimum(df["Age"] + 12, 85)
+    df["Annual_Premium"] = np.round(df["Annual_Premium"] * 1.4, 0)
+    return df
+
+
+def full_retrain(train: pd.DataFrame, trees: int):
+    preprocessor = fit_preprocessor(train[FEATURE_COLUMNS])
+    X = preprocessor.transform(train[FEATURE_COLUMNS])
+    X_res, y_res, _ = rebalance(X, train[TARGET_COLUMN].to_numpy(), strategy="smoteenn", random_state=42, n_jobs=-1)
+    model = RandomForestClassifier(n_estimators=trees, random_state=42, n_jobs=-1).fit(X_res, y_res)
+    return model, preprocessor
+
+
+def roc_auc(model, preprocessor, test: pd.DataFrame) -> float:
+    score = model.predict_proba(preprocessor.transform(test[FEATURE_COLUMNS]))[:, 1]
+    return threshold_sweep(test[TARGET_COLUMN].to_numpy() == 1, score)["roc_auc"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reference-rows", type=int, default=200_000)
+    parser.add_argument("--drift-rows", type=int, default=20_000)
+    parser.add_argument("--trees", type=int, default=350)
+    parser.add_argument("--new-trees", type=int, default=50)
+    parser.add_argument("--reference-fraction", type=float, default=0.1)
+    args = parser.parse_args()
+
+    reference = make_dataframe(args.reference_rows, seed=0, signal=True)
+    drift_train, drift_test = train_test_split(drifted_batch(args.drift_rows, seed=5), test_size=0.2, random_state=42)
+    production, preprocessor = full_retrain(reference, args.trees)
+
+    start = time.perf_counter()
+    full_model, full_preprocessor = full_retrain(pd.concat([reference, drift_train], ignore_index=True), args.trees)
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sample = reference.sample(frac=args.reference_fraction, random_state=0)
+    new_rows = pd.concat([drift_train, sample], ignore_index=True)
+    X_new = preprocessor.transform(new_rows[FEATURE_COLUMNS])
+    X_res, y_res, _ = rebalance(X_new, new_rows[TARGET_COLUMN].to_numpy(), strategy="smoteenn", random_state=7, n_jobs=-1)
+    refreshed, report = refresh_forest(production, X_res, y_res, n_new_trees=args.new_trees, random_state=7, n_jobs=-1)
+    incremental_seconds = time.perf_counter() - start
+
+    print(f"reference_rows={args.reference_rows} drift_train_rows={len(drift_train)} trees={args.trees} "
+          f"new_trees={args.new_trees} reference_fraction={args.reference_fraction}")
+    print(f"{'model':>12} {'wall_s':>8} {'drift_roc_auc':>13} {'reference_roc_auc':>17}")
+    reference_test = make_dataframe(20_000, seed=9, signal=True)
+    for name, model, prep, seconds in (
+        ("unchanged", production, preprocessor, None),
+        ("full", full_model, full_preprocessor, full_seconds),
+        ("incremental", refreshed, preprocessor, incremental_seconds),
+    ):
+        wall = "-" if seconds is None else f"{seconds:.1f}"
+        print(f"{name:>12} {wall:>8} {roc_auc(model, prep, drift_test):>13.4f} "
+              f"{roc_auc(model, prep, reference_test):>17.4f}")
+    print(f"speedup: {full_seconds / incremental_seconds:.1f}x | {report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Load generator for the micro-batching inference server.
+# Compares per-request scoring with dynamic micro-batching.
+
+"""Drives ``inference_server.py`` with concurrent keep-alive clients.
+
+Trains a RandomForest on synthetic rows (or uses ``--model-file``), then
+starts the server twice in a subprocess: once with ``--max-batch-size 1``
+(every request scored on its own) and once with micro-batching. Each run
+sends ``--requests`` single-row predictions from ``--concurrency``
+clients and reports client-side throughput and latency, plus the mean
+batch size from the server's ``/metrics``::
+
+    python -m benchmarks.bench_inference_server --concurrency 64 --requests 5000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from constant import FEATURE_COLUMNS, TARGET_COLUMN
+from benchmarks.synthetic import fit_preprocessor, make_dataframe
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def train_model(path: str, n_estimators: int) -> None:
+    """Fit the training pipeline's preprocessor and a forest on synthetic rows."""
+    df = make_dataframe(50_000, seed=0)
+    preprocessor = fit_preprocessor(df[FEATURE_COLUMNS])
+    X = preprocessor.transform(df[FEATURE_COLUMNS])
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=42, n_jobs=-1)
+    model.fit(X, df[TARGET_COLUMN])
+    model.n_jobs = None
+    joblib.dump((model, preprocessor), path)
+
+
+async def http(reader, writer, method: str, path: str, body: bytes = b"") -> dict:
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return json.loads(await reader.readexactly(length))
+
+
+async def run_load(port: int, rows: list, n_requests: int, concurrency: int) -> dict:
+    latencies = []
+    counter = iter(range(n_requests))
+
+    async def client():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for i in counter:
+            body = json.dumps(rows[i % len(rows)]).encode()
+            start = time.perf_counter()
+            await http(reader, writer, "POST", "/predict", body)
+            latencies.append(time.perf_counter() - start)
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    metrics = await http(reader, writer, "GET", "/metrics")
+    writer.close()
+
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "rps": n_requests / elapsed,
+        "p50": float(np.percentile(latencies_ms, 50)),
+        "p99": float(np.percentile(latencies_ms, 99)),
+        "batch": metrics["mean_batch_size"],
+    }
+
+
+async def wait_ready(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await http(reader, writer, "GET", "/health")
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-file", help="joblib (model, preprocessor); default: synthetic forest")
+    parser.add_argument("--trees", type=int, default=350)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    rows = [
+        {key: (value.item() if hasattr(value, "item") else value) for key, value in row.items()}
+        for row in make_dataframe(1_000, seed=7)[FEATURE_COLUMNS].to_dict("records")
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_file = args.model_file
+        if model_file is None:
+            model_file = os.path.join(tmp, "model.joblib")
+            train_model(model_file, args.trees)
+
+        print(f"{'mode':>12} {'max_batch':>9} {'req/s':>9} {'p50_ms':>8} {'p99_ms':>8} {'mean_batch':>10}")
+        for mode, max_batch_size in (("per_request", 1), ("micro_batch", args.max_batch_size)):
+            server = subprocess.Popen(
+                [sys.executable, "inference_server.py", "--model-file", model_file,
+                 "--port", str(args.port), "--max-batch-size", str(max_batch_size),
+                 "--max-wait-ms", str(args.max_wait_ms)],
+                cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                asyncio.run(wait_ready(args.port))
+                result = asyncio.run(run_load(args.port, rows, args.requests, args.concurrency))
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f"{mode:>12} {max_batch_size:>9} {result['rps']:>9.0f} {result['p50']:>8.1f} "
+                f"{result['p99']:>8.1f} {result['batch']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# Save/load benchmark for the memory-mapping materializers.
+# Compares them with ZenML's default NumPy and pandas materializers.
+
+"""Times artifact save and load and reports artifact sizes per materializer.
+
+The artifacts are the ones the training pipeline passes between steps:
+the typed raw DataFrame, the float32 ``X_train_transformed`` matrix and
+the label Series. Artifacts are written under the active stack's artifact
+store, and ``save`` includes ``extract_metadata`` as in a real step. Every
+load runs in a fresh process, which reports the load time, the private
+(anonymous) memory added by loading and the time of one full pass over
+the data (``sum``). Mapped file pages are not private: they live in the
+page cache, shared by every process mapping the artifact. With memory
+mapping the pass is where the pages are read::
+
+    python -m benchmarks.bench_materializers --rows 1000000
+"""
+
+import argparse
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+from zenml.client import Client
+from zenml.materializers.numpy_materializer import NumpyMaterializer
+from zenml.materializers.pandas_materializer import PandasMaterializer
+
+from constant import TARGET_COLUMN
+from materializers import ArrowDataFrameMaterializer, MmapNumpyMaterializer
+from utils.dtype_policy import apply_dtype_policy
+from benchmarks.synthetic import fit_preprocessor, make_dataframe
+
+MATERIALIZERS = {
+    "numpy": (NumpyMaterializer, MmapNumpyMaterializer),
+    "pandas": (PandasMaterializer, ArrowDataFrameMaterializer),
+}
+
+
+def private_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) * 1024 / 1e6
+    return float("nan")
+
+
+def directory_mb(path: str) -> float:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names) / 1e6
+
+
+def full_pass(data) -> float:
+    if isinstance(data, np.ndarray):
+        return float(data.sum())
+    if isinstance(data, pd.Series):
+        return float(pd.to_numeric(data).sum())
+    return float(sum(data[column].cat.codes.sum() if isinstance(data[column].dtype, pd.CategoricalDtype)
+                     else pd.to_numeric(data[column], errors="coerce").sum() for column in data.columns))
+
+
+def load_in_fresh_process(materializer_class, uri: str, data_type) -> dict:
+    start_mb = private_mb()
+    start = time.perf_counter()
+    data = materializer_class(uri).load(data_type)
+    load_seconds = time.perf_counter() - start
+    loaded_mb = private_mb() - start_mb
+    start = time.perf_counter()
+    full_pass(data)
+    return {"load_s": load_seconds, "load_private_mb": loaded_mb, "pass_s": time.perf_counter() - start,
+            "pass_private_mb": private_mb() - start_mb}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    raw = apply_dtype_policy(make_dataframe(args.rows, seed=0))
+    features = raw.drop(columns=[TARGET_COLUMN, "id", "batch_tag"])
+    artifacts = {
+        "raw_data": ("pandas", raw),
+        "X_train_transformed": ("numpy", fit_preprocessor(features).transform(features).astype(np.float32)),
+        "y_train": ("pandas", raw[TARGET_COLUMN]),
+    }
+
+    root = os.path.join(Client().active_stack.artifact_store.path, f"bench-materializers-{uuid.uuid4().hex[:8]}")
+    print(f"rows={args.rows} artifact store={root}")
+    print(f"{'artifact':>20} {'materializer':>27} {'save_s':>7} {'size_MB':>8} {'load_s':>7} "
+          f"{'load_private_MB':>15} {'pass_s':>7} {'pass_private_MB':>15}")
+    try:
+        for name, (kind, data) in artifacts.items():
+            for materializer_class in MATERIALIZERS[kind]:
+                uri = os.path.join(root, name, materializer_class.__name__)
+                os.makedirs(uri)
+                materializer = materializer_class(uri)
+                start = time.perf_counter()
+                materializer.save(data)
+                materializer.extract_metadata(data)
+                save_seconds = time.perf_counter() - start
+
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                    r = pool.submit(load_in_fresh_process, materializer_class, uri, type(data)).result()
+                print(f"{name:>20} {materializer_class.__name__:>27} {save_seconds:>7.2f} {directory_mb(uri):>8.1f} "
+                      f"{r['load_s']:>7.3f} {r['load_private_mb']:>15.1f} {r['pass_s']:>7.3f} {r['pass_private_mb']:>15.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# Scaling benchmark for out-of-core training.
+# Compares peak memory of in-memory and out-of-core training as rows grow.
+
+"""Measures peak RSS, wall time and ROC-AUC of in-memory and out-of-core
+training at growing row counts.
+
+The rows come from a chunk generator standing in for the MongoDB cursor:
+chunk ``i`` is ``make_dataframe(chunk_rows, seed=i, signal=True)`` with
+ids offset to stay unique, typed with ``apply_dtype_policy``.
+
+* ``in_memory`` is the training pipeline: all chunks concatenated,
+  ``train_test_split``, preprocessor fitted and applied to every row,
+  undersampling, one forest.
+* ``out_of_core`` is ``utils.out_of_core.train_out_of_core`` reading the
+  generator twice, with the same undersampling and total tree count.
+
+Each run is a fresh process, and the peak is the process's peak RSS above
+its RSS before the first chunk (VmHWM, reset through ``/proc/self/clear_refs``
+where available). ROC-AUC is computed on each mode's own test rows::
+
+    python -m benchmarks.bench_out_of_core --rows 250000 500000 1000000 2000000
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from constant import TARGET_COLUMN
+from utils.dtype_policy import apply_dtype_policy, as_model_input, transform_to_float32
+from utils.imbalance import rebalance
+from utils.out_of_core import train_out_of_core
+from benchmarks.bench_dtype_policy import peak_mb, reset_peak, rss_mb
+from benchmarks.synthetic import make_dataframe, make_preprocessor
+
+MODES = ("in_memory", "out_of_core")
+
+
+def chunk_source(rows: int, chunk_rows: int):
+    def chunks():
+        for i, start in enumerate(range(0, rows, chunk_rows)):
+            chunk = make_dataframe(min(chunk_rows, rows - start), seed=i, signal=True)
+            chunk["id"] += start
+            yield apply_dtype_policy(chunk)
+    return chunks
+
+
+def run_mode(mode: str, rows: int, chunk_rows: int, rows_per_subforest: int, trees: int) -> dict:
+    chunks = chunk_source(rows, chunk_rows)
+    reset_peak()
+    start_mb = rss_mb()
+    start = time.perf_counter()
+
+    if mode == "in_memory":
+        df = pd.concat(list(chunks()), ignore_index=True)
+        X = df.drop(columns=[TARGET_COLUMN, "id", "batch_tag"])
+        y = pd.to_numeric(df[TARGET_COLUMN], downcast="unsigned").to_numpy()
+        del df
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        del X
+        preprocessor = make_preprocessor().fit(as_model_input(X_train))
+        X_train = transform_to_float32(preprocessor, X_train)
+        X_test = transform_to_float32(preprocessor, X_test)
+        X_res, y_res, _ = rebalance(X_train, y_train, strategy="undersample", random_state=42)
+        del X_train
+        model = RandomForestClassifier(n_estimators=trees, random_state=42).fit(X_res, y_res)
+        del X_res, y_res
+    else:
+        model, _, _, X_test, y_test, _ = train_out_of_core(
+            make_preprocessor(),
+            chunks,
+            target_column=TARGET_COLUMN,
+            n_estimators=trees,
+            rows_per_subforest=rows_per_subforest,
+            split_seed=42,
+            imbalance_params={"strategy": "undersample"},
+        )
+
+    seconds = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "rows": rows,
+        "seconds": seconds,
+        "peak_above_start_mb": peak_mb() - start_mb,
+        "trees": model.n_estimators,
+        "roc_auc": roc_auc_score(y_test, model.predict_proba(X_test)[:, 1]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[250_000, 500_000, 1_000_000, 2_000_000])
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--rows-per-subforest", type=int, default=200_000)
+    parser.add_argument("--trees", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"chunk_rows={args.chunk_rows} rows_per_subforest={args.rows_per_subforest} trees={args.trees}")
+    print(f"{'rows':>9} {'mode':>12} {'seconds':>8} {'peak_MB':>8} {'trees':>6} {'roc_auc':>8}")
+    for rows in args.rows:
+        for mode in MODES:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                r = pool.submit(run_mode, mode, rows, args.chunk_rows, args.rows_per_subforest, args.trees).result()
+            print(f"{r['rows']:>9} {r['mode']:>12} {r['seconds']:>8.1f} {r['peak_above_start_mb']:>8.0f} "
+                  f"{r['trees']:>6} {r['roc_auc']:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Benchmark for parallel, range-partitioned MongoDB ingestion.
+# Seeds a scratch collection on a local mongod and times reads per worker count.
+
+"""Measures how MongoDBClient.fetch_as_dataframe scales with n_workers.
+
+Run against a local mongod (``MONGODB_URL``, default ``mongodb://localhost:27017``)::
+
+    python -m benchmarks.bench_parallel_ingestion --rows 1000000 --workers 1 2 4 8
+"""
+
+import argparse
+import time
+
+from utils.db_utils import MongoDBClient
+from benchmarks.synthetic import make_documents
+
+BENCH_COLLECTION = "bench_parallel_ingestion"
+
+
+def seed_collection(client: MongoDBClient, n_rows: int, chunk: int = 100_000) -> None:
+    collection = client.database[BENCH_COLLECTION]
+    collection.drop()
+    for start in range(0, n_rows, chunk):
+        docs = make_documents(min(chunk, n_rows - start), seed=start)
+        for offset, doc in enumerate(docs):
+            doc["id"] = start + offset + 1
+        collection.insert_many(docs, ordered=False)
+    collection.create_index("id")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded collection")
+    args = parser.parse_args()
+
+    client = MongoDBClient()
+    print(f"Seeding {args.rows:,} documents into '{BENCH_COLLECTION}'...")
+    seed_collection(client, args.rows)
+
+    baseline = None
+    print(f"{'workers':>8} {'best_s':>8} {'rows/s':>12} {'speedup':>8}")
+    for n_workers in args.workers:
+        timings = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            df = client.fetch_as_dataframe(
+                BENCH_COLLECTION,
+                batch_size=args.batch_size,
+                n_workers=n_workers,
+                partition_key="id",
+            )
+            timings.append(time.perf_counter() - start)
+            assert len(df) == args.rows, f"expected {args.rows} rows, got {len(df)}"
+
+        best = min(timings)
+        baseline = baseline or best
+        print(f"{n_workers:>8} {best:>8.2f} {args.rows / best:>12,.0f} {baseline / best:>7.2f}x")
+
+    if not args.keep:
+        client.database[BENCH_COLLECTION].drop()
+
+
+if __name__ == "__main__":
+    main()
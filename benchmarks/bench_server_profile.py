@@ -0,0 +1,158 @@
+# Benchmark and check for server-side profiling against a local mongod.
+# Compares the aggregation-pushdown profile with the in-memory pandas profile.
+
+"""Checks ``profile_collection_server_side`` against ``build_profile`` and
+measures bytes received from the server and wall time for both paths.
+
+Seeds a reference batch and an incoming batch into a scratch collection,
+then for each mode reports:
+
+* bytes received (sum of BSON reply sizes seen by a command listener);
+* wall time;
+* whether the reference-layout histograms and category frequencies match
+  the in-memory profile exactly (they must);
+* relative mean/variance error and the maximum quantile rank error.
+
+``$percentile`` needs MongoDB 7.0+; on older servers that mode is skipped
+and only the ``$bucketAuto`` fallback runs. Needs a reachable mongod
+(``MONGODB_URL``)::
+
+    python -m benchmarks.bench_server_profile --rows 100000 1000000
+"""
+
+import argparse
+import time
+
+import bson
+import numpy as np
+import pymongo
+from pymongo import monitoring
+
+from constant import DATABASE_NAME
+from utils.db_utils import MongoDBClient, build_query, get_data_as_dataframe
+from utils.drift_engine import compare_profiles
+from utils.profile_utils import (
+    CATEGORICAL_FEATURES,
+    NUMERIC_FEATURES,
+    QUANTILE_LEVELS,
+    build_profile,
+)
+from utils.server_profile import profile_collection_server_side
+from benchmarks.synthetic import make_dataframe
+
+BENCH_COLLECTION = "bench_server_profile"
+INSERT_CHUNK = 50_000
+
+
+class ReplyBytes(monitoring.CommandListener):
+    """Counts the BSON size of every server reply."""
+
+    def __init__(self):
+        self.total = 0
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.total += len(bson.encode(event.reply))
+
+    def failed(self, event):
+        pass
+
+
+def seed(collection, n_rows: int, batch_tag: str, seed_offset: int) -> None:
+    for i, start in enumerate(range(0, n_rows, INSERT_CHUNK)):
+        chunk = make_dataframe(min(INSERT_CHUNK, n_rows - start), seed=seed_offset + i, batch_tag=batch_tag)
+        chunk["id"] += start
+        collection.insert_many(chunk.to_dict("records"), ordered=False)
+
+
+def max_rank_error(values: np.ndarray, quantiles: np.ndarray) -> float:
+    values = np.sort(values)
+    low = np.searchsorted(values, quantiles, side="left") / len(values)
+    high = np.searchsorted(values, quantiles, side="right") / len(values)
+    return float(np.maximum(0.0, np.maximum(low - QUANTILE_LEVELS, QUANTILE_LEVELS - high)).max())
+
+
+def measure(listener: ReplyBytes, fn):
+    listener.total = 0
+    start = time.perf_counter()
+    result = fn()
+    return result, listener.total, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--reference-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Registered before the shared client is created, so it sees every reply.
+    listener = ReplyBytes()
+    monitoring.register(listener)
+
+    client = MongoDBClient(database_name=DATABASE_NAME)
+    collection = client.database[BENCH_COLLECTION]
+    features = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+    print(
+        f"{'rows':>10} {'mode':>11} {'recv_MB':>9} {'seconds':>8} {'hist_eq':>8} "
+        f"{'freq_eq':>8} {'mean_rel':>9} {'var_rel':>9} {'rank_err':>9} {'max_dpsi':>9}"
+    )
+    for n_rows in args.rows:
+        collection.drop()
+        seed(collection, args.reference_rows, "train", seed_offset=0)
+        seed(collection, n_rows, "incoming", seed_offset=10_000)
+        collection.create_index("batch_tag")
+
+        reference = build_profile(
+            get_data_as_dataframe(BENCH_COLLECTION, build_query("train"), columns=features)
+        )
+        query = build_query("incoming")
+
+        def in_memory():
+            df = get_data_as_dataframe(BENCH_COLLECTION, query, columns=features)
+            return build_profile(df, reference=reference), df
+
+        (exact, df), exact_bytes, exact_seconds = measure(listener, in_memory)
+        exact_drift = compare_profiles(reference, exact)
+        print(
+            f"{n_rows:>10,} {'in_memory':>11} {exact_bytes / 1e6:>9.2f} {exact_seconds:>8.2f} "
+            f"{'-':>8} {'-':>8} {'-':>9} {'-':>9} {'-':>9} {'-':>9}"
+        )
+
+        for mode, use_percentile in (("percentile", True), ("bucketAuto", False)):
+            try:
+                profile, received, seconds = measure(
+                    listener,
+                    lambda: profile_collection_server_side(
+                        BENCH_COLLECTION, query, NUMERIC_FEATURES, CATEGORICAL_FEATURES,
+                        reference=reference, use_percentile=use_percentile,
+                    ),
+                )
+            except pymongo.errors.OperationFailure as exc:
+                print(f"{n_rows:>10,} {mode:>11} skipped ({exc.code})")
+                continue
+
+            mean_rel = var_rel = rank_err = 0.0
+            for feature in NUMERIC_FEATURES:
+                values = df[feature].to_numpy(dtype=np.float64)
+                stats, truth = profile["numeric"][feature], exact["numeric"][feature]
+                mean_rel = max(mean_rel, abs(stats["mean"] - truth["mean"]) / abs(truth["mean"]))
+                var_rel = max(var_rel, abs(stats["var"] - truth["var"]) / truth["var"])
+                rank_err = max(rank_err, max_rank_error(values, np.asarray(stats["quantiles"])))
+
+            drift = compare_profiles(reference, profile)
+            max_dpsi = max(abs(drift[name]["psi"] - exact_drift[name]["psi"]) for name in drift)
+            print(
+                f"{n_rows:>10,} {mode:>11} {received / 1e6:>9.4f} {seconds:>8.2f} "
+                f"{str(profile['histograms'] == exact['histograms']):>8} "
+                f"{str(profile['categorical'] == exact['categorical']):>8} "
+                f"{mean_rel:>9.1e} {var_rel:>9.1e} {rank_err:>9.4f} {max_dpsi:>9.1e}"
+            )
+
+    collection.drop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Benchmark for the streaming, sketch-based profiler.
+# Compares accuracy and memory against the exact in-memory pandas profile.
+
+"""Measures StreamingProfiler error and peak memory against exact pandas results.
+
+For each size, the data is fed in chunks to several partial profilers that
+are merged (as parallel workers would), then compared with the exact mean,
+variance and quantiles computed by pandas on the full column::
+
+    python -m benchmarks.bench_streaming_profile --rows 100000 1000000 5000000
+"""
+
+import argparse
+import tracemalloc
+
+import numpy as np
+
+from utils.profile_utils import NUMERIC_FEATURES, QUANTILE_LEVELS
+from utils.streaming_profile import StreamingProfiler
+from benchmarks.synthetic import make_dataframe
+
+
+def streamed_profile(n_rows: int, chunk_size: int, n_workers: int, sketch_k: int):
+    """Profile ``n_rows`` synthetic rows chunk by chunk; return profile and peak bytes."""
+    tracemalloc.start()
+    partials = [
+        StreamingProfiler(NUMERIC_FEATURES, [], sketch_k=sketch_k, seed=worker)
+        for worker in range(n_workers)
+    ]
+    for i, start in enumerate(range(0, n_rows, chunk_size)):
+        chunk = make_dataframe(min(chunk_size, n_rows - start), seed=i)
+        partials[i % n_workers].update(chunk)
+        del chunk
+    profiler = partials[0]
+    for partial in partials[1:]:
+        profiler.merge(partial)
+    profile = profiler.to_profile()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return profile, peak
+
+
+def exact_columns(n_rows: int, chunk_size: int) -> dict:
+    """Regenerate the same rows in full for the exact pandas reference."""
+    columns = {feature: [] for feature in NUMERIC_FEATURES}
+    for i, start in enumerate(range(0, n_rows, chunk_size)):
+        chunk = make_dataframe(min(chunk_size, n_rows - start), seed=i)
+        for feature in NUMERIC_FEATURES:
+            columns[feature].append(chunk[feature].to_numpy(dtype=np.float64))
+    return {feature: np.concatenate(parts) for feature, parts in columns.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sketch-k", type=int, default=200)
+    args = parser.parse_args()
+
+    print(
+        f"{'rows':>10} {'feature':>15} {'mean_rel_err':>13} {'var_rel_err':>12} "
+        f"{'max_rank_err':>13} {'iqr_rel_err':>12} {'peak_MB':>8}"
+    )
+    for n_rows in args.rows:
+        profile, peak = streamed_profile(n_rows, args.chunk_size, args.workers, args.sketch_k)
+        exact = exact_columns(n_rows, args.chunk_size)
+
+        for feature in NUMERIC_FEATURES:
+            values = np.sort(exact[feature])
+            approx = profile["numeric"][feature]
+            quantiles = np.asarray(approx["quantiles"])
+
+            # Rank error: where each approximate quantile falls in the exact data.
+            low = np.searchsorted(values, quantiles, side="left") / len(values)
+            high = np.searchsorted(values, quantiles, side="right") / len(values)
+            rank_error = np.maximum(0.0, np.maximum(low - QUANTILE_LEVELS, QUANTILE_LEVELS - high)).max()
+
+            exact_iqr = np.quantile(values, 0.75) - np.quantile(values, 0.25)
+            approx_iqr = quantiles[75] - quantiles[25]
+
+            print(
+                f"{n_rows:>10,} {feature:>15} "
+                f"{abs(approx['mean'] - values.mean()) / abs(values.mean()):>13.2e} "
+                f"{abs(approx['var'] - values.var(ddof=1)) / values.var(ddof=1):>12.2e} "
+                f"{rank_error:>13.4f} "
+                f"{abs(approx_iqr - exact_iqr) / exact_iqr:>12.4f} "
+                f"{peak / 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Scaling benchmark for the trainer's parallelism controls.
+# Times SMOTEENN resampling and the forest fit at several n_jobs values.
+
+"""Times the two training phases of ``model_trainer`` for each ``--n-jobs`` value.
+
+Resampling uses the trainer's explicit SMOTE/ENN construction (neighbour
+searches on ``n_jobs`` threads) and checks that its output is identical
+for every ``n_jobs``; the forest is then fitted on the resampled rows::
+
+    python -m benchmarks.bench_training_parallel --rows 200000 --n-jobs 1 4 16 -1
+"""
+
+import argparse
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from threadpoolctl import threadpool_limits
+
+from constant import FEATURE_COLUMNS, TARGET_COLUMN
+from utils.imbalance import build_smoteenn
+from utils.parallel import available_cores, blas_threads_per_job, resolve_n_jobs
+from benchmarks.synthetic import fit_preprocessor, make_dataframe
+
+
+def resample(X, y, n_jobs: int):
+    smt = build_smoteenn("minority", random_state=42, n_jobs=n_jobs)
+    with threadpool_limits(limits=blas_threads_per_job(n_jobs), user_api="blas"):
+        return smt.fit_resample(X, y)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--trees", type=int, default=350)
+    parser.add_argument("--n-jobs", type=int, nargs="+", default=[1, -1])
+    args = parser.parse_args()
+
+    df = make_dataframe(args.rows, seed=0)
+    X = fit_preprocessor(df[FEATURE_COLUMNS]).transform(df[FEATURE_COLUMNS])
+    y = df[TARGET_COLUMN].to_numpy()
+
+    print(f"available_cores={available_cores()} rows={args.rows} trees={args.trees}")
+    print(f"{'n_jobs':>7} {'resample_s':>11} {'fit_s':>8} {'total_s':>8} {'identical':>9}")
+    reference = None
+    for requested in args.n_jobs:
+        n_jobs = resolve_n_jobs(requested)
+        start = time.perf_counter()
+        X_res, y_res = resample(X, y, n_jobs)
+        resample_seconds = time.perf_counter() - start
+        if reference is None:
+            reference = (X_res, y_res)
+        identical = np.array_equal(reference[0], X_res) and np.array_equal(reference[1], y_res)
+
+        model = RandomForestClassifier(n_estimators=args.trees, random_state=42, n_jobs=n_jobs)
+        start = time.perf_counter()
+        with threadpool_limits(limits=blas_threads_per_job(n_jobs), user_api="blas"):
+            model.fit(X_res, y_res)
+        fit_seconds = time.perf_counter() - start
+        print(f"{n_jobs:>7} {resample_seconds:>11.2f} {fit_seconds:>8.2f} "
+              f"{resample_seconds + fit_seconds:>8.2f} {str(identical):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Synthetic data generator shared by the benchmarks.
+# Produces rows with the same schema as the vehicle-insurance collection.
+
+"""Generates vehicle-insurance shaped rows as a DataFrame or Mongo documents,
+and fits the training pipeline's preprocessor on them."""
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder, StandardScaler
+
+
+def make_dataframe(n_rows: int, seed: int = 0, batch_tag: str = "train", signal: bool = False) -> pd.DataFrame:
+    """
+    Build ``n_rows`` synthetic rows following the collection schema.
+
+    ``Response`` is independent noise unless ``signal`` is set, in which
+    case it follows a logistic model of the features (about 12% positive,
+    like the real data), so model quality can be compared.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "id": np.arange(1, n_rows + 1, dtype=np.int64),
+        "Gender": rng.choice(["Male", "Female"], size=n_rows),
+        "Age": rng.integers(20, 85, size=n_rows),
+        "Driving_License": rng.choice([0, 1], size=n_rows, p=[0.01, 0.99]),
+        "Region_Code": rng.integers(0, 53, size=n_rows).astype(float),
+        "Previously_Insured": rng.choice([0, 1], size=n_rows),
+        "Vehicle_Age": rng.choice(["< 1 Year", "1-2 Year", "> 2 Years"], size=n_rows, p=[0.43, 0.53, 0.04]),
+        "Vehicle_Damage": rng.choice(["Yes", "No"], size=n_rows),
+        "Annual_Premium": np.round(rng.gamma(4.0, 7_500.0, size=n_rows), 0),
+        "Policy_Sales_Channel": rng.integers(1, 164, size=n_rows).astype(float),
+        "Vintage": rng.integers(10, 300, size=n_rows),
+        "Response": rng.choice([0, 1], size=n_rows, p=[0.88, 0.12]),
+    })
+    if signal:
+        logit = (
+            -3.0
+            - 2.5 * df["Previously_Insured"]
+            + 2.0 * (df["Vehicle_Damage"] == "Yes")
+            + 0.6 * df["Age"].between(30, 55)
+            + 0.4 * (df["Vehicle_Age"] != "< 1 Year")
+            + 0.000008 * (df["Annual_Premium"] - 30_000)
+        )
+        df["Response"] = (rng.random(n_rows) < 1.0 / (1.0 + np.exp(-logit))).astype(np.int64)
+    df["batch_tag"] = batch_tag
+    return df
+
+
+def make_documents(n_rows: int, seed: int = 0, batch_tag: str = "train") -> list:
+    """Same rows as ``make_dataframe``, as a list of MongoDB documents."""
+    return make_dataframe(n_rows, seed=seed, batch_tag=batch_tag).to_dict("records")
+
+
+def make_preprocessor() -> Pipeline:
+    """The same (unfitted) preprocessor layout as ``data_transformation``."""
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("StandardScaler", StandardScaler(), ["Age", "Annual_Premium", "Vintage"]),
+            ("MinMaxScaler", MinMaxScaler(), ["Policy_Sales_Channel"]),
+            ("OneHotEncoder", OneHotEncoder(handle_unknown="ignore", sparse_output=False),
+             ["Vehicle_Age", "Vehicle_Damage", "Gender"]),
+        ],
+        remainder="passthrough",
+    )
+    return Pipeline(steps=[("Preprocessor", preprocessor)])
+
+
+def fit_preprocessor(df: pd.DataFrame) -> Pipeline:
+    """Fit the same preprocessor layout as ``data_transformation`` on ``df``."""
+    return make_preprocessor().fit(df)
@@ -7,3 +7,38 @@ DATABASE_NAME = "vehicle-insurance"
 COLLECTION_NAME = "vehicle-insurance-data"
 MONGODB_URL_KEY = "MONGODB_URL"
 TARGET_COLUMN = "Response"
+SNAPSHOT_CACHE_DIR = ".cache/snapshots"
+SNAPSHOT_CACHE_MAX_BYTES = 5 * 1024 ** 3
+FEATURE_COLUMNS = [
+    "Gender",
+    "Age",
+    "Driving_License",
+    "Region_Code",
+    "Previously_Insured",
+    "Vehicle_Age",
+    "Vehicle_Damage",
+    "Annual_Premium",
+    "Policy_Sales_Channel",
+    "Vintage",
+]
+REFERENCE_BATCH_TAG = "train"
+MONITORED_BATCHES_COLLECTION = "monitored-batches"
+MODEL_NAME = "vehicle_insurance_model"
+MODEL_CACHE_DIR = ".cache/models"
+TRANSFORM_CACHE_DIR = ".cache/transforms"
+TRANSFORM_CACHE_MAX_BYTES = 2 * 1024 ** 3
+# Ingestion dtype policy: "category", "integer" (smallest integer type that
+# holds the values) or a NumPy dtype name.
+COLUMN_DTYPES = {
+    "Gender": "category",
+    "Vehicle_Age": "category",
+    "Vehicle_Damage": "category",
+    "Age": "integer",
+    "Driving_License": "integer",
+    "Region_Code": "integer",
+    "Previously_Insured": "integer",
+    "Policy_Sales_Channel": "integer",
+    "Vintage": "integer",
+    "Annual_Premium": "float32",
+    "Response": "integer",
+}
@@ -0,0 +1,365 @@
+"""
+Online inference server with dynamic micro-batching.
+
+A small asyncio HTTP/1.1 server (standard library only) that keeps the
+current model and preprocessor loaded. Concurrent ``/predict`` requests are
+queued and combined into micro-batches of at most ``max_batch_size`` rows,
+waiting at most ``max_wait_ms`` after the first row of a batch, so one
+vectorized ``transform`` + ``predict_proba`` call serves many requests.
+The preprocessor is compiled to a ``CompiledPreprocessor`` plan when
+possible, so rows go from JSON dicts to the feature matrix without pandas.
+Scoring runs on a worker thread, so the event loop keeps accepting
+requests (and filling the next batch) while a batch is being scored.
+
+Endpoints:
+
+* ``POST /predict``: a JSON object (one row) or a list of objects with the
+  raw feature columns; returns ``prediction`` and ``probability`` per row.
+  Rows are validated and coerced before batching, so a malformed row gets
+  a 400 for its own request and never fails other clients' requests.
+* ``GET /metrics``: request/row/batch counters, mean batch size,
+  throughput and p50/p99 latency over the most recent requests.
+* ``GET /health``: liveness and the loaded model version.
+
+With ``--reload-interval``, a ``ModelReloader`` thread polls the registry
+and swaps in a newly promoted version once it is fully loaded. Batches
+already being scored finish on the old model, so no request is dropped.
+
+::
+
+    python inference_server.py --port 8080 --max-batch-size 64 --max-wait-ms 2
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from constant import FEATURE_COLUMNS
+from utils.fast_preprocessor import CompiledPreprocessor
+from utils.model_cache import ModelReloader, load_cached_model
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+LATENCY_WINDOW = 10_000
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def feature_names(preprocessor) -> List[str]:
+    """Raw input columns the preprocessor was fitted on."""
+    return list(getattr(preprocessor, "feature_names_in_", FEATURE_COLUMNS))
+
+
+class ServingMetrics:
+    """Counters and a sliding window of request latencies."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.batched_rows = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+
+    def record_request(self, rows: int, latency: float) -> None:
+        self.requests += 1
+        self.rows += rows
+        self.latencies.append(latency)
+
+    def record_batch(self, rows: int) -> None:
+        self.batches += 1
+        self.batched_rows += rows
+
+    def snapshot(self) -> Dict[str, Any]:
+        uptime = time.perf_counter() - self.started
+        latencies_ms = np.asarray(self.latencies) * 1000
+        p50, p99 = np.percentile(latencies_ms, [50, 99]) if latencies_ms.size else (None, None)
+        return {
+            "uptime_seconds": uptime,
+            "requests": self.requests,
+            "rows": self.rows,
+            "errors": self.errors,
+            "batches": self.batches,
+            "mean_batch_size": self.batched_rows / self.batches if self.batches else None,
+            "requests_per_second": self.requests / uptime if uptime else None,
+            "rows_per_second": self.rows / uptime if uptime else None,
+            "latency_ms_p50": None if p50 is None else float(p50),
+            "latency_ms_p99": None if p99 is None else float(p99),
+        }
+
+
+class MicroBatcher:
+    """
+    Collects rows from concurrent requests into batches.
+
+    A batch is closed when it holds ``max_batch_size`` rows or
+    ``max_wait_ms`` after its first row arrived, whichever comes first,
+    and is scored with one call to ``score_fn`` on a worker thread. If
+    that call fails, the batch is rescored row by row, so only the
+    requests whose rows fail get an error.
+    """
+
+    def __init__(self, score_fn, max_batch_size: int, max_wait_ms: float, metrics: ServingMetrics):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = metrics
+        self.queue: "asyncio.Queue[Tuple[dict, asyncio.Future]]" = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scoring")
+
+    async def submit(self, rows: List[dict]) -> List[dict]:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for row in rows:
+            future = loop.create_future()
+            self.queue.put_nowait((row, future))
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+
+    async def _next_batch(self) -> List[Tuple[dict, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            rows = [row for row, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.score_fn, rows)
+            except Exception:
+                logger.exception(f"Scoring a batch of {len(rows)} rows failed; rescoring row by row")
+                results = await loop.run_in_executor(self.executor, self._score_each, rows)
+
+            self.metrics.record_batch(len(batch))
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    self.metrics.errors += 1
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _score_each(self, rows: List[dict]) -> List[Any]:
+        """Score rows one at a time, so a failing row only fails its own request."""
+        results = []
+        for row in rows:
+            try:
+                results.append(self.score_fn([row])[0])
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+
+class InferenceServer:
+    """HTTP front end; the model can be swapped while serving (``swap_model``)."""
+
+    def __init__(
+        self,
+        model,
+        preprocessor,
+        model_version: Optional[str] = None,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+    ):
+        self.metrics = ServingMetrics()
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batcher: Optional[MicroBatcher] = None
+        self.swap_model(model, preprocessor, model_version)
+
+    def swap_model(self, model, preprocessor, model_version: Optional[str] = None) -> None:
+        """Replace the served model; batches already being scored finish on the old one."""
+        try:
+            compiled = CompiledPreprocessor.from_sklearn(preprocessor)
+        except NotImplementedError as exc:
+            logger.info(f"Preprocessor not compiled ({exc}); using sklearn transform")
+            compiled = None
+        self._loaded = (model, preprocessor, compiled, model_version)
+        logger.info(f"Serving model version {model_version}")
+
+    def score_rows(self, rows: List[dict]) -> List[dict]:
+        """Score rows with one transform and one predict_proba call."""
+        model, preprocessor, compiled, _ = self._loaded
+        if compiled is not None:
+            X = compiled.transform(rows)
+        else:
+            X = preprocessor.transform(pd.DataFrame.from_records(rows, columns=feature_names(preprocessor)))
+        proba = model.predict_proba(X)
+        labels = model.classes_[np.argmax(proba, axis=1)]
+        return [
+            {"prediction": int(label), "probability": float(p)}
+            for label, p in zip(labels, proba[:, 1])
+        ]
+
+    async def predict(self, payload: Any) -> Tuple[int, Any]:
+        """Validate and coerce the rows, then score them in the shared micro-batches."""
+        rows = payload if isinstance(payload, list) else [payload]
+        _, preprocessor, compiled, _ = self._loaded
+        features = feature_names(preprocessor)
+        for i, row in enumerate(rows):
+            if not isinstance(row, dict):
+                return 400, {"error": "expected a JSON object or a list of objects"}
+            missing = [feature for feature in features if feature not in row]
+            if missing:
+                return 400, {"error": f"missing features: {missing}"}
+            if compiled is not None:
+                try:
+                    rows[i] = compiled.check_row(row)
+                except ValueError as exc:
+                    return 400, {"error": f"row {i}: {exc}"}
+        if not rows:
+            return 200, []
+
+        try:
+            results = await self.batcher.submit(rows)
+        except ValueError as exc:
+            return 400, {"error": str(exc)}
+        return 200, results if isinstance(payload, list) else results[0]
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        if path == "/predict":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return 400, {"error": "invalid JSON"}
+            return await self.predict(payload)
+        if path == "/metrics" and method == "GET":
+            return 200, self.metrics.snapshot()
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok", "model_version": self._loaded[3]}
+        return 404, {"error": f"no route {method} {path}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    status, result = 413, {"error": "request body too large"}
+                    body = b""
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    start = time.perf_counter()
+                    try:
+                        status, result = await self.route(method, target.split("?", 1)[0], body)
+                    except Exception as exc:
+                        logger.exception("Request failed")
+                        status, result = 500, {"error": str(exc)}
+                    if target.startswith("/predict") and status == 200:
+                        rows = len(result) if isinstance(result, list) else 1
+                        self.metrics.record_request(rows, time.perf_counter() - start)
+
+                payload = json.dumps(result).encode()
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version == "HTTP/1.1"
+                    and status != 413
+                )
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080, ready: Optional[asyncio.Event] = None) -> None:
+        """Serve until cancelled; sets ``ready`` once the socket is listening."""
+        self.batcher = MicroBatcher(self.score_rows, self.max_batch_size, self.max_wait_ms, self.metrics)
+        batcher_task = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        logger.info(
+            f"Listening on http://{host}:{port} | max_batch_size={self.max_batch_size} "
+            f"| max_wait_ms={self.max_wait_ms}"
+        )
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+            self.batcher.executor.shutdown(wait=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the current model over HTTP with micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--model-file", help="joblib file with (model, preprocessor); default: ZenML registry")
+    parser.add_argument("--reload-interval", type=float, default=0.0,
+                        help="Seconds between registry version checks for hot reload (0 disables)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.model_file:
+        model, preprocessor = joblib.load(args.model_file)
+        model_version = args.model_file
+    else:
+        model, preprocessor, model_version = load_cached_model()
+
+    server = InferenceServer(
+        model, preprocessor, model_version,
+        max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+    )
+    if args.reload_interval > 0 and not args.model_file:
+        ModelReloader(server.swap_model, model_version, args.reload_interval).start()
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
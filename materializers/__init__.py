@@ -0,0 +1,14 @@
+# Initializes the materializers package.
+"""Custom ZenML materializers for artifacts passed between steps."""
+
+from .mmap_materializer import (
+    ArrowDataFrameMaterializer,
+    FlatForestMaterializer,
+    MmapNumpyMaterializer,
+)
+
+__all__ = [
+    "ArrowDataFrameMaterializer",
+    "FlatForestMaterializer",
+    "MmapNumpyMaterializer",
+]
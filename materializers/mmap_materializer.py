@@ -0,0 +1,157 @@
+# ZenML materializers that memory-map arrays and DataFrames on load.
+# Artifacts are stored as raw .npy and uncompressed Arrow IPC files.
+
+"""
+Zero-copy materializers for step-to-step arrays and DataFrames.
+
+ZenML's default NumPy and pandas materializers deserialize a private copy
+of the artifact in every step that consumes it. These store arrays as
+``.npy`` and DataFrames/Series as Arrow IPC (``utils.mmap_io``) and map
+them on load: a step starts as soon as the file is mapped, and steps
+reading the same artifact share its pages in the page cache.
+
+On a local artifact store the artifact file itself is mapped. Files in a
+remote store are first copied to a local temporary directory, removed at
+interpreter exit. Object arrays, and frames Arrow cannot represent, are
+handed to ZenML's default materializers; ``load`` recognises them by
+their file names.
+
+``FlatForestMaterializer`` stores a ``FlatForest`` with its own
+``save`` and maps it with ``load``.
+
+None of them is registered globally: each step attaches them to its
+ndarray, DataFrame and Series outputs with ``output_materializers``.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+from typing import Any, ClassVar, Dict, Optional, Tuple, Type
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from zenml.enums import ArtifactType
+from zenml.io import fileio
+from zenml.logger import get_logger
+from zenml.materializers.base_materializer import BaseMaterializer
+from zenml.materializers.numpy_materializer import NumpyMaterializer
+from zenml.materializers.pandas_materializer import PandasMaterializer
+from zenml.metadata.metadata_types import DType, MetadataType, StorageSize
+
+from utils.forest_engine import META_FILE as FLAT_FOREST_META, FlatForest
+from utils.mmap_io import ARRAY_FILENAME, FRAME_FILENAME, load_array, load_frame, save_array, save_frame
+
+logger = get_logger(__name__)
+
+_local_copies_dir: Optional[str] = None
+
+
+def _local_copy_dir() -> str:
+    """A new directory under the temporary directory removed at interpreter exit."""
+    global _local_copies_dir
+    if _local_copies_dir is None:
+        _local_copies_dir = tempfile.mkdtemp(prefix="zenml-mmap-")
+        atexit.register(shutil.rmtree, _local_copies_dir, ignore_errors=True)
+    return tempfile.mkdtemp(dir=_local_copies_dir)
+
+
+def _local_path(remote_path: str) -> str:
+    """``remote_path`` if it is on the local filesystem, else a local copy of it."""
+    if os.path.isfile(remote_path):
+        return remote_path
+    local_path = os.path.join(_local_copy_dir(), os.path.basename(remote_path))
+    fileio.copy(remote_path, local_path, overwrite=True)
+    return local_path
+
+
+class MmapNumpyMaterializer(BaseMaterializer):
+    """NumPy arrays as raw ``.npy``, memory-mapped copy-on-write on load."""
+
+    ASSOCIATED_TYPES: ClassVar[Tuple[Type[Any], ...]] = (np.ndarray,)
+    ASSOCIATED_ARTIFACT_TYPE: ClassVar[ArtifactType] = ArtifactType.DATA
+
+    def _fallback(self) -> NumpyMaterializer:
+        return NumpyMaterializer(self.uri, artifact_store=self.artifact_store)
+
+    def load(self, data_type: Type[Any]) -> np.ndarray:
+        path = os.path.join(self.uri, ARRAY_FILENAME)
+        if not fileio.exists(path):
+            return self._fallback().load(data_type)
+        return load_array(_local_path(path))
+
+    def save(self, data: np.ndarray) -> None:
+        if data.dtype.hasobject:
+            logger.info(f"Array of dtype {data.dtype} saved with the default NumPy materializer")
+            self._fallback().save(data)
+            return
+        with fileio.open(os.path.join(self.uri, ARRAY_FILENAME), "wb") as f:
+            save_array(data, f)
+
+    def extract_metadata(self, data: np.ndarray) -> Dict[str, MetadataType]:
+        return {
+            "shape": tuple(data.shape),
+            "dtype": DType(data.dtype.type),
+            "storage_size": StorageSize(data.nbytes),
+        }
+
+
+class ArrowDataFrameMaterializer(BaseMaterializer):
+    """DataFrames and Series as uncompressed Arrow IPC, memory-mapped on load."""
+
+    ASSOCIATED_TYPES: ClassVar[Tuple[Type[Any], ...]] = (pd.DataFrame, pd.Series)
+    ASSOCIATED_ARTIFACT_TYPE: ClassVar[ArtifactType] = ArtifactType.DATA
+
+    def _fallback(self) -> PandasMaterializer:
+        return PandasMaterializer(self.uri, artifact_store=self.artifact_store)
+
+    def load(self, data_type: Type[Any]) -> Any:
+        path = os.path.join(self.uri, FRAME_FILENAME)
+        if not fileio.exists(path):
+            return self._fallback().load(data_type)
+        return load_frame(_local_path(path))
+
+    def save(self, data: Any) -> None:
+        path = os.path.join(self.uri, FRAME_FILENAME)
+        try:
+            with fileio.open(path, "wb") as f:
+                save_frame(data, f)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            logger.info(f"Arrow cannot store this {type(data).__name__} ({e}); using the default pandas materializer")
+            fileio.remove(path)
+            self._fallback().save(data)
+
+    def extract_metadata(self, data: Any) -> Dict[str, MetadataType]:
+        return {
+            "shape": tuple(data.shape),
+            "storage_size": StorageSize(int(np.sum(data.memory_usage(deep=True)))),
+        }
+
+
+class FlatForestMaterializer(BaseMaterializer):
+    """``FlatForest`` as its directory of ``.npy`` files, memory-mapped on load."""
+
+    ASSOCIATED_TYPES: ClassVar[Tuple[Type[Any], ...]] = (FlatForest,)
+    ASSOCIATED_ARTIFACT_TYPE: ClassVar[ArtifactType] = ArtifactType.MODEL
+
+    def load(self, data_type: Type[Any]) -> FlatForest:
+        if os.path.isfile(os.path.join(self.uri, FLAT_FOREST_META)):
+            return FlatForest.load(self.uri)
+        local_dir = _local_copy_dir()
+        for name in fileio.listdir(self.uri):
+            fileio.copy(os.path.join(self.uri, name), os.path.join(local_dir, name), overwrite=True)
+        return FlatForest.load(local_dir)
+
+    def save(self, data: FlatForest) -> None:
+        with tempfile.TemporaryDirectory() as local_dir:
+            data.save(local_dir)
+            for name in os.listdir(local_dir):
+                fileio.copy(os.path.join(local_dir, name), os.path.join(self.uri, name), overwrite=True)
+
+    def extract_metadata(self, data: FlatForest) -> Dict[str, MetadataType]:
+        return {
+            "n_estimators": data.n_estimators,
+            "n_nodes": data.n_nodes,
+            "storage_size": StorageSize(data.nbytes),
+        }
@@ -0,0 +1,106 @@
+# Defines the ZenML incremental retraining pipeline.
+# Refreshes the production forest with trees trained on drifted batches.
+
+"""Defines the incremental retraining pipeline: load, ingest, transform, refresh, eval, promote."""
+
+from typing import List, Optional
+
+from zenml import pipeline
+from zenml.logger import get_logger
+
+from constant import FEATURE_COLUMNS, REFERENCE_BATCH_TAG, TARGET_COLUMN
+from steps.data_ingestion import ingest_data, DataIngestionParameters
+from steps.data_splitter import split_data, DataSplitterParameters
+from steps.incremental_update import (
+    compare_with_production,
+    incremental_update,
+    load_production_model,
+    merge_training_data,
+    transform_with_preprocessor,
+    IncrementalUpdateParameters,
+)
+from steps.model_evaluation import model_evaluation
+from steps.model_promoter import promote_model
+from steps.export_preprocessor import export_fast_preprocessor
+from steps.monitoring.profile_data import build_reference_profile, DataProfileParameters
+
+logger = get_logger(__name__)
+
+
+@pipeline(tags=["retraining", "incremental", "vehicle_insurance"])
+def incremental_retraining_pipeline(
+    collection_name: str,
+    batch_tags: List[str],
+    splitter_params: DataSplitterParameters,
+    update_params: IncrementalUpdateParameters,
+    reference_sample_fraction: Optional[float] = 0.1,
+):
+    """
+    Incremental retraining pipeline.
+
+    Instead of refitting the preprocessor and every tree on the full
+    training batch, the production forest gets ``n_new_trees`` trees
+    trained on ``batch_tags`` (plus, optionally, a random sample of the
+    reference batch) and loses as many of its oldest trees. The new
+    version is evaluated like a full retrain, and its training rows become
+    the reference profile for monitoring. It is promoted only if it beats
+    the production model on the same test rows.
+    """
+    model, preprocessor, _ = load_production_model()
+
+    new_data = ingest_data(
+        params=DataIngestionParameters(
+            collection_name=collection_name,
+            filters={"batch_tag": {"$in": list(batch_tags)}},
+            columns=FEATURE_COLUMNS + [TARGET_COLUMN],
+        ),
+        id="ingest_drifted_batches",
+    )
+    reference_sample = None
+    if reference_sample_fraction:
+        reference_sample = ingest_data(
+            params=DataIngestionParameters(
+                collection_name=collection_name,
+                batch_tag=REFERENCE_BATCH_TAG,
+                columns=FEATURE_COLUMNS + [TARGET_COLUMN],
+                sample_fraction=reference_sample_fraction,
+            ),
+            id="ingest_reference_sample",
+        )
+    training_data = merge_training_data(new_data=new_data, reference_sample=reference_sample)
+    build_reference_profile(df=training_data, params=DataProfileParameters())
+
+    X_train, X_test, y_train, y_test = split_data(df=training_data, params=splitter_params)
+    X_train_transformed, X_test_transformed, y_train_transformed, y_test_transformed = transform_with_preprocessor(
+        X_train=X_train,
+        X_test=X_test,
+        y_train=y_train,
+        y_test=y_test,
+        preprocessor=preprocessor,
+    )
+
+    refreshed_model, refreshed_preprocessor = incremental_update(
+        model=model,
+        preprocessor=preprocessor,
+        X_train=X_train_transformed,
+        y_train=y_train_transformed,
+        params=update_params,
+    )
+
+    export_fast_preprocessor(preprocessor=refreshed_preprocessor, X_test=X_test)
+
+    model_evaluation(
+        model=refreshed_model,
+        X_test=X_test_transformed,
+        y_test=y_test_transformed
+    )
+
+    approved = compare_with_production(
+        production_model=model,
+        refreshed_model=refreshed_model,
+        X_test=X_test_transformed,
+        y_test=y_test_transformed,
+        params=update_params,
+    )
+
+    promote_model(approved=approved, after=["model_evaluation"])
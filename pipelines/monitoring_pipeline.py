@@ -1,39 +1,125 @@
+from typing import List, Optional
 from zenml import pipeline
 from steps.data_ingestion import ingest_data, DataIngestionParameters
-from steps.monitoring.detect_data_drift import detect_data_drift
+from steps.monitoring.profile_data import (
+    load_reference_profile,
+    profile_incoming_data,
+    stream_incoming_profile,
+    server_incoming_profile,
+    profile_incoming_batches,
+    DataProfileParameters,
+    StreamingProfileParameters,
+    ServerProfileParameters,
+    MultiBatchProfileParameters,
+    PROFILING_MODES,
+)
+from steps.monitoring.detect_data_drift import detect_data_drift, detect_batch_drift
 from steps.monitoring.decide_retrain import decide_retrain
+from steps.monitoring.record_checked_batches import record_checked_batches
+from utils.profile_utils import NUMERIC_FEATURES, CATEGORICAL_FEATURES
 
 
 @pipeline
 def monitoring_pipeline(
     collection_name: str,
-    incoming_batch_tag: str,
+    incoming_batch_tag: Optional[str] = None,
+    profiling_mode: str = "in_memory",
+    incoming_batch_tags: Optional[List[str]] = None,
+    max_concurrent_batches: int = 4,
 ):
     """
     Monitoring pipeline that detects data drift
     and decides whether retraining is needed.
+
+    The reference side comes from the profile saved by the training
+    pipeline, so only the incoming batch is read from MongoDB.
+    ``profiling_mode`` selects how it is profiled:
+
+    * ``"in_memory"``: loaded as a DataFrame and profiled exactly;
+    * ``"streaming"``: profiled chunk by chunk from the cursor;
+    * ``"server"``: profiled inside MongoDB with aggregation pipelines,
+      so only per-feature summaries cross the network.
+
+    Without ``incoming_batch_tag``, several batches are checked in one
+    run: the tags in ``incoming_batch_tags``, or every batch not yet
+    checked when it is None. They are profiled concurrently against the
+    same reference, each gets its own report in ``drift_reports``, and
+    the retrain decision combines them. Checked batches are recorded so
+    the next run skips them.
     """
+    if profiling_mode not in PROFILING_MODES:
+        raise ValueError(
+            f"Unknown profiling_mode '{profiling_mode}', expected one of {PROFILING_MODES}"
+        )
+
+    # Load reference (historical) profile
+    reference_profile = load_reference_profile()
 
-    # Load reference (historical) data
-    reference_df = ingest_data(
-        params=DataIngestionParameters(
-            collection_name=collection_name,
-            batch_tag="train",
+    if incoming_batch_tag is None:
+        incoming_profiles = profile_incoming_batches(
+            reference_profile=reference_profile,
+            params=MultiBatchProfileParameters(
+                collection_name=collection_name,
+                batch_tags=incoming_batch_tags,
+                profiling_mode=profiling_mode,
+                max_concurrent_batches=max_concurrent_batches,
+                numeric_features=NUMERIC_FEATURES,
+                categorical_features=CATEGORICAL_FEATURES,
+            ),
         )
-    )
+        drift_detected, drifted_batches, drift_reports = detect_batch_drift(
+            reference_profile=reference_profile,
+            incoming_profiles=incoming_profiles,
+        )
+        record_checked_batches(collection_name=collection_name, drift_reports=drift_reports)
+        retrain_required = decide_retrain(
+            drift_detected=drift_detected,
+            drifted_batches=drifted_batches,
+        )
+        return drift_detected, drifted_batches, drift_reports, retrain_required
 
-    # Load incoming (new) data
-    incoming_df = ingest_data(
-        params=DataIngestionParameters(
-            collection_name=collection_name,
-            batch_tag=incoming_batch_tag,
+    # Profile incoming (new) data
+    if profiling_mode == "server":
+        incoming_profile = server_incoming_profile(
+            reference_profile=reference_profile,
+            params=ServerProfileParameters(
+                collection_name=collection_name,
+                batch_tag=incoming_batch_tag,
+                numeric_features=NUMERIC_FEATURES,
+                categorical_features=CATEGORICAL_FEATURES,
+            ),
+        )
+    elif profiling_mode == "streaming":
+        incoming_profile = stream_incoming_profile(
+            reference_profile=reference_profile,
+            params=StreamingProfileParameters(
+                collection_name=collection_name,
+                batch_tag=incoming_batch_tag,
+                numeric_features=NUMERIC_FEATURES,
+                categorical_features=CATEGORICAL_FEATURES,
+            ),
+        )
+    else:
+        incoming_df = ingest_data(
+            params=DataIngestionParameters(
+                collection_name=collection_name,
+                batch_tag=incoming_batch_tag,
+                columns=NUMERIC_FEATURES + CATEGORICAL_FEATURES,
+            )
+        )
+        incoming_profile = profile_incoming_data(
+            df=incoming_df,
+            reference_profile=reference_profile,
+            params=DataProfileParameters(
+                numeric_features=NUMERIC_FEATURES,
+                categorical_features=CATEGORICAL_FEATURES,
+            ),
         )
-    )
 
     # Detect drift
-    drift_detected, drifted_features = detect_data_drift(
-        reference_df=reference_df,
-        incoming_df=incoming_df,
+    drift_detected, drifted_features, drift_report = detect_data_drift(
+        reference_profile=reference_profile,
+        incoming_profile=incoming_profile,
     )
 
     # Decide whether to retrain
@@ -41,4 +127,4 @@ def monitoring_pipeline(
         drift_detected=drift_detected
     )
 
-    return drift_detected, drifted_features, retrain_required
+    return drift_detected, drifted_features, drift_report, retrain_required
@@ -0,0 +1,56 @@
+# Defines the ZenML out-of-core training pipeline.
+# Trains from a MongoDB stream for collections larger than memory.
+
+"""Defines the out-of-core training pipeline: profile, stream-train, export, eval, promote."""
+
+from zenml import pipeline
+from zenml.logger import get_logger
+
+from steps.data_transformation import DataTransformationParameters
+from steps.model_trainer import ModelTrainerParameters
+from steps.out_of_core_training import train_out_of_core, OutOfCoreParameters
+from steps.model_evaluation import model_evaluation
+from steps.model_promoter import promote_model
+from steps.export_preprocessor import export_fast_preprocessor
+from steps.monitoring.profile_data import stream_reference_profile, StreamingProfileParameters
+
+logger = get_logger(__name__)
+
+
+@pipeline(tags=["training", "out_of_core", "vehicle_insurance"])
+def out_of_core_training_pipeline(
+    out_of_core_params: OutOfCoreParameters,
+    transformation_params: DataTransformationParameters,
+    trainer_params: ModelTrainerParameters,
+):
+    """
+    Out-of-core training pipeline.
+
+    Produces the same model, preprocessor and reference profile artifacts
+    as ``training_pipeline`` without ever holding the training batch in
+    memory: the profile is built from mergeable sketches, and the
+    preprocessor and forest are fitted chunk by chunk. Evaluation runs on
+    a hash-selected sample of the test rows.
+    """
+    stream_reference_profile(
+        params=StreamingProfileParameters(
+            collection_name=out_of_core_params.collection_name,
+            batch_tag=out_of_core_params.batch_tag,
+            batch_size=out_of_core_params.chunk_rows,
+        )
+    )
+    model, preprocessor, X_test, X_test_transformed, y_test_transformed = train_out_of_core(
+        params=out_of_core_params,
+        transformation_params=transformation_params,
+        trainer_params=trainer_params,
+    )
+
+    export_fast_preprocessor(preprocessor=preprocessor, X_test=X_test)
+
+    model_evaluation(
+        model=model,
+        X_test=X_test_transformed,
+        y_test=y_test_transformed
+    )
+
+    promote_model(after=["model_evaluation"])
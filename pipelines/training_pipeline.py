@@ -3,6 +3,8 @@
 
 """Defines the training pipeline: ingest, split, transform, train, eval."""
 
+from typing import Optional
+
 from zenml import pipeline
 from zenml.logger import get_logger
 
@@ -10,8 +12,12 @@ from steps.data_ingestion import ingest_data, DataIngestionParameters
 from steps.data_splitter import split_data, DataSplitterParameters
 from steps.data_transformation import data_transformation, DataTransformationParameters
 from steps.model_trainer import model_trainer, ModelTrainerParameters
+from steps.hyperparameter_tuning import tune_hyperparameters, TuningParameters
 from steps.model_evaluation import model_evaluation
 from steps.model_promoter import promote_model
+from steps.export_preprocessor import export_fast_preprocessor
+from steps.export_forest import export_flat_forest
+from steps.monitoring.profile_data import build_reference_profile, DataProfileParameters
 
 logger = get_logger(__name__)
 
@@ -22,11 +28,19 @@ def training_pipeline(
     splitter_params: DataSplitterParameters,
     transformation_params: DataTransformationParameters,
     trainer_params: ModelTrainerParameters,
+    tuning_params: Optional[TuningParameters] = None,
+    flat_forest: bool = False,
 ):
     """
     Training pipeline.
+
+    With ``tuning_params``, a hyperparameter search runs on the transformed
+    training data and its best settings replace ``trainer_params``.
+    With ``flat_forest``, the trained forest is also exported as a
+    memory-mappable ``flat_forest`` artifact.
     """
     raw_data = ingest_data(params=ingestion_params)
+    build_reference_profile(df=raw_data, params=DataProfileParameters())
     X_train, X_test, y_train, y_test = split_data(df=raw_data, params=splitter_params)
     X_train_transformed, X_test_transformed, y_train_transformed, y_test_transformed, preprocessor = data_transformation(
         X_train=X_train,
@@ -35,13 +49,25 @@ def training_pipeline(
         y_test=y_test,
         params=transformation_params
     )
-    model, trained_preprocessor = model_trainer(
+    if tuning_params is not None:
+        trainer_params, _ = tune_hyperparameters(
+            X_train=X_train_transformed,
+            y_train=y_train_transformed,
+            base_params=trainer_params,
+            params=tuning_params,
+        )
+
+    model, trained_preprocessor, _ = model_trainer(
         X_train=X_train_transformed,
         y_train=y_train_transformed,
         preprocessor=preprocessor,  
         params=trainer_params
     )
-    
+
+    export_fast_preprocessor(preprocessor=trained_preprocessor, X_test=X_test)
+    if flat_forest:
+        export_flat_forest(model=model, X_test=X_test_transformed)
+
     model_evaluation(
         model=model,
         X_test=X_test_transformed,
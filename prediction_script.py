@@ -1,24 +1,16 @@
 import pandas as pd
-from zenml.client import Client
+
+from utils.model_cache import load_cached_model
 
 
 def load_current_model():
     """
     Load the CURRENT or LATEST model version along with its preprocessor
-    from the ZenML Model Registry.
+    from the ZenML Model Registry, reading it from the local model cache
+    when that version is already cached.
     """
-    client = Client()
-
-    try:
-        version = client.get_model_version("vehicle_insurance_model", "current")
-        print("Loaded CURRENT model version")
-    except Exception:
-        version = client.get_model_version("vehicle_insurance_model", "latest")
-        print("No current model found, using LATEST version")
-
-    model = version.get_artifact("model").load()
-    preprocessor = version.get_artifact("preprocessor").load()
-
+    model, preprocessor, version_id = load_cached_model()
+    print(f"Loaded model version {version_id}")
     return model, preprocessor
 
 
@@ -42,8 +34,10 @@ def main():
     # Apply the SAME preprocessing used during training
     X = preprocessor.transform(sample)
 
-    prediction = model.predict(X)[0]
-    probability = model.predict_proba(X)[0][1]
+    # One forest pass: predict() is the argmax of predict_proba().
+    proba = model.predict_proba(X)[0]
+    prediction = model.classes_[proba.argmax()]
+    probability = proba[1]
 
     print("Prediction (0 = No Claim, 1 = Claim):", prediction)
     print("Claim Probability:", round(float(probability), 4))
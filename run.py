@@ -1,47 +1,129 @@
+import time
+import warnings
+from typing import List, Optional
+
 from pipelines.training_pipeline import training_pipeline
 from pipelines.monitoring_pipeline import monitoring_pipeline
+from pipelines.incremental_retraining_pipeline import incremental_retraining_pipeline
+from pipelines.out_of_core_training_pipeline import out_of_core_training_pipeline
 from zenml.client import Client
 
 from steps.data_ingestion import DataIngestionParameters
 from steps.data_splitter import DataSplitterParameters
 from steps.data_transformation import DataTransformationParameters
 from steps.model_trainer import ModelTrainerParameters
+from steps.hyperparameter_tuning import TuningParameters
+from steps.incremental_update import IncrementalUpdateParameters
+from steps.out_of_core_training import OutOfCoreParameters
 
-from constant import COLLECTION_NAME, TARGET_COLUMN
+from constant import COLLECTION_NAME, TARGET_COLUMN, FEATURE_COLUMNS
 
 
-def run_training():
+def run_training(tuning_params: Optional[TuningParameters] = None, flat_forest: bool = False):
     training_pipeline(
         ingestion_params=DataIngestionParameters(
             collection_name=COLLECTION_NAME,
             batch_tag="train",
+            columns=FEATURE_COLUMNS + [TARGET_COLUMN],
+            use_snapshot_cache=True,
         ),
         splitter_params=DataSplitterParameters(
             target_column=TARGET_COLUMN,
         ),
         transformation_params=DataTransformationParameters(),
         trainer_params=ModelTrainerParameters(),
+        tuning_params=tuning_params,
+        flat_forest=flat_forest,
+    )
+
+
+def run_incremental_retraining(batch_tags: List[str], update_params: Optional[IncrementalUpdateParameters] = None):
+    """Refreshes the production forest with trees trained on ``batch_tags``."""
+    start = time.perf_counter()
+    incremental_retraining_pipeline(
+        collection_name=COLLECTION_NAME,
+        batch_tags=batch_tags,
+        splitter_params=DataSplitterParameters(
+            target_column=TARGET_COLUMN,
+        ),
+        update_params=update_params or IncrementalUpdateParameters(),
     )
+    print(f"Incremental retraining on {batch_tags} took {time.perf_counter() - start:.1f}s")
+
+
+def run_out_of_core_training(
+    out_of_core_params: Optional[OutOfCoreParameters] = None,
+    trainer_params: Optional[ModelTrainerParameters] = None,
+):
+    """
+    Trains from a MongoDB stream when the training batch does not fit in
+    memory. Sub-forests are rebalanced by random undersampling unless
+    ``trainer_params`` says otherwise.
+    """
+    start = time.perf_counter()
+    out_of_core_training_pipeline(
+        out_of_core_params=out_of_core_params or OutOfCoreParameters(collection_name=COLLECTION_NAME),
+        transformation_params=DataTransformationParameters(),
+        trainer_params=trainer_params or ModelTrainerParameters(imbalance_strategy="undersample"),
+    )
+    print(f"Out-of-core training took {time.perf_counter() - start:.1f}s")
+
+
+def monitoring_and_retrain(
+    batch_tags: Optional[List[str]] = None,
+    incremental: bool = False,
+    batch_tag: Optional[str] = None,
+):
+    """
+    Checks ``batch_tags`` (or every batch not yet checked when None)
+    in one monitoring run and retrains if any of them drifted: fully, or
+    with ``incremental`` by refreshing the production forest with trees
+    trained on the drifted batches.
 
+    ``batch_tag`` (or a single tag passed as ``batch_tags``) is the
+    deprecated single-batch form and maps to ``[batch_tag]``.
+    """
+    if isinstance(batch_tags, str):
+        batch_tag, batch_tags = batch_tags, None
+    if batch_tag is not None:
+        if batch_tags is not None:
+            raise ValueError("Pass either batch_tag or batch_tags, not both")
+        warnings.warn(
+            "monitoring_and_retrain(batch_tag=...) is deprecated; use batch_tags=[...]",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        batch_tags = [batch_tag]
 
-def monitoring_and_retrain(batch_tag: str):
     # Run monitoring
     pipeline_run = monitoring_pipeline(
         collection_name=COLLECTION_NAME,
-        incoming_batch_tag=batch_tag,
+        incoming_batch_tags=batch_tags,
     )
 
     # Extract decision
     client = Client()
     run = client.get_pipeline_run(pipeline_run.id)
+    drift_reports = run.steps["detect_batch_drift"].outputs["drift_reports"][0].load()
+    for batch_tag, report in drift_reports.items():
+        print(
+            f"{batch_tag}: drift_detected={report['drift_detected']} "
+            f"drifted_features={report['drifted_features']}"
+        )
     retrain_required = run.steps["decide_retrain"].output.load()
 
-    if retrain_required:
+    if retrain_required and incremental:
+        drifted_batches = run.steps["detect_batch_drift"].outputs["drifted_batches"][0].load()
+        print(f"Incremental retraining triggered automatically for {drifted_batches}.")
+        run_incremental_retraining(drifted_batches)
+    elif retrain_required:
         print("Retraining triggered automatically.")
+        start = time.perf_counter()
         run_training()
+        print(f"Full retraining took {time.perf_counter() - start:.1f}s")
     else:
         print("No retraining needed.")
 
 
 if __name__ == "__main__":
-    monitoring_and_retrain("batch_2_drifted")
+    monitoring_and_retrain(["batch_2_drifted"])
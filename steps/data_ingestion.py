@@ -1,13 +1,16 @@
 import pandas as pd
-from typing import Optional
+from typing import Optional, List, Dict, Any
 from typing_extensions import Annotated
 from pydantic import BaseModel, Field
 
 from zenml import step, ArtifactConfig
 from zenml.logger import get_logger
 
-from constant import COLLECTION_NAME
-from utils.db_utils import get_data_as_dataframe
+from materializers import ArrowDataFrameMaterializer
+from constant import COLLECTION_NAME, SNAPSHOT_CACHE_DIR, SNAPSHOT_CACHE_MAX_BYTES
+from utils.db_utils import get_data_as_dataframe, build_query, ensure_index
+from utils.dtype_policy import apply_dtype_policy
+from utils.snapshot_cache import SnapshotCache
 
 logger = get_logger(__name__)
 
@@ -24,9 +27,63 @@ class DataIngestionParameters(BaseModel):
         default=None,
         description="Optional batch tag to filter data (e.g. train, batch_1_clean, batch_2_drifted)"
     )
+    batch_size: Optional[int] = Field(
+        default=50_000,
+        gt=0,
+        description="Documents read per cursor batch into columnar buffers (None loads all documents at once)"
+    )
+    n_workers: int = Field(
+        default=1,
+        ge=1,
+        description="Parallel readers; above 1 the query is split into disjoint ranges of partition_key"
+    )
+    partition_key: str = Field(
+        default="id",
+        description="Numeric field (or '_id') used to split the query for parallel reads"
+    )
+    columns: Optional[List[str]] = Field(
+        default=None,
+        description="Fields to read (pushed down as a projection); None reads every field"
+    )
+    filters: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Extra MongoDB filter predicates combined with batch_tag (e.g. {'Age': {'$gte': 30}})"
+    )
+    limit: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Optional maximum number of documents to read"
+    )
+    sample_fraction: Optional[float] = Field(
+        default=None,
+        gt=0.0,
+        le=1.0,
+        description="Optional fraction of matching documents to sample server-side"
+    )
+    ensure_batch_tag_index: bool = Field(
+        default=False,
+        description="Create the batch_tag index if missing before a filtered read (needs the createIndex privilege)"
+    )
+    use_snapshot_cache: bool = Field(
+        default=False,
+        description="Serve unchanged query results from a local Arrow snapshot, fetching only appended documents"
+    )
+    snapshot_cache_dir: str = Field(
+        default=SNAPSHOT_CACHE_DIR,
+        description="Directory holding the snapshot cache"
+    )
+    snapshot_cache_max_bytes: int = Field(
+        default=SNAPSHOT_CACHE_MAX_BYTES,
+        gt=0,
+        description="Size limit of the snapshot cache; least recently used entries are evicted beyond it"
+    )
+    apply_dtypes: bool = Field(
+        default=True,
+        description="Convert columns to the compact dtypes of COLUMN_DTYPES (categoricals, smallest integers, float32)"
+    )
 
 
-@step(enable_cache=False)
+@step(enable_cache=False, output_materializers=ArrowDataFrameMaterializer)
 def ingest_data(
     params: DataIngestionParameters,
 ) -> Annotated[
@@ -39,16 +96,38 @@ def ingest_data(
 
     logger.info("Starting data ingestion from MongoDB")
 
-    query = {}
     if params.batch_tag is not None:
-        query["batch_tag"] = params.batch_tag
         logger.info(f"Filtering data using batch_tag='{params.batch_tag}'")
+        if params.ensure_batch_tag_index:
+            ensure_index(params.collection_name, field="batch_tag")
     else:
         logger.info("No batch_tag provided — loading full collection")
 
+    query = build_query(
+        batch_tag=params.batch_tag,
+        filters=params.filters,
+        sample_fraction=params.sample_fraction,
+    )
+
+    snapshot_cache = None
+    if params.use_snapshot_cache:
+        if params.sample_fraction is not None or params.limit is not None:
+            logger.info("Snapshot cache skipped for sampled or limited reads")
+        else:
+            snapshot_cache = SnapshotCache(
+                cache_dir=params.snapshot_cache_dir,
+                max_bytes=params.snapshot_cache_max_bytes,
+            )
+
     df = get_data_as_dataframe(
         collection_name=params.collection_name,
         query=query,
+        batch_size=params.batch_size,
+        n_workers=params.n_workers,
+        partition_key=params.partition_key,
+        columns=params.columns,
+        limit=params.limit,
+        snapshot_cache=snapshot_cache,
     )
 
     if df.empty:
@@ -57,6 +136,9 @@ def ingest_data(
             f"for batch_tag='{params.batch_tag}'"
         )
 
+    if params.apply_dtypes:
+        df = apply_dtype_policy(df)
+
     logger.info(f"Data ingestion completed | Shape: {df.shape}")
 
     return df
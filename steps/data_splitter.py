@@ -11,6 +11,8 @@ from zenml.logger import get_logger
 from pydantic import BaseModel
 from sklearn.model_selection import train_test_split
 
+from materializers import ArrowDataFrameMaterializer
+
 logger = get_logger(__name__)
 
 class DataSplitterParameters(BaseModel):
@@ -19,7 +21,7 @@ class DataSplitterParameters(BaseModel):
     random_state: int = 42
     target_column: str = "Response"
 
-@step
+@step(output_materializers=ArrowDataFrameMaterializer)
 def split_data(
     df: pd.DataFrame,
     params: DataSplitterParameters,
@@ -3,18 +3,23 @@
 
 """Applies pandas fixes and sklearn preprocessing to features and labels."""
 
+import time
 import pandas as pd
 import numpy as np
-from typing import Tuple, List
+from typing import Dict, Tuple, List
 from typing_extensions import Annotated
-from zenml import step, ArtifactConfig
+from zenml import step, ArtifactConfig, log_metadata
 from zenml.logger import get_logger
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler, MinMaxScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 
+from materializers import MmapNumpyMaterializer
+from constant import TRANSFORM_CACHE_DIR, TRANSFORM_CACHE_MAX_BYTES
+from utils.dtype_policy import as_model_input, transform_to_float32
 from utils.main_utils import drop_id_column
+from utils.transform_cache import TransformCache, frame_fingerprint
 
 
 logger = get_logger(__name__)
@@ -24,8 +29,33 @@ class DataTransformationParameters(BaseModel):
     num_features: List[str] = ["Age", "Annual_Premium", "Vintage"]
     mm_columns: List[str] = ["Policy_Sales_Channel"]
     cat_features: List[str] = ["Vehicle_Age", "Vehicle_Damage","Gender"]
-
-@step
+    use_cache: bool = Field(
+        default=True,
+        description="Reuse the preprocessor and arrays of an earlier run on identical splits and parameters"
+    )
+    cache_dir: str = Field(
+        default=TRANSFORM_CACHE_DIR,
+        description="Directory holding the transform cache"
+    )
+    cache_max_bytes: int = Field(
+        default=TRANSFORM_CACHE_MAX_BYTES,
+        gt=0,
+        description="Size limit of the transform cache; least recently used entries are evicted beyond it"
+    )
+
+
+# Settings of the cache itself; they do not change the step's output.
+CACHE_FIELDS = {"use_cache", "cache_dir", "cache_max_bytes"}
+
+
+@step(
+    output_materializers={
+        "X_train_transformed": MmapNumpyMaterializer,
+        "X_test_transformed": MmapNumpyMaterializer,
+        "y_train_transformed": MmapNumpyMaterializer,
+        "y_test_transformed": MmapNumpyMaterializer,
+    }
+)
 def data_transformation(
     X_train: pd.DataFrame,
     X_test: pd.DataFrame,
@@ -44,6 +74,10 @@ def data_transformation(
     1. Removal of operational metadata (batch_tag)
     2. Custom pandas-based preprocessing
     3. Scikit-learn preprocessing pipeline
+
+    Feature matrices are float32 and labels the smallest integer type.
+    With ``params.use_cache``, splits whose content and parameters match an
+    earlier run reuse its fitted preprocessor and arrays (``TransformCache``).
     """
     try:
         logger.info("Starting Data Transformation...")
@@ -67,40 +101,80 @@ def data_transformation(
 
         logger.info("Custom pandas transformations applied.")
 
-        numeric_transformer = StandardScaler()
-        min_max_scaler = MinMaxScaler()
-        one_hot_encoder = OneHotEncoder(
-            handle_unknown="ignore",
-            sparse_output=False
-        )
-
-        preprocessor = ColumnTransformer(
-            transformers=[
-                ("StandardScaler", numeric_transformer, params.num_features),
-                ("MinMaxScaler", min_max_scaler, params.mm_columns),
-                ("OneHotEncoder", one_hot_encoder, params.cat_features),
-            ],
-            remainder="passthrough"
-        )
-
-        pipeline = Pipeline(steps=[("Preprocessor", preprocessor)])
-
-        logger.info("Fitting preprocessor on training data...")
-        X_train_arr = pipeline.fit_transform(X_train)
-        X_test_arr = pipeline.transform(X_test)
-        logger.info("Preprocessor fit and transform complete.")
-
-        y_train_arr = np.array(y_train)
-        y_test_arr = np.array(y_test)
+        if params.use_cache:
+            start = time.perf_counter()
+            fingerprints = {
+                name: frame_fingerprint(data)
+                for name, data in (("X_train", X_train), ("X_test", X_test), ("y_train", y_train), ("y_test", y_test))
+            }
+            key = TransformCache.make_key(fingerprints, params.model_dump(exclude=CACHE_FIELDS))
+            fingerprint_seconds = time.perf_counter() - start
+            cache = TransformCache(params.cache_dir, params.cache_max_bytes)
+            pipeline, arrays, hit = cache.get_or_compute(
+                key, lambda: _fit_and_transform(X_train, X_test, y_train, y_test, params)
+            )
+            outcome = "hit, reusing the cached preprocessor and arrays" if hit else "miss, preprocessor fitted and cached"
+            logger.info(f"Transform cache {outcome} | key={key} | fingerprint took {fingerprint_seconds:.2f}s")
+            log_metadata(metadata={"transform_cache": {"hit": hit, "key": key, "fingerprint_seconds": fingerprint_seconds}})
+        else:
+            pipeline, arrays = _fit_and_transform(X_train, X_test, y_train, y_test, params)
 
         return (
-            X_train_arr,
-            X_test_arr,
-            y_train_arr,
-            y_test_arr,
+            arrays["X_train"],
+            arrays["X_test"],
+            arrays["y_train"],
+            arrays["y_test"],
             pipeline
         )
 
     except Exception as e:
         logger.error(f"Error in data transformation: {e}")
         raise e
+
+
+def build_preprocessor(params: DataTransformationParameters) -> Pipeline:
+    """The unfitted preprocessing pipeline described by ``params``."""
+    numeric_transformer = StandardScaler()
+    min_max_scaler = MinMaxScaler()
+    one_hot_encoder = OneHotEncoder(
+        handle_unknown="ignore",
+        sparse_output=False
+    )
+
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("StandardScaler", numeric_transformer, params.num_features),
+            ("MinMaxScaler", min_max_scaler, params.mm_columns),
+            ("OneHotEncoder", one_hot_encoder, params.cat_features),
+        ],
+        remainder="passthrough"
+    )
+
+    return Pipeline(steps=[("Preprocessor", preprocessor)])
+
+
+def _fit_and_transform(
+    X_train: pd.DataFrame,
+    X_test: pd.DataFrame,
+    y_train: pd.Series,
+    y_test: pd.Series,
+    params: DataTransformationParameters,
+) -> Tuple[Pipeline, Dict[str, np.ndarray]]:
+    """Fits the preprocessor on the training split and transforms both splits."""
+    pipeline = build_preprocessor(params)
+
+    logger.info("Fitting preprocessor on training data...")
+    pipeline.fit(as_model_input(X_train))
+    X_train_arr = transform_to_float32(pipeline, X_train)
+    X_test_arr = transform_to_float32(pipeline, X_test)
+    logger.info(
+        f"Preprocessor fit and transform complete | "
+        f"X_train {X_train_arr.nbytes / 1e6:.1f} MB, X_test {X_test_arr.nbytes / 1e6:.1f} MB ({X_train_arr.dtype})"
+    )
+
+    return pipeline, {
+        "X_train": X_train_arr,
+        "X_test": X_test_arr,
+        "y_train": pd.to_numeric(y_train, downcast="unsigned").to_numpy(),
+        "y_test": pd.to_numeric(y_test, downcast="unsigned").to_numpy(),
+    }
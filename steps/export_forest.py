@@ -0,0 +1,49 @@
+# ZenML step for exporting the trained forest as flat NumPy arrays.
+# Verifies the flattened forest against the sklearn model before saving it.
+
+"""Flattens the trained RandomForest into a ``FlatForest`` and checks it is exact."""
+
+import numpy as np
+from typing_extensions import Annotated
+from zenml import step, ArtifactConfig
+from zenml.logger import get_logger
+
+from materializers import FlatForestMaterializer
+from utils.forest_engine import FlatForest
+
+logger = get_logger(__name__)
+
+VERIFY_ROWS = 1_000
+
+
+@step(output_materializers=FlatForestMaterializer)
+def export_flat_forest(
+    model,
+    X_test: np.ndarray,
+) -> Annotated[FlatForest, ArtifactConfig(name="flat_forest", tags=["model", "compiled"])]:
+    """
+    Flattens the trained forest and verifies that its probabilities equal
+    ``model.predict_proba`` on a sample of at most ``VERIFY_ROWS`` test rows.
+    The artifact is stored as the forest's ``.npy`` files and memory-mapped
+    when loaded.
+    """
+    forest = FlatForest.from_sklearn(model)
+
+    if len(X_test) > VERIFY_ROWS:
+        sample = np.sort(np.random.default_rng(0).choice(len(X_test), VERIFY_ROWS, replace=False))
+        X_test = X_test[sample]
+    expected = model.predict_proba(X_test)
+    proba = forest.predict_proba(X_test)
+    if not np.allclose(expected, proba, rtol=0.0, atol=1e-12) or not np.array_equal(
+        model.classes_[np.argmax(expected, axis=1)], forest.classes_[np.argmax(proba, axis=1)]
+    ):
+        raise ValueError(
+            f"Flat forest does not match model.predict_proba "
+            f"(max abs difference {np.abs(expected - proba).max():.3g})"
+        )
+
+    logger.info(
+        f"Flat forest verified on {len(X_test)} rows | trees={forest.n_estimators} | "
+        f"nodes={forest.n_nodes} | {forest.nbytes / 1e6:.1f} MB"
+    )
+    return forest
@@ -0,0 +1,87 @@
+# ZenML step for tuning the trainer's hyperparameters.
+# Runs a successive-halving search over forest and resampling settings.
+
+"""Tunes RandomForest and resampling settings with successive halving on a process pool."""
+
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from typing_extensions import Annotated
+from pydantic import BaseModel, Field
+from zenml import step, ArtifactConfig, log_metadata
+from zenml.logger import get_logger
+
+from steps.model_trainer import ModelTrainerParameters
+from utils.parallel import resolve_n_jobs
+from utils.tuning import DEFAULT_SEARCH_SPACE, successive_halving
+
+logger = get_logger(__name__)
+
+
+class TuningParameters(BaseModel):
+    """Parameters for the hyperparameter search."""
+    search_space: Dict[str, List[Any]] = Field(
+        default_factory=lambda: {name: list(values) for name, values in DEFAULT_SEARCH_SPACE.items()},
+        description="Candidate values per ModelTrainerParameters field",
+    )
+    n_candidates: int = Field(16, description="Settings sampled from the search space")
+    min_trees: int = Field(25, description="Trees per candidate in the first rung")
+    max_trees: int = Field(200, description="Tree budget of the final rung")
+    eta: int = Field(3, description="Survivors are cut to 1/eta and trees multiplied by eta per rung")
+    time_budget_seconds: Optional[float] = Field(None, description="Stop after the rung that exceeds this wall time")
+    n_workers: Optional[int] = Field(None, description="Worker processes (default: every available core)")
+    validation_fraction: float = Field(0.2, description="Stratified share of training rows used for scoring")
+    random_state: int = 42
+
+
+@step
+def tune_hyperparameters(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    base_params: ModelTrainerParameters,
+    params: TuningParameters,
+) -> Tuple[
+    Annotated[ModelTrainerParameters, ArtifactConfig(name="tuned_trainer_params", tags=["tuning"])],
+    Annotated[List[Dict[str, Any]], ArtifactConfig(name="tuning_leaderboard", tags=["tuning", "metric"])],
+]:
+    """
+    Searches the settings in ``params.search_space`` on a split of the
+    transformed training rows and returns ``base_params`` with the best
+    settings applied, ready to pass to ``model_trainer``.
+    """
+    try:
+        logger.info("Starting Hyperparameter Tuning...")
+        n_workers = resolve_n_jobs(params.n_workers)
+        best, leaderboard = successive_halving(
+            X_train,
+            np.asarray(y_train).ravel(),
+            base_config=base_params.model_dump(),
+            search_space=params.search_space,
+            n_candidates=params.n_candidates,
+            min_trees=params.min_trees,
+            max_trees=params.max_trees,
+            eta=params.eta,
+            n_workers=n_workers,
+            time_budget_seconds=params.time_budget_seconds,
+            validation_fraction=params.validation_fraction,
+            random_state=params.random_state,
+        )
+        tuned = base_params.model_copy(update=best)
+        final = max((entry for entry in leaderboard), key=lambda entry: (entry["rung"], entry["roc_auc"]))
+        logger.info(f"Best settings: {best} | validation ROC-AUC {final['roc_auc']:.5f} with {final['n_trees']} trees")
+
+        log_metadata(
+            metadata={
+                "tuning": {
+                    "best_settings": best,
+                    "validation_roc_auc": final["roc_auc"],
+                    "n_trees": final["n_trees"],
+                    "n_evaluations": len(leaderboard),
+                    "n_workers": n_workers,
+                }
+            }
+        )
+        return tuned, leaderboard
+
+    except Exception as e:
+        logger.error(f"Error in hyperparameter tuning: {e}")
+        raise e
@@ -0,0 +1,224 @@
+# ZenML steps for incremental retraining of the production model.
+# Refreshes the current forest with trees trained on drifted batches.
+
+"""Loads the production model, transforms new rows with its preprocessor and refreshes its trees."""
+
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from typing_extensions import Annotated
+from pydantic import BaseModel, Field
+from zenml import step, ArtifactConfig, Model, log_metadata
+from zenml.logger import get_logger
+from sklearn.base import ClassifierMixin
+from threadpoolctl import threadpool_limits
+
+from materializers import ArrowDataFrameMaterializer, MmapNumpyMaterializer
+from utils.dtype_policy import transform_to_float32
+from utils.evaluation_engine import threshold_sweep
+from utils.forest_update import refresh_forest
+from utils.imbalance import IMBALANCE_STRATEGIES, rebalance
+from utils.main_utils import drop_id_column
+from utils.model_cache import load_cached_model
+from utils.parallel import blas_threads_per_job, resolve_n_jobs
+
+logger = get_logger(__name__)
+
+METADATA_COLUMNS = ["batch_tag"]
+
+
+class IncrementalUpdateParameters(BaseModel):
+    """Parameters for refreshing the production forest."""
+    n_new_trees: int = Field(50, description="Trees fitted on the new rows and appended to the forest")
+    forest_size: Optional[int] = Field(None, description="Trees kept after retiring the oldest (default: current size)")
+    imbalance_strategy: str = Field("smoteenn", description=f"One of {IMBALANCE_STRATEGIES}")
+    sampling_strategy: str = Field("minority", description="SMOTE sampling strategy")
+    subsample_rows: int = Field(200_000, description="Stratified subsample size for smoteenn_subsample")
+    undersampling_ratio: Union[float, str] = Field("auto", description="RandomUnderSampler sampling_strategy for undersample")
+    class_weight: str = Field("balanced", description="Forest class_weight for the class_weight strategy")
+    random_state: Optional[int] = Field(None, description="Seed of the resampling and the new trees (None: fresh)")
+    n_jobs: Optional[int] = Field(-1, description="Parallel jobs; -1 uses every available core")
+    min_roc_auc_gain: float = Field(
+        0.0, description="ROC-AUC gain over the production model, on the same test rows, required to promote"
+    )
+
+
+@step(enable_cache=False)
+def load_production_model() -> Tuple[
+    Annotated[ClassifierMixin, ArtifactConfig(name="production_model", tags=["model"])],
+    Annotated[object, ArtifactConfig(name="production_preprocessor", tags=["preprocessing"])],
+    Annotated[str, ArtifactConfig(name="production_model_version", tags=["model"])],
+]:
+    """
+    Loads the current production model and its preprocessor through the
+    local model cache.
+    """
+    model, preprocessor, version_id = load_cached_model()
+    logger.info(f"Loaded production model version {version_id} with {len(model.estimators_)} trees")
+    return model, preprocessor, version_id
+
+
+@step(output_materializers=ArrowDataFrameMaterializer)
+def merge_training_data(
+    new_data: pd.DataFrame,
+    reference_sample: Optional[pd.DataFrame] = None,
+) -> Annotated[pd.DataFrame, ArtifactConfig(name="incremental_training_data", tags=["raw", "incremental"])]:
+    """
+    Combines the drifted batches with an optional sample of the reference
+    (training) batch.
+    """
+    if reference_sample is None or reference_sample.empty:
+        return new_data
+    merged = pd.concat([new_data, reference_sample[new_data.columns]], ignore_index=True)
+    logger.info(f"Merged {len(new_data)} new rows with {len(reference_sample)} reference rows")
+    return merged
+
+
+@step(output_materializers=MmapNumpyMaterializer)
+def transform_with_preprocessor(
+    X_train: pd.DataFrame,
+    X_test: pd.DataFrame,
+    y_train: pd.Series,
+    y_test: pd.Series,
+    preprocessor,
+) -> Tuple[
+    Annotated[np.ndarray, ArtifactConfig(name="X_train_transformed", tags=["train", "transformed"])],
+    Annotated[np.ndarray, ArtifactConfig(name="X_test_transformed", tags=["test", "transformed"])],
+    Annotated[np.ndarray, ArtifactConfig(name="y_train_transformed", tags=["train", "labels"])],
+    Annotated[np.ndarray, ArtifactConfig(name="y_test_transformed", tags=["test", "labels"])],
+]:
+    """
+    Transforms both splits with an already fitted preprocessor. The
+    existing trees split on its feature layout, so it must not be refitted.
+    """
+    try:
+        X_train = drop_id_column(X_train.drop(columns=METADATA_COLUMNS, errors="ignore"))
+        X_test = drop_id_column(X_test.drop(columns=METADATA_COLUMNS, errors="ignore"))
+        return (
+            transform_to_float32(preprocessor, X_train),
+            transform_to_float32(preprocessor, X_test),
+            pd.to_numeric(y_train, downcast="unsigned").to_numpy(),
+            pd.to_numeric(y_test, downcast="unsigned").to_numpy(),
+        )
+
+    except Exception as e:
+        logger.error(f"Error in data transformation: {e}")
+        raise e
+
+
+@step(
+    model=Model(
+        name="vehicle_insurance_model",
+        description="RandomForest model for vehicle insurance claim prediction",
+    )
+)
+def incremental_update(
+    model: ClassifierMixin,
+    preprocessor,
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    params: IncrementalUpdateParameters,
+) -> Tuple[
+    Annotated[ClassifierMixin, ArtifactConfig(name="model", tags=["model"])],
+    Annotated[object, ArtifactConfig(name="preprocessor", tags=["preprocessing"])],
+]:
+    """
+    Balances the new rows, fits ``n_new_trees`` trees on them with the
+    production forest's hyperparameters, appends them and retires the
+    oldest trees. Returns a new model version with the unchanged
+    preprocessor; per-phase wall times are logged as step metadata.
+    """
+    try:
+        logger.info("Starting Incremental Update...")
+        n_jobs = resolve_n_jobs(params.n_jobs)
+
+        start = time.perf_counter()
+        with threadpool_limits(limits=blas_threads_per_job(n_jobs), user_api="blas"):
+            X_resampled, y_resampled, class_weight = rebalance(
+                X_train,
+                np.asarray(y_train).ravel(),
+                strategy=params.imbalance_strategy,
+                sampling_strategy=params.sampling_strategy,
+                random_state=params.random_state,
+                subsample_rows=params.subsample_rows,
+                undersampling_ratio=params.undersampling_ratio,
+                class_weight=params.class_weight,
+                n_jobs=n_jobs,
+            )
+        resampling_seconds = time.perf_counter() - start
+        logger.info(f"Resampling complete in {resampling_seconds:.1f}s. Resampled shape: {X_resampled.shape}")
+
+        start = time.perf_counter()
+        with threadpool_limits(limits=blas_threads_per_job(n_jobs), user_api="blas"):
+            refreshed, report = refresh_forest(
+                model,
+                X_resampled,
+                y_resampled,
+                n_new_trees=params.n_new_trees,
+                forest_size=params.forest_size,
+                class_weight=class_weight,
+                random_state=params.random_state,
+                n_jobs=n_jobs,
+            )
+        fit_seconds = time.perf_counter() - start
+        logger.info(f"Fitted {params.n_new_trees} new trees in {fit_seconds:.1f}s.")
+
+        log_metadata(
+            metadata={
+                "training_timing": {
+                    "resampling_seconds": resampling_seconds,
+                    "fit_seconds": fit_seconds,
+                    "total_seconds": resampling_seconds + fit_seconds,
+                },
+                "incremental_update": dict(report, imbalance_strategy=params.imbalance_strategy),
+            }
+        )
+        return refreshed, preprocessor
+
+    except Exception as e:
+        logger.error(f"Error in incremental update: {e}")
+        raise e
+
+
+@step(enable_cache=False)
+def compare_with_production(
+    production_model: ClassifierMixin,
+    refreshed_model: ClassifierMixin,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    params: IncrementalUpdateParameters,
+) -> Annotated[bool, ArtifactConfig(name="promotion_approved", tags=["metric"])]:
+    """
+    Scores the production and the refreshed model on the same test rows
+    (from the drifted batches and the reference sample) and approves the
+    refreshed model only if its ROC-AUC is at least ``min_roc_auc_gain``
+    higher. Both results
+    are logged as step metadata.
+    """
+    try:
+        y_true = np.asarray(y_test).ravel() == production_model.classes_[1]
+        results = {}
+        for name, model in (("production", production_model), ("refreshed", refreshed_model)):
+            sweep = threshold_sweep(y_true, model.predict_proba(X_test)[:, 1])
+            results[name] = {"roc_auc": sweep["roc_auc"], "pr_auc": sweep["pr_auc"]}
+
+        gain = results["refreshed"]["roc_auc"] - results["production"]["roc_auc"]
+        approved = bool(gain >= params.min_roc_auc_gain)
+        logger.info(
+            f"Same {len(y_true)} test rows | production ROC-AUC {results['production']['roc_auc']:.4f} | "
+            f"refreshed ROC-AUC {results['refreshed']['roc_auc']:.4f} | gain {gain:+.4f} | "
+            f"{'approved' if approved else 'not approved'} (min gain {params.min_roc_auc_gain})"
+        )
+        log_metadata(
+            metadata={
+                "production_comparison": dict(
+                    results, n_rows=int(len(y_true)), roc_auc_gain=gain, approved=approved
+                )
+            }
+        )
+        return approved
+
+    except Exception as e:
+        logger.error(f"Error comparing with the production model: {e}")
+        raise e
@@ -1,65 +1,177 @@
 # ZenML step for evaluating the trained model.
-# Calculates metrics like ROC AUC, precision, recall, and confusion matrix.
+# Derives every metric from a single predict_proba pass over the test set.
 
-"""Evaluates the trained model: ROC-AUC, precision, recall, confusion matrix."""
+"""Evaluates the trained model: ROC-AUC, PR-AUC, threshold sweeps, calibration, bootstrap CIs."""
 
+import time
 import numpy as np
-from typing import Tuple
+from typing import Any, Dict, Tuple
 from typing_extensions import Annotated
-from zenml import step, ArtifactConfig
+from pydantic import BaseModel, Field
+from zenml import step, ArtifactConfig, log_metadata
 from zenml.logger import get_logger
 from sklearn.base import ClassifierMixin
-from sklearn.metrics import roc_auc_score, precision_score, recall_score, confusion_matrix
+
+from utils.evaluation_engine import (
+    bootstrap_metrics,
+    calibration_bins,
+    confidence_intervals,
+    group_scores,
+    metrics_at,
+    threshold_sweep,
+)
 
 logger = get_logger(__name__)
 
+# Thresholds at which the sweep is logged as metadata; the full sweep is in
+# the evaluation_report artifact.
+LOGGED_THRESHOLDS = np.round(np.arange(0.05, 1.0, 0.05), 2)
+
+
+class ModelEvaluationParameters(BaseModel):
+    """Parameters for model evaluation."""
+    n_bootstrap: int = Field(200, description="Bootstrap resamples for confidence intervals (0 disables)")
+    bootstrap_batch_size: int = Field(32, description="Resamples drawn per vectorized batch")
+    confidence: float = Field(0.95, description="Confidence level of the bootstrap intervals")
+    n_calibration_bins: int = Field(10, description="Equal-width probability bins for the calibration table")
+    random_state: int = 42
+
+
+def _sweep_at(sweep: Dict[str, Any], thresholds: np.ndarray) -> Dict[str, list]:
+    """Sweep values for ``score >= t`` at the given thresholds."""
+    # Sweep thresholds are descending; the last one >= t gives score >= t.
+    ascending = sweep["thresholds"][::-1]
+    idx = len(ascending) - np.searchsorted(ascending, thresholds, side="left") - 1
+    idx = np.clip(idx, 0, len(ascending) - 1)
+    below_all = thresholds > sweep["thresholds"][0]
+    values = {"threshold": thresholds.tolist()}
+    for name in ("precision", "recall", "f1"):
+        column = np.where(below_all, 0.0, sweep[name][idx])
+        values[name] = column.tolist()
+    return values
+
+
 @step
 def model_evaluation(
     model: ClassifierMixin,
     X_test: np.ndarray,
     y_test: np.ndarray,
+    params: ModelEvaluationParameters = ModelEvaluationParameters(),
 ) -> Tuple[
     Annotated[float, ArtifactConfig(name="roc_auc_score", tags=["metric"])],
     Annotated[float, ArtifactConfig(name="precision_score", tags=["metric"])],
     Annotated[float, ArtifactConfig(name="recall_score", tags=["metric"])],
     Annotated[np.ndarray, ArtifactConfig(name="confusion_matrix", tags=["metric"])],
+    Annotated[Dict[str, Any], ArtifactConfig(name="evaluation_report", tags=["metric"])],
 ]:
     """
     Model evaluation step.
 
+    The model is run once (``predict_proba``); hard predictions are the
+    argmax of those probabilities, exactly as ``model.predict`` would
+    return. Threshold sweeps, PR-AUC, calibration and bootstrap intervals
+    are all derived from the same probabilities and logged as metadata of
+    the model version.
+
     Args:
         model: Trained classifier model.
         X_test: Transformed testing features.
         y_test: Testing labels.
+        params: Bootstrap and calibration settings.
 
     Returns:
-        Tuple containing ROC-AUC, Precision, Recall, and Confusion Matrix.
+        Tuple containing ROC-AUC, Precision, Recall, Confusion Matrix and
+        the full evaluation report.
     """
     try:
         logger.info("Starting Model Evaluation...")
+        y_test = np.asarray(y_test).ravel()
 
-        # Predict probabilities for ROC-AUC
-        # RandomForest (used in trainer) has predict_proba
+        start = time.perf_counter()
         if hasattr(model, "predict_proba"):
-            y_pred_proba = model.predict_proba(X_test)[:, 1]
+            proba = model.predict_proba(X_test)
+            y_pred = model.classes_[np.argmax(proba, axis=1)]
+            score = proba[:, 1]
         else:
             logger.warning("Model does not support predict_proba, using predict for ROC-AUC.")
-            y_pred_proba = model.predict(X_test)
-        
-        y_pred = model.predict(X_test)
+            y_pred = model.predict(X_test)
+            score = y_pred.astype(np.float64)
+        inference_seconds = time.perf_counter() - start
+
+        positive = model.classes_[1]
+        y_true = y_test == positive
+        y_pred = y_pred == positive
 
-        # Calculate metrics
-        roc_auc = roc_auc_score(y_test, y_pred_proba)
-        precision = precision_score(y_test, y_pred, zero_division=0)
-        recall = recall_score(y_test, y_pred, zero_division=0)
-        conf_matrix = confusion_matrix(y_test, y_pred)
+        start = time.perf_counter()
+        groups = group_scores(score)
+        sweep = threshold_sweep(y_true, score, groups)
+        at_default = metrics_at(y_true, y_pred)
+        calibration = calibration_bins(y_true, score, params.n_calibration_bins)
+        intervals = {}
+        if params.n_bootstrap > 0:
+            samples = bootstrap_metrics(
+                y_true, score, y_pred,
+                n_bootstrap=params.n_bootstrap,
+                batch_size=params.bootstrap_batch_size,
+                random_state=params.random_state,
+                groups=groups,
+            )
+            intervals = confidence_intervals(samples, params.confidence)
+        metrics_seconds = time.perf_counter() - start
 
-        logger.info(f"ROC-AUC: {roc_auc:.4f}")
+        roc_auc = sweep["roc_auc"]
+        precision = at_default["precision"]
+        recall = at_default["recall"]
+        conf_matrix = at_default["confusion_matrix"]
+        best = int(np.argmax(sweep["f1"]))
+
+        report = {
+            "n_rows": int(len(y_true)),
+            "roc_auc": roc_auc,
+            "pr_auc": sweep["pr_auc"],
+            "precision": precision,
+            "recall": recall,
+            "f1": at_default["f1"],
+            "accuracy": at_default["accuracy"],
+            "confusion_matrix": conf_matrix.tolist(),
+            "best_f1_threshold": float(sweep["thresholds"][best]),
+            "best_f1": float(sweep["f1"][best]),
+            "threshold_sweep": {name: sweep[name].tolist() for name in ("thresholds", "precision", "recall", "f1")},
+            "calibration": {name: (value.tolist() if isinstance(value, np.ndarray) else value)
+                            for name, value in calibration.items()},
+            "confidence_intervals": intervals,
+            "confidence": params.confidence,
+            "n_bootstrap": params.n_bootstrap,
+            "inference_seconds": inference_seconds,
+            "metrics_seconds": metrics_seconds,
+        }
+
+        logger.info(f"ROC-AUC: {roc_auc:.4f} | PR-AUC: {sweep['pr_auc']:.4f}")
         logger.info(f"Precision: {precision:.4f}")
         logger.info(f"Recall: {recall:.4f}")
+        logger.info(f"Best F1 {report['best_f1']:.4f} at threshold {report['best_f1_threshold']:.3f}")
+        logger.info(f"Expected calibration error: {calibration['expected_calibration_error']:.4f}")
+        for name, interval in intervals.items():
+            logger.info(f"{name} {params.confidence:.0%} CI: [{interval['lower']:.4f}, {interval['upper']:.4f}]")
         logger.info(f"Confusion Matrix:\n{conf_matrix}")
+        logger.info(f"Inference {inference_seconds:.2f}s | all metrics {metrics_seconds:.2f}s")
+
+        log_metadata(
+            metadata={
+                "evaluation": {
+                    name: report[name]
+                    for name in ("n_rows", "roc_auc", "pr_auc", "precision", "recall", "f1", "accuracy",
+                                 "confusion_matrix", "best_f1_threshold", "best_f1")
+                },
+                "confidence_intervals": intervals,
+                "threshold_sweep": _sweep_at(sweep, LOGGED_THRESHOLDS),
+                "calibration": report["calibration"],
+                "evaluation_timing": {"inference_seconds": inference_seconds, "metrics_seconds": metrics_seconds},
+            },
+            infer_model=True,
+        )
 
-        return roc_auc, precision, recall, conf_matrix
+        return roc_auc, precision, recall, conf_matrix, report
 
     except Exception as e:
         logger.error(f"Error in model evaluation: {e}")
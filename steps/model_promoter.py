@@ -5,13 +5,20 @@ from zenml.logger import get_logger
 logger = get_logger(__name__)
 
 @step(enable_cache=False)
-def promote_model():
+def promote_model(approved: bool = True):
     """
     Promotes the latest 'vehicle_insurance_model' version to 'current'.
+
+    With ``approved=False`` (e.g. the candidate did not beat the production
+    model on the same test rows), the production version is left as is.
     """
     client = Client()
     
     try:
+        if not approved:
+            logger.info("Candidate model version not approved; keeping the current production version.")
+            return
+
         # Fetch the latest version of the model
         # The training step in the pipeline will have created a new version which is now 'latest'
         latest_version = client.get_model_version("vehicle_insurance_model", "latest")
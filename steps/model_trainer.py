@@ -1,24 +1,47 @@
 # ZenML step for training the machine learning model.
-# Trains a Random Forest classifier with SMOTEENN for class imbalance.
+# Trains a Random Forest classifier with a configurable class-imbalance strategy.
 
-"""Balances classes with SMOTEENN and trains a RandomForest classifier."""
+"""Balances classes (SMOTEENN by default) and trains a RandomForest classifier."""
 
-from typing import Tuple
+import time
+from typing import Any, Dict, Optional, Tuple, Union
 import numpy as np
-from zenml import step, ArtifactConfig, Model
+from zenml import step, ArtifactConfig, Model, log_metadata
 from zenml.logger import get_logger
 from sklearn.base import ClassifierMixin
 from sklearn.ensemble import RandomForestClassifier
-from imblearn.combine import SMOTEENN
+from threadpoolctl import threadpool_limits
 from typing_extensions import Annotated
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from utils.forest_growth import grow_forest
+from utils.imbalance import IMBALANCE_STRATEGIES, rebalance
+from utils.parallel import available_cores, blas_threads_per_job, resolve_n_jobs
 
 logger = get_logger(__name__)
 
 class ModelTrainerParameters(BaseModel):
     """Parameters for model training."""
-    n_estimators: int = 350
+    n_estimators: int = Field(350, description="Trees to fit; the hard cap when oob_early_stopping is on")
     random_state: int = 42
+    max_depth: Optional[int] = Field(None, description="Maximum tree depth (None grows until leaves are pure)")
+    min_samples_leaf: int = Field(1, description="Minimum samples per leaf")
+    max_features: Union[str, float, None] = Field("sqrt", description="Features considered per split")
+    oob_early_stopping: bool = Field(False, description="Grow the forest in increments until the OOB ROC-AUC plateaus")
+    tree_increment: int = Field(25, description="Trees added per increment with oob_early_stopping")
+    min_estimators: int = Field(50, description="Never stop early below this many trees")
+    oob_tolerance: float = Field(5e-4, description="Minimum OOB ROC-AUC gain that counts as an improvement")
+    oob_patience: int = Field(2, description="Increments without improvement before stopping")
+    n_jobs: Optional[int] = Field(-1, description="Parallel jobs for resampling and fitting; -1 uses every available core")
+    resampling_n_jobs: Optional[int] = Field(None, description="Jobs for the SMOTE/ENN neighbour searches (default: n_jobs)")
+    blas_threads: Optional[int] = Field(None, description="BLAS threads per job (default: available cores // jobs)")
+    imbalance_strategy: str = Field("smoteenn", description=f"One of {IMBALANCE_STRATEGIES}")
+    sampling_strategy: str = Field("minority", description="SMOTE sampling strategy")
+    smote_k_neighbors: int = Field(5, description="Neighbours used by SMOTE to synthesize samples")
+    enn_n_neighbors: int = Field(3, description="Neighbours used by ENN to clean samples")
+    subsample_rows: int = Field(200_000, description="Stratified subsample size for smoteenn_subsample")
+    undersampling_ratio: Union[float, str] = Field("auto", description="RandomUnderSampler sampling_strategy for undersample")
+    class_weight: str = Field("balanced", description="Forest class_weight for the class_weight strategy")
 
 @step(
     model=Model(
@@ -35,31 +58,116 @@ def model_trainer(
 ) -> Tuple[
     Annotated[ClassifierMixin, ArtifactConfig(name="model", tags=["model"])],
     Annotated[object, ArtifactConfig(name="preprocessor", tags=["preprocessing"])],
+    Annotated[Dict[str, Any], ArtifactConfig(name="oob_curve", tags=["metric"])],
 ]:
     """
     Model training step that handles:
-    1. SMOTEENN for class imbalance
-    2. Model training (RandomForest)
+    1. Class imbalance (``imbalance_strategy``: SMOTEENN on all rows or a
+       stratified subsample, random undersampling, or class weights)
+    2. Model training (RandomForest), either with exactly ``n_estimators``
+       trees or, with ``oob_early_stopping``, grown in increments until the
+       OOB ROC-AUC plateaus (``n_estimators`` is then the hard cap)
+
+    The SMOTE and ENN neighbour searches and the forest fit run on
+    ``n_jobs`` threads, with BLAS capped so jobs x BLAS threads stays
+    within the available cores. Per-phase wall times are logged as step
+    metadata.
     """
     try:
         logger.info("Starting Model Training...")
+        cores = available_cores()
+        n_jobs = resolve_n_jobs(params.n_jobs)
+        resampling_n_jobs = resolve_n_jobs(params.resampling_n_jobs if params.resampling_n_jobs is not None else params.n_jobs)
+        logger.info(f"Available cores: {cores} | n_jobs={n_jobs} | resampling_n_jobs={resampling_n_jobs}")
         
-        # 1. Apply SMOTEENN
-        logger.info("Applying SMOTEENN to training data...")
-        smt = SMOTEENN(sampling_strategy="minority", random_state=params.random_state)
-        X_train_resampled, y_train_resampled = smt.fit_resample(X_train, y_train)
-        logger.info(f"SMOTEENN complete. Resampled shape: {X_train_resampled.shape}")
+        # 1. Handle class imbalance
+        logger.info(f"Applying imbalance strategy '{params.imbalance_strategy}' to training data...")
+        resampling_blas = blas_threads_per_job(resampling_n_jobs, params.blas_threads)
+        start = time.perf_counter()
+        with threadpool_limits(limits=resampling_blas, user_api="blas"):
+            X_train_resampled, y_train_resampled, class_weight = rebalance(
+                X_train,
+                y_train,
+                strategy=params.imbalance_strategy,
+                sampling_strategy=params.sampling_strategy,
+                random_state=params.random_state,
+                k_neighbors=params.smote_k_neighbors,
+                enn_n_neighbors=params.enn_n_neighbors,
+                subsample_rows=params.subsample_rows,
+                undersampling_ratio=params.undersampling_ratio,
+                class_weight=params.class_weight,
+                n_jobs=resampling_n_jobs,
+            )
+        resampling_seconds = time.perf_counter() - start
+        logger.info(f"Resampling complete in {resampling_seconds:.1f}s. Resampled shape: {X_train_resampled.shape}")
         
         # 2. Train Model
-        logger.info(f"Training RandomForestClassifier with n_estimators={params.n_estimators}...")
         model = RandomForestClassifier(
             n_estimators=params.n_estimators, 
-            random_state=params.random_state
+            random_state=params.random_state,
+            max_depth=params.max_depth,
+            min_samples_leaf=params.min_samples_leaf,
+            max_features=params.max_features,
+            class_weight=class_weight,
+            n_jobs=n_jobs,
+        )
+        fit_blas = blas_threads_per_job(n_jobs, params.blas_threads)
+        start = time.perf_counter()
+        with threadpool_limits(limits=fit_blas, user_api="blas"):
+            if params.oob_early_stopping:
+                logger.info(
+                    f"Growing RandomForestClassifier by {params.tree_increment} trees up to "
+                    f"{params.n_estimators} with OOB early stopping, n_jobs={n_jobs}..."
+                )
+                model, oob_curve = grow_forest(
+                    model,
+                    X_train_resampled,
+                    y_train_resampled,
+                    increment=params.tree_increment,
+                    max_estimators=params.n_estimators,
+                    min_estimators=params.min_estimators,
+                    tolerance=params.oob_tolerance,
+                    patience=params.oob_patience,
+                )
+            else:
+                logger.info(f"Training RandomForestClassifier with n_estimators={params.n_estimators}, n_jobs={n_jobs}...")
+                model.fit(X_train_resampled, y_train_resampled)
+                oob_curve = {"chosen_n_estimators": params.n_estimators, "stopped_early": False}
+        fit_seconds = time.perf_counter() - start
+        # The artifact should not carry the training node's thread count
+        # into serving; consumers choose their own n_jobs.
+        model.set_params(n_jobs=None)
+        logger.info(f"Model training complete in {fit_seconds:.1f}s.")
+
+        log_metadata(
+            metadata={
+                "training_timing": {
+                    "resampling_seconds": resampling_seconds,
+                    "fit_seconds": fit_seconds,
+                    "total_seconds": resampling_seconds + fit_seconds,
+                },
+                "training_parallelism": {
+                    "available_cores": cores,
+                    "n_jobs": n_jobs,
+                    "resampling_n_jobs": resampling_n_jobs,
+                    "resampling_blas_threads": resampling_blas,
+                    "fit_blas_threads": fit_blas,
+                },
+                "forest": {
+                    "n_estimators": model.n_estimators,
+                    "oob_early_stopping": params.oob_early_stopping,
+                    "max_estimators": params.n_estimators,
+                    "best_oob_roc_auc": oob_curve.get("best_oob_roc_auc"),
+                },
+                "training_data": {
+                    "imbalance_strategy": params.imbalance_strategy,
+                    "rows_before_resampling": int(len(X_train)),
+                    "rows_after_resampling": int(len(X_train_resampled)),
+                },
+            }
         )
-        model.fit(X_train_resampled, y_train_resampled)
-        logger.info("Model training complete.")
         
-        return model, preprocessor
+        return model, preprocessor, oob_curve
         
     except Exception as e:
         logger.error(f"Error in model training: {e}")
@@ -1,3 +1,4 @@
+from typing import List, Optional
 from zenml import step
 from zenml.logger import get_logger
 
@@ -5,12 +6,18 @@ logger = get_logger(__name__)
 
 
 @step
-def decide_retrain(drift_detected: bool) -> bool:
+def decide_retrain(drift_detected: bool, drifted_batches: Optional[List[str]] = None) -> bool:
     """
     Decide whether retraining is required.
+
+    When several batches were checked, ``drift_detected`` is the combined
+    verdict and ``drifted_batches`` names the batches that drifted.
     """
     if drift_detected:
-        logger.warning("Data drift detected — retraining required.")
+        if drifted_batches:
+            logger.warning(f"Data drift detected in batches {drifted_batches} — retraining required.")
+        else:
+            logger.warning("Data drift detected — retraining required.")
         return True
 
     logger.info("No significant drift detected — retraining not required.")
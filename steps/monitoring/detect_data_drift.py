@@ -1,54 +1,133 @@
-import pandas as pd
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+from typing_extensions import Annotated
 from zenml import step
 from zenml.logger import get_logger
 
-logger = get_logger(__name__)
+from utils.drift_engine import compare_profiles
+from utils.profile_utils import profile_iqr
 
-NUMERIC_FEATURES = ["Age", "Annual_Premium", "Vintage"]
+logger = get_logger(__name__)
 
 MEAN_THRESHOLD = 0.20
 IQR_THRESHOLD = 0.25
+# Reported per feature (psi_exceeded); not part of the drift verdict.
+PSI_THRESHOLD = 0.20
 MIN_DRIFTED_FEATURES = 2
 
 
-def _iqr(series: pd.Series) -> float:
-    return series.quantile(0.75) - series.quantile(0.25)
-
-
-@step
-def detect_data_drift(
-    reference_df: pd.DataFrame,
-    incoming_df: pd.DataFrame,
-) -> Tuple[bool, List[str]]:
+def drift_report(reference_profile: dict, incoming_profile: dict) -> Dict[str, dict]:
     """
-    Detects data drift using mean and IQR comparison.
+    Per-feature drift statistics and verdicts.
+
+    Every feature histogrammed in both profiles gets PSI, KS (numeric
+    only) and Jensen-Shannon values, and ``psi_exceeded`` when its PSI is
+    above ``PSI_THRESHOLD``. These are informational. The verdict is the
+    mean/IQR rule: a numeric feature present in both profiles drifts when
+    its relative mean or IQR change exceeds its threshold.
     """
+    report = {
+        feature: dict(metrics, psi_exceeded=bool(metrics["psi"] > PSI_THRESHOLD), drifted=False)
+        for feature, metrics in compare_profiles(reference_profile, incoming_profile).items()
+    }
 
-    drifted_features = []
+    for feature, ref in reference_profile["numeric"].items():
+        new = incoming_profile["numeric"].get(feature)
+        if new is None or ref["quantiles"] is None or new["quantiles"] is None:
+            continue
 
-    logger.info("Starting data drift detection...")
+        ref_iqr = profile_iqr(ref, reference_profile["quantile_levels"])
+        new_iqr = profile_iqr(new, incoming_profile["quantile_levels"])
 
-    for feature in NUMERIC_FEATURES:
-        ref_mean = reference_df[feature].mean()
-        new_mean = incoming_df[feature].mean()
+        mean_drift = abs(new["mean"] - ref["mean"]) / ref["mean"]
+        iqr_drift = abs(new_iqr - ref_iqr) / ref_iqr
 
-        mean_drift = abs(new_mean - ref_mean) / ref_mean
-        iqr_drift = abs(
-            _iqr(incoming_df[feature]) - _iqr(reference_df[feature])
-        ) / _iqr(reference_df[feature])
+        entry = report.setdefault(feature, {"drifted": False})
+        entry.update(mean_drift=mean_drift, iqr_drift=iqr_drift)
+        entry["drifted"] = bool(mean_drift > MEAN_THRESHOLD or iqr_drift > IQR_THRESHOLD)
 
+    return report
+
+
+def evaluate_drift(
+    reference_profile: dict,
+    incoming_profile: dict,
+) -> Tuple[bool, List[str], Dict[str, dict]]:
+    """
+    Drift verdict for one incoming profile: whether at least
+    ``MIN_DRIFTED_FEATURES`` features drifted, which ones, and the report.
+    """
+    report = drift_report(reference_profile, incoming_profile)
+
+    for feature, metrics in report.items():
         logger.info(
-            f"{feature} | mean_drift={mean_drift:.3f}, iqr_drift={iqr_drift:.3f}"
+            f"{feature} | "
+            + ", ".join(
+                f"{name}={value:.3f}" for name, value in metrics.items()
+                if isinstance(value, float)
+            )
         )
 
-        if mean_drift > MEAN_THRESHOLD or iqr_drift > IQR_THRESHOLD:
-            drifted_features.append(feature)
+    drifted_features = [feature for feature, metrics in report.items() if metrics["drifted"]]
+    return len(drifted_features) >= MIN_DRIFTED_FEATURES, drifted_features, report
 
-    drift_detected = len(drifted_features) >= MIN_DRIFTED_FEATURES
+
+@step
+def detect_data_drift(
+    reference_profile: dict,
+    incoming_profile: dict,
+) -> Tuple[
+    Annotated[bool, "drift_detected"],
+    Annotated[List[str], "drifted_features"],
+    Annotated[dict, "drift_report"],
+]:
+    """
+    Detects data drift by comparing the reference and incoming data
+    profiles: PSI, KS and Jensen-Shannon on every feature, plus the mean
+    and IQR comparison on numeric features.
+    """
+
+    logger.info("Starting data drift detection...")
+
+    drift_detected, drifted_features, report = evaluate_drift(reference_profile, incoming_profile)
 
     logger.info(
         f"Drift detected={drift_detected} | Drifted features={drifted_features}"
     )
 
-    return drift_detected, drifted_features
+    return drift_detected, drifted_features, report
+
+
+@step
+def detect_batch_drift(
+    reference_profile: dict,
+    incoming_profiles: Dict[str, dict],
+) -> Tuple[
+    Annotated[bool, "drift_detected"],
+    Annotated[List[str], "drifted_batches"],
+    Annotated[dict, "drift_reports"],
+]:
+    """
+    Detects data drift in every incoming batch against the same reference.
+    Drift is detected when any batch drifted; ``drift_reports`` holds one
+    report per batch tag.
+    """
+    reports = {}
+    for batch_tag, incoming_profile in incoming_profiles.items():
+        logger.info(f"Drift detection for batch '{batch_tag}'...")
+        drift_detected, drifted_features, report = evaluate_drift(reference_profile, incoming_profile)
+        reports[batch_tag] = {
+            "n_rows": incoming_profile["n_rows"],
+            "drift_detected": drift_detected,
+            "drifted_features": drifted_features,
+            "features": report,
+        }
+        logger.info(
+            f"Batch '{batch_tag}' | Drift detected={drift_detected} | "
+            f"Drifted features={drifted_features}"
+        )
+
+    drifted_batches = [tag for tag, report in reports.items() if report["drift_detected"]]
+    logger.info(
+        f"Checked {len(reports)} batches | Drifted batches={drifted_batches}"
+    )
+    return bool(drifted_batches), drifted_batches, reports
@@ -0,0 +1,299 @@
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from typing_extensions import Annotated
+from pydantic import BaseModel, Field
+from zenml import step, ArtifactConfig, Model
+from zenml.client import Client
+from zenml.logger import get_logger
+
+from constant import COLLECTION_NAME, MODEL_NAME, REFERENCE_BATCH_TAG
+from utils.batch_registry import unchecked_batch_tags
+from utils.db_utils import build_query, get_data_as_dataframe
+from utils.profile_utils import build_profile, NUMERIC_FEATURES, CATEGORICAL_FEATURES
+from utils.server_profile import profile_collection_server_side
+from utils.sketches import DEFAULT_SKETCH_K
+from utils.streaming_profile import profile_collection
+
+logger = get_logger(__name__)
+
+REFERENCE_PROFILE_ARTIFACT = "reference_profile"
+# Drift is measured against the profile of the production model's training data.
+REFERENCE_MODEL_STAGE = "production"
+
+# Same model as the training steps, so the profile is linked to the version
+# the run trains.
+REFERENCE_MODEL = Model(
+    name=MODEL_NAME,
+    description="RandomForest model for vehicle insurance claim prediction",
+)
+PROFILING_MODES = ("in_memory", "streaming", "server")
+
+
+class DataProfileParameters(BaseModel):
+    """Features summarized in a data profile."""
+    numeric_features: List[str] = NUMERIC_FEATURES
+    categorical_features: List[str] = CATEGORICAL_FEATURES
+
+
+class StreamingProfileParameters(DataProfileParameters):
+    """Source and resource limits for profiling a batch straight from MongoDB."""
+    collection_name: str = COLLECTION_NAME
+    batch_tag: Optional[str] = None
+    batch_size: int = Field(default=50_000, gt=0)
+    n_workers: int = Field(default=1, ge=1)
+    partition_key: str = "id"
+    sketch_k: int = Field(default=DEFAULT_SKETCH_K, ge=8)
+
+
+class ServerProfileParameters(DataProfileParameters):
+    """Source for profiling a batch inside MongoDB with aggregation pipelines."""
+    collection_name: str = COLLECTION_NAME
+    batch_tag: Optional[str] = None
+    use_percentile: Optional[bool] = Field(
+        default=None,
+        description="Use $percentile (MongoDB >= 7.0); None tries it and falls back to $bucketAuto",
+    )
+
+
+
+class MultiBatchProfileParameters(DataProfileParameters):
+    """Batches to profile in one run and how to profile them."""
+    collection_name: str = COLLECTION_NAME
+    batch_tags: Optional[List[str]] = Field(
+        default=None,
+        description="Batch tags to check; None selects every batch not yet checked",
+    )
+    exclude_batch_tags: List[str] = Field(
+        default=[REFERENCE_BATCH_TAG],
+        description="Tags never selected automatically (the reference batch)",
+    )
+    profiling_mode: str = "in_memory"
+    max_concurrent_batches: int = Field(default=4, ge=1)
+    batch_size: int = Field(default=50_000, gt=0)
+    sketch_k: int = Field(default=DEFAULT_SKETCH_K, ge=8)
+
+
+def profile_batch(batch_tag: str, reference_profile: dict, params: MultiBatchProfileParameters) -> dict:
+    """Profile one batch with the method selected by ``params.profiling_mode``."""
+    query = build_query(batch_tag=batch_tag)
+    if params.profiling_mode == "server":
+        return profile_collection_server_side(
+            collection_name=params.collection_name,
+            query=query,
+            numeric_features=params.numeric_features,
+            categorical_features=params.categorical_features,
+            reference=reference_profile,
+        )
+    if params.profiling_mode == "streaming":
+        return profile_collection(
+            collection_name=params.collection_name,
+            query=query,
+            numeric_features=params.numeric_features,
+            categorical_features=params.categorical_features,
+            batch_size=params.batch_size,
+            sketch_k=params.sketch_k,
+            reference=reference_profile,
+        )
+    df = get_data_as_dataframe(
+        params.collection_name,
+        query,
+        batch_size=params.batch_size,
+        columns=params.numeric_features + params.categorical_features,
+    )
+    return build_profile(
+        df, params.numeric_features, params.categorical_features, reference=reference_profile
+    )
+
+
+@step(model=REFERENCE_MODEL)
+def build_reference_profile(
+    df: pd.DataFrame,
+    params: DataProfileParameters,
+) -> Annotated[
+    dict,
+    ArtifactConfig(name=REFERENCE_PROFILE_ARTIFACT, tags=["reference", "profile", "monitoring"]),
+]:
+    """
+    Summarizes the training data into a compact reference profile
+    used by the monitoring pipeline instead of the raw training set.
+    """
+    profile = build_profile(df, params.numeric_features, params.categorical_features)
+    logger.info(
+        f"Reference profile built | rows={profile['n_rows']} | "
+        f"numeric={list(profile['numeric'])} | categorical={list(profile['categorical'])}"
+    )
+    return profile
+
+
+@step(enable_cache=False, model=REFERENCE_MODEL)
+def stream_reference_profile(
+    params: StreamingProfileParameters,
+) -> Annotated[
+    dict,
+    ArtifactConfig(name=REFERENCE_PROFILE_ARTIFACT, tags=["reference", "profile", "monitoring"]),
+]:
+    """
+    Profiles the training batch chunk by chunk from the MongoDB cursor,
+    for pipelines that never load it into one DataFrame.
+    """
+    profile = profile_collection(
+        collection_name=params.collection_name,
+        query=build_query(batch_tag=params.batch_tag),
+        numeric_features=params.numeric_features,
+        categorical_features=params.categorical_features,
+        batch_size=params.batch_size,
+        n_workers=params.n_workers,
+        partition_key=params.partition_key,
+        sketch_k=params.sketch_k,
+    )
+
+    if profile["n_rows"] == 0:
+        raise ValueError(
+            f"No data found in collection '{params.collection_name}' "
+            f"for batch_tag='{params.batch_tag}'"
+        )
+
+    logger.info(f"Reference profile built (streaming) | rows={profile['n_rows']}")
+    return profile
+
+
+@step(enable_cache=False)
+def load_reference_profile() -> dict:
+    """
+    Loads the reference profile linked to the production model version,
+    so drift is measured against the data that model was trained on, not
+    against whichever training run produced a profile last.
+    """
+    model_version = Client().get_model_version(MODEL_NAME, REFERENCE_MODEL_STAGE)
+    artifact = model_version.get_artifact(REFERENCE_PROFILE_ARTIFACT)
+    if artifact is None:
+        raise RuntimeError(
+            f"Model version '{model_version.name}' ({REFERENCE_MODEL_STAGE}) has no "
+            f"'{REFERENCE_PROFILE_ARTIFACT}' artifact; retrain or re-promote a version with one"
+        )
+    logger.info(
+        f"Loaded reference profile version '{artifact.version}' of model version "
+        f"'{model_version.name}' ({REFERENCE_MODEL_STAGE})"
+    )
+    return artifact.load()
+
+
+@step
+def profile_incoming_data(
+    df: pd.DataFrame,
+    reference_profile: dict,
+    params: DataProfileParameters,
+) -> dict:
+    """
+    Summarizes an incoming batch into the same profile format,
+    with histograms binned on the reference profile's layout.
+    """
+    profile = build_profile(
+        df, params.numeric_features, params.categorical_features, reference=reference_profile
+    )
+    logger.info(f"Incoming batch profiled | rows={profile['n_rows']}")
+    return profile
+
+
+@step(enable_cache=False)
+def stream_incoming_profile(
+    reference_profile: dict,
+    params: StreamingProfileParameters,
+) -> dict:
+    """
+    Profiles an incoming batch chunk by chunk from the MongoDB cursor,
+    using mergeable sketches, so memory stays flat regardless of batch size.
+    """
+    profile = profile_collection(
+        collection_name=params.collection_name,
+        query=build_query(batch_tag=params.batch_tag),
+        numeric_features=params.numeric_features,
+        categorical_features=params.categorical_features,
+        batch_size=params.batch_size,
+        n_workers=params.n_workers,
+        partition_key=params.partition_key,
+        sketch_k=params.sketch_k,
+        reference=reference_profile,
+    )
+
+    if profile["n_rows"] == 0:
+        raise ValueError(
+            f"No data found in collection '{params.collection_name}' "
+            f"for batch_tag='{params.batch_tag}'"
+        )
+
+    logger.info(f"Incoming batch profiled (streaming) | rows={profile['n_rows']}")
+    return profile
+
+
+@step(enable_cache=False)
+def server_incoming_profile(
+    reference_profile: dict,
+    params: ServerProfileParameters,
+) -> dict:
+    """
+    Profiles an incoming batch inside MongoDB with one aggregation,
+    so only per-feature summaries are transferred to the client.
+    """
+    profile = profile_collection_server_side(
+        collection_name=params.collection_name,
+        query=build_query(batch_tag=params.batch_tag),
+        numeric_features=params.numeric_features,
+        categorical_features=params.categorical_features,
+        reference=reference_profile,
+        use_percentile=params.use_percentile,
+    )
+
+    if profile["n_rows"] == 0:
+        raise ValueError(
+            f"No data found in collection '{params.collection_name}' "
+            f"for batch_tag='{params.batch_tag}'"
+        )
+
+    logger.info(f"Incoming batch profiled (server-side) | rows={profile['n_rows']}")
+    return profile
+
+
+@step(enable_cache=False)
+def profile_incoming_batches(
+    reference_profile: dict,
+    params: MultiBatchProfileParameters,
+) -> Annotated[Dict[str, dict], "incoming_profiles"]:
+    """
+    Profiles several incoming batches concurrently against one reference,
+    reusing the shared MongoDB client. Returns one profile per batch tag;
+    empty batches are skipped.
+    """
+    if params.profiling_mode not in PROFILING_MODES:
+        raise ValueError(
+            f"Unknown profiling_mode '{params.profiling_mode}', expected one of {PROFILING_MODES}"
+        )
+
+    batch_tags = params.batch_tags
+    if batch_tags is None:
+        batch_tags = unchecked_batch_tags(params.collection_name, exclude=params.exclude_batch_tags)
+    if not batch_tags:
+        logger.info("No batches to profile.")
+        return {}
+
+    workers = min(params.max_concurrent_batches, len(batch_tags))
+    logger.info(
+        f"Profiling {len(batch_tags)} batches ({params.profiling_mode}) with {workers} workers: {batch_tags}"
+    )
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        profiles = list(executor.map(
+            lambda tag: profile_batch(tag, reference_profile, params), batch_tags
+        ))
+
+    incoming_profiles = {}
+    for tag, profile in zip(batch_tags, profiles):
+        if profile["n_rows"] == 0:
+            logger.warning(
+                f"No data found in collection '{params.collection_name}' for batch_tag='{tag}'; skipped"
+            )
+            continue
+        logger.info(f"Batch '{tag}' profiled | rows={profile['n_rows']}")
+        incoming_profiles[tag] = profile
+
+    return incoming_profiles
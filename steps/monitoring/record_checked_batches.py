@@ -0,0 +1,18 @@
+from zenml import step
+from zenml.logger import get_logger
+
+from utils.batch_registry import mark_batches_checked
+
+logger = get_logger(__name__)
+
+
+@step(enable_cache=False)
+def record_checked_batches(collection_name: str, drift_reports: dict) -> None:
+    """
+    Marks every batch in ``drift_reports`` as checked, so later runs
+    selecting "all batches not yet checked" skip them.
+    """
+    mark_batches_checked(
+        collection_name,
+        {tag: report["drift_detected"] for tag, report in drift_reports.items()},
+    )
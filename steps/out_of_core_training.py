@@ -0,0 +1,153 @@
+# ZenML step for training on collections larger than memory.
+# Streams MongoDB twice: once to fit the preprocessor, once to fit sub-forests.
+
+"""Fits the preprocessor and a merged forest of per-chunk sub-forests from a MongoDB stream."""
+
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+from typing_extensions import Annotated
+from pydantic import BaseModel, Field
+from zenml import step, ArtifactConfig, Model, log_metadata
+from zenml.logger import get_logger
+from sklearn.base import ClassifierMixin
+from threadpoolctl import threadpool_limits
+
+from materializers import ArrowDataFrameMaterializer, MmapNumpyMaterializer
+from constant import COLLECTION_NAME, FEATURE_COLUMNS, REFERENCE_BATCH_TAG, TARGET_COLUMN
+from steps.data_transformation import DataTransformationParameters, build_preprocessor
+from steps.model_trainer import ModelTrainerParameters
+from utils.db_utils import MongoDBClient, build_query
+from utils.dtype_policy import apply_dtype_policy
+from utils import out_of_core
+from utils.parallel import blas_threads_per_job, resolve_n_jobs
+
+logger = get_logger(__name__)
+
+
+class OutOfCoreParameters(BaseModel):
+    """Source, split and memory settings for out-of-core training."""
+    collection_name: str = COLLECTION_NAME
+    batch_tag: Optional[str] = Field(REFERENCE_BATCH_TAG, description="Batch to train on (None reads the whole collection)")
+    chunk_rows: int = Field(100_000, gt=0, description="Documents read per chunk from the cursor")
+    rows_per_subforest: int = Field(200_000, gt=0, description="Training rows fitted by each sub-forest")
+    test_size: float = Field(0.2, gt=0.0, lt=1.0, description="Fraction of ids (by hash) held out as test rows")
+    split_seed: int = Field(42, description="Seed of the id hash that assigns rows to the test split")
+    eval_rows: int = Field(200_000, gt=0, description="Maximum test rows kept for evaluation")
+
+
+@step(
+    enable_cache=False,
+    model=Model(
+        name="vehicle_insurance_model",
+        description="RandomForest model for vehicle insurance claim prediction",
+    ),
+    output_materializers={
+        "X_test": ArrowDataFrameMaterializer,
+        "X_test_transformed": MmapNumpyMaterializer,
+        "y_test_transformed": MmapNumpyMaterializer,
+    },
+)
+def train_out_of_core(
+    params: OutOfCoreParameters,
+    transformation_params: DataTransformationParameters,
+    trainer_params: ModelTrainerParameters,
+) -> Tuple[
+    Annotated[ClassifierMixin, ArtifactConfig(name="model", tags=["model"])],
+    Annotated[object, ArtifactConfig(name="preprocessor", tags=["preprocessing"])],
+    Annotated[pd.DataFrame, ArtifactConfig(name="X_test", tags=["test", "features"])],
+    Annotated[np.ndarray, ArtifactConfig(name="X_test_transformed", tags=["test", "transformed"])],
+    Annotated[np.ndarray, ArtifactConfig(name="y_test_transformed", tags=["test", "labels"])],
+]:
+    """
+    Out-of-core training step. Reads the collection in chunks of
+    ``chunk_rows`` documents, twice, without materializing it:
+    1. Fits the preprocessor (scalers with ``partial_fit``, one-hot
+       categories collected across chunks) on the training rows
+    2. Fits one sub-forest per ``rows_per_subforest`` training rows,
+       with the trainer's imbalance strategy and tree settings, and
+       merges them into one forest of about ``n_estimators`` trees
+
+    Rows are split by a hash of ``id``. A sample of at most ``eval_rows``
+    test rows is returned for evaluation.
+    """
+    try:
+        if trainer_params.oob_early_stopping:
+            logger.warning("oob_early_stopping is not supported out of core; fitting n_estimators trees")
+        n_jobs = resolve_n_jobs(trainer_params.n_jobs)
+        query = build_query(batch_tag=params.batch_tag)
+        columns = [out_of_core.ID_COLUMN] + FEATURE_COLUMNS + [TARGET_COLUMN]
+
+        def chunks():
+            for chunk in MongoDBClient().iter_dataframes(
+                params.collection_name, query, columns=columns, batch_size=params.chunk_rows
+            ):
+                yield apply_dtype_policy(chunk)
+
+        logger.info(
+            f"Starting out-of-core training on '{params.collection_name}' (batch_tag={params.batch_tag}) | "
+            f"chunk_rows={params.chunk_rows} | rows_per_subforest={params.rows_per_subforest}"
+        )
+        with threadpool_limits(limits=blas_threads_per_job(n_jobs, trainer_params.blas_threads), user_api="blas"):
+            model, preprocessor, X_test, X_test_transformed, y_test, report = out_of_core.train_out_of_core(
+                build_preprocessor(transformation_params),
+                chunks,
+                target_column=TARGET_COLUMN,
+                n_estimators=trainer_params.n_estimators,
+                rows_per_subforest=params.rows_per_subforest,
+                test_size=params.test_size,
+                split_seed=params.split_seed,
+                eval_rows=params.eval_rows,
+                forest_params={
+                    "max_depth": trainer_params.max_depth,
+                    "min_samples_leaf": trainer_params.min_samples_leaf,
+                    "max_features": trainer_params.max_features,
+                },
+                imbalance_params={
+                    "strategy": trainer_params.imbalance_strategy,
+                    "sampling_strategy": trainer_params.sampling_strategy,
+                    "k_neighbors": trainer_params.smote_k_neighbors,
+                    "enn_n_neighbors": trainer_params.enn_n_neighbors,
+                    "subsample_rows": trainer_params.subsample_rows,
+                    "undersampling_ratio": trainer_params.undersampling_ratio,
+                    "class_weight": trainer_params.class_weight,
+                },
+                random_state=trainer_params.random_state,
+                n_jobs=n_jobs,
+            )
+        if len(y_test) == 0:
+            raise ValueError("No test rows found; lower the split's test_size or check the source")
+
+        log_metadata(
+            metadata={
+                "training_timing": {
+                    "pass1_seconds": report["pass1_seconds"],
+                    "pass2_seconds": report["pass2_seconds"],
+                    "total_seconds": report["pass1_seconds"] + report["pass2_seconds"],
+                },
+                "forest": {
+                    "n_estimators": model.n_estimators,
+                    "subforests": report["subforests"],
+                    "trees_per_subforest": report["trees_per_subforest"],
+                    "rows_per_subforest": report["rows_per_subforest"],
+                },
+                "training_data": {
+                    "imbalance_strategy": trainer_params.imbalance_strategy,
+                    "train_rows": report["train_rows"],
+                    "test_rows": report["test_rows"],
+                    "missing_ids": report["missing_ids"],
+                    "overflow_rows": report["overflow_rows"],
+                    "eval_rows": report["eval_rows"],
+                    "chunks": report["chunks"],
+                },
+            }
+        )
+        logger.info(
+            f"Out-of-core training complete | {report['train_rows']} training rows | "
+            f"{model.n_estimators} trees from {report['subforests']} sub-forests"
+        )
+        return model, preprocessor, X_test, X_test_transformed, y_test
+
+    except Exception as e:
+        logger.error(f"Error in out-of-core training: {e}")
+        raise e
@@ -0,0 +1,2 @@
+# Initializes the tests package.
+"""Unit tests; run with ``python -m pytest`` from the repository root."""
@@ -0,0 +1,32 @@
+# Shared pytest fixtures.
+# Tests needing MongoDB run against MONGODB_URL and are skipped without a server.
+
+"""Fixtures for tests that need a reachable mongod."""
+
+import os
+
+import pymongo
+import pytest
+
+from constant import MONGODB_URL_KEY
+
+TEST_DATABASE = "vehicle-insurance-tests"
+
+
+@pytest.fixture(scope="session")
+def mongo_database():
+    """Scratch database on the mongod at ``MONGODB_URL`` (default localhost), dropped afterwards."""
+    mongo_url = os.getenv(MONGODB_URL_KEY, "mongodb://localhost:27017")
+    probe = pymongo.MongoClient(mongo_url, serverSelectionTimeoutMS=1_000)
+    try:
+        probe.admin.command("ping")
+    except pymongo.errors.PyMongoError:
+        pytest.skip(f"no mongod reachable at {mongo_url}")
+    finally:
+        probe.close()
+
+    from utils.db_utils import MongoDBClient
+
+    database = MongoDBClient(database_name=TEST_DATABASE).database
+    yield database
+    database.client.drop_database(database.name)
@@ -0,0 +1,81 @@
+# Tests for process-pool batch scoring.
+# A small forest scores synthetic Parquet input; MongoDB tests need a server.
+
+"""Scores from the process pool, the bounded in-flight window and both sinks."""
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from batch_scoring import MongoSink, ParquetSink, iter_parquet_chunks, score_chunks
+from benchmarks.synthetic import fit_preprocessor, make_dataframe
+from constant import FEATURE_COLUMNS, TARGET_COLUMN
+
+
+@pytest.fixture(scope="module")
+def fitted(tmp_path_factory):
+    df = make_dataframe(3_000, seed=0, signal=True)
+    preprocessor = fit_preprocessor(df[FEATURE_COLUMNS])
+    model = RandomForestClassifier(n_estimators=10, random_state=0)
+    model.fit(preprocessor.transform(df[FEATURE_COLUMNS]), df[TARGET_COLUMN])
+
+    directory = tmp_path_factory.mktemp("batch_scoring")
+    model_file = str(directory / "model.joblib")
+    joblib.dump((model, preprocessor), model_file)
+    incoming = make_dataframe(2_500, seed=1)
+    input_path = str(directory / "incoming.parquet")
+    incoming.to_parquet(input_path, index=False)
+    return model, preprocessor, model_file, incoming, input_path
+
+
+def test_two_workers_match_predict_proba_in_input_order(fitted, tmp_path):
+    model, preprocessor, model_file, incoming, input_path = fitted
+    output_path = str(tmp_path / "scores.parquet")
+
+    rows = score_chunks(iter_parquet_chunks(input_path, 400), model_file, ParquetSink(output_path), n_workers=2)
+    scores = pq.read_table(output_path).to_pandas()
+    proba = model.predict_proba(preprocessor.transform(incoming[FEATURE_COLUMNS]))
+
+    assert rows == len(scores) == len(incoming)
+    np.testing.assert_array_equal(scores["id"], incoming["id"])
+    np.testing.assert_allclose(scores["probability"], proba[:, 1])
+    np.testing.assert_array_equal(scores["prediction"], model.predict(preprocessor.transform(incoming[FEATURE_COLUMNS])))
+
+
+def test_at_most_max_in_flight_chunks_are_queued(fitted):
+    _, _, model_file, incoming, _ = fitted
+    pulled, queued = [0], []
+
+    def chunks():
+        for start in range(0, len(incoming), 100):
+            pulled[0] += 1
+            yield incoming.iloc[start:start + 100]
+
+    class CountingSink:
+        written = 0
+
+        def write(self, scores):
+            self.written += 1
+            queued.append(pulled[0] - self.written)
+
+        def close(self):
+            pass
+
+    score_chunks(chunks(), model_file, CountingSink(), n_workers=2, max_in_flight=3)
+    assert len(queued) == 25
+    assert max(queued) <= 3
+
+
+def test_mongo_sink_appends_every_row(fitted, mongo_database, monkeypatch):
+    _, _, model_file, incoming, input_path = fitted
+    monkeypatch.setenv("MONGO_DB_NAME", mongo_database.name)
+    mongo_database["scores"].drop()
+
+    rows = score_chunks(iter_parquet_chunks(input_path, 1_000), model_file, MongoSink("scores"), n_workers=2)
+    stored = pd.DataFrame(list(mongo_database["scores"].find({}, {"_id": 0})))
+    assert rows == len(stored) == len(incoming)
+    assert sorted(stored["id"]) == sorted(incoming["id"])
+    mongo_database["scores"].drop()
@@ -0,0 +1,64 @@
+# Tests for the MongoDB helpers.
+# Tests that need a server run against the mongod from conftest.py.
+
+"""Arrow batch reads, id_range bounds and snapshot-cached reads under concurrent inserts."""
+
+import pandas as pd
+
+from benchmarks.synthetic import make_documents
+from utils.db_utils import MongoDBClient, arrow_batches_to_dataframe, id_range, iter_arrow_batches
+from utils.snapshot_cache import SnapshotCache
+
+COLLECTION = "snapshot_reads"
+
+
+class ListCursor(list):
+    def batch_size(self, size):
+        return self
+
+
+def test_mixed_type_fields_are_read_instead_of_failing():
+    documents = make_documents(10, seed=0)
+    documents[3]["Region_Code"] = "28"
+    documents[4]["Annual_Premium"] = 2630
+    del documents[5]["Region_Code"]
+
+    df = arrow_batches_to_dataframe(iter_arrow_batches(ListCursor(documents), batch_size=4))
+    expected = pd.DataFrame(documents)
+    assert len(df) == 10
+    assert df["Region_Code"].iloc[3] == "28" and df["Region_Code"].iloc[2] == str(documents[2]["Region_Code"])
+    assert pd.isna(df["Region_Code"].iloc[5])
+    assert df["Region_Code"].iloc[8] == expected["Region_Code"].iloc[8]
+    assert df["Annual_Premium"].tolist() == expected["Annual_Premium"].astype(float).tolist()
+
+
+def test_id_range_leaves_missing_bounds_open():
+    query = {"batch_tag": "train"}
+    assert id_range(query) is query
+    assert id_range({}, upper=5) == {"_id": {"$lte": 5}}
+    assert id_range(query, lower=1, upper=5) == {"$and": [query, {"_id": {"$gt": 1, "$lte": 5}}]}
+
+
+def test_documents_inserted_during_a_cached_read_are_not_duplicated(mongo_database, tmp_path, monkeypatch):
+    collection = mongo_database[COLLECTION]
+    collection.drop()
+    documents = make_documents(300, seed=0)
+    collection.insert_many(documents[:200])
+
+    client = MongoDBClient(database_name=mongo_database.name)
+    cache = SnapshotCache(str(tmp_path), max_bytes=10**9)
+    fetch_as_dataframe = client.fetch_as_dataframe
+
+    def insert_then_fetch(*args, **kwargs):
+        # 50 documents land after the fingerprint, before the full read.
+        monkeypatch.setattr(client, "fetch_as_dataframe", fetch_as_dataframe)
+        collection.insert_many(documents[200:250])
+        return fetch_as_dataframe(*args, **kwargs)
+
+    monkeypatch.setattr(client, "fetch_as_dataframe", insert_then_fetch)
+    assert len(client.fetch_with_snapshot_cache(cache, COLLECTION)) == 200
+
+    collection.insert_many(documents[250:])
+    refreshed = client.fetch_with_snapshot_cache(cache, COLLECTION)
+    assert len(refreshed) == 300 and refreshed["id"].is_unique
+    collection.drop()
@@ -0,0 +1,131 @@
+# Tests for the on-disk caches and their shared LRU/statistics base.
+# Both caches run against a temporary directory with synthetic data.
+
+"""LRU eviction, per-cache statistics, and the snapshot and transform caches."""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_dataframe
+from utils.disk_cache import META_FILE, STAGING_DIR, DiskCache
+from utils.snapshot_cache import SnapshotCache
+from utils.transform_cache import TransformCache
+
+
+def write_entry(cache, key, size, last_used):
+    entry_dir = cache.entry_dir(key)
+    os.makedirs(entry_dir)
+    with open(os.path.join(entry_dir, "data"), "wb") as f:
+        f.write(b"\0" * size)
+    meta_path = os.path.join(entry_dir, META_FILE)
+    with open(meta_path, "w") as f:
+        f.write("{}")
+    os.utime(meta_path, (last_used, last_used))
+
+
+def test_evict_drops_least_recently_used_entries_first(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=2_500)
+    for i, key in enumerate(["a", "b", "c", "d"]):
+        write_entry(cache, key, 1_000, last_used=1_000 + i)
+    cache.touch("a")
+    evictions = cache.stats["evictions"]
+
+    cache.evict(keep="d")
+    assert sorted(os.listdir(tmp_path)) == ["a", "d"]
+    assert cache.stats["evictions"] == evictions + 2
+
+
+def test_evict_never_drops_the_kept_entry(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10)
+    write_entry(cache, "old", 1_000, last_used=1)
+    write_entry(cache, "new", 1_000, last_used=2)
+    cache.evict(keep="old")
+    assert os.listdir(tmp_path) == ["old"]
+
+
+def test_evict_skips_entries_still_being_written(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10)
+    write_entry(cache, "done", 1_000, last_used=2)
+    staging = cache.staging_dir("writing")
+    assert os.path.dirname(staging) == str(tmp_path / STAGING_DIR)
+    os.makedirs(staging)
+    with open(os.path.join(staging, "data"), "wb") as f:
+        f.write(b"\0" * 1_000)
+
+    cache.evict(keep="done")
+    assert os.path.isdir(staging)
+
+    cache.publish(staging, "writing")
+    assert not os.path.exists(staging)
+    assert os.listdir(cache.entry_dir("writing")) == ["data"]
+
+
+def test_each_cache_keeps_its_own_statistics(tmp_path):
+    snapshot_hits = SnapshotCache.stats["hits"]
+    transform = TransformCache(str(tmp_path / "transform"), max_bytes=10**9)
+    key = transform.make_key({"X": "fingerprint"}, {})
+
+    compute = lambda: ("preprocessor", {"X": np.arange(10.0)})
+    assert transform.get_or_compute(key, compute)[2] is False
+    preprocessor, arrays, hit = transform.get_or_compute(key, compute)
+
+    assert hit and preprocessor == "preprocessor"
+    np.testing.assert_array_equal(arrays["X"], np.arange(10.0))
+    assert SnapshotCache.stats["hits"] == snapshot_hits
+    assert "refreshes" in SnapshotCache.stats and "refreshes" not in TransformCache.stats
+
+
+def test_snapshot_cache_hit_refresh_and_miss(tmp_path):
+    cache = SnapshotCache(str(tmp_path), max_bytes=10**9)
+    df = make_dataframe(300, seed=0).drop(columns=["batch_tag"])
+    key = cache.make_key(collection="vehicles", query={})
+    fetched = []
+
+    def fetch(after_id, max_id):
+        fetched.append(after_id)
+        rows = df[df["id"] <= max_id]
+        if after_id is not None:
+            rows = rows[rows["id"] > after_id]
+        return rows.reset_index(drop=True)
+
+    def fingerprint(n):
+        return {"count": n, "max_id": int(df["id"].iloc[n - 1])}
+
+    first = cache.get_or_fetch(key, fingerprint(200), fetch)
+    pd.testing.assert_frame_equal(first, df.iloc[:200].reset_index(drop=True))
+
+    stats = dict(SnapshotCache.stats)
+    pd.testing.assert_frame_equal(cache.get_or_fetch(key, fingerprint(200), fetch), first)
+    assert fetched == [None] and SnapshotCache.stats["hits"] == stats["hits"] + 1
+
+    refreshed = cache.get_or_fetch(key, fingerprint(300), fetch)
+    assert fetched[-1] == int(df["id"].iloc[199])
+    assert SnapshotCache.stats["refreshes"] == stats["refreshes"] + 1
+    pd.testing.assert_frame_equal(refreshed, df.reset_index(drop=True))
+
+    cache.get_or_fetch(key, {"count": 250, "max_id": int(df["id"].iloc[-1])}, fetch)
+    assert fetched[-1] is None and SnapshotCache.stats["misses"] == stats["misses"] + 1
+
+
+def test_documents_inserted_during_a_read_are_appended_once(tmp_path):
+    cache = SnapshotCache(str(tmp_path), max_bytes=10**9)
+    df = make_dataframe(300, seed=0).drop(columns=["batch_tag"])
+    key = cache.make_key(collection="vehicles", query={})
+    visible = [200]
+
+    def fetch(after_id, max_id):
+        # 50 more documents land between the fingerprint and the read.
+        visible[0] += 50
+        rows = df.iloc[:visible[0]]
+        rows = rows[rows["id"] <= max_id]
+        if after_id is not None:
+            rows = rows[rows["id"] > after_id]
+        return rows.reset_index(drop=True)
+
+    fingerprint = lambda n: {"count": n, "max_id": int(df["id"].iloc[n - 1])}
+    assert len(cache.get_or_fetch(key, fingerprint(200), fetch)) == 200
+    refreshed = cache.get_or_fetch(key, fingerprint(250), fetch)
+    assert refreshed["id"].is_unique
+    pd.testing.assert_frame_equal(refreshed, df.iloc[:250].reset_index(drop=True))
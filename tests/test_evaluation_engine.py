@@ -0,0 +1,116 @@
+# Tests for the single-pass evaluation metrics.
+# Every metric is compared with its scikit-learn or naive counterpart.
+
+"""threshold_sweep, metrics_at, calibration_bins and bootstrap_metrics."""
+
+import numpy as np
+import pytest
+from sklearn.metrics import (
+    average_precision_score,
+    confusion_matrix,
+    f1_score,
+    precision_score,
+    recall_score,
+    roc_auc_score,
+)
+
+from utils.evaluation_engine import (
+    bootstrap_metrics,
+    calibration_bins,
+    confidence_intervals,
+    group_scores,
+    metrics_at,
+    threshold_sweep,
+)
+
+
+def scored(n=5_000, decimals=2, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.random(n) < 0.15
+    score = np.clip(0.3 * y + 0.7 * rng.random(n), 0.0, 1.0)
+    return y.astype(np.int64), np.round(score, decimals) if decimals is not None else score
+
+
+@pytest.mark.parametrize("decimals", [1, 2, None], ids=["ties", "few-ties", "distinct"])
+def test_threshold_sweep_matches_sklearn(decimals):
+    y, score = scored(decimals=decimals)
+    sweep = threshold_sweep(y, score)
+
+    assert sweep["roc_auc"] == pytest.approx(roc_auc_score(y, score), rel=1e-12)
+    assert sweep["pr_auc"] == pytest.approx(average_precision_score(y, score), rel=1e-12)
+    assert np.all(np.diff(sweep["thresholds"]) < 0)
+    for i in np.linspace(0, len(sweep["thresholds"]) - 1, 15).astype(int):
+        y_pred = score >= sweep["thresholds"][i]
+        assert sweep["precision"][i] == pytest.approx(precision_score(y, y_pred))
+        assert sweep["recall"][i] == pytest.approx(recall_score(y, y_pred))
+        assert sweep["f1"][i] == pytest.approx(f1_score(y, y_pred))
+
+
+def test_threshold_sweep_reuses_precomputed_groups():
+    y, score = scored()
+    groups = group_scores(score)
+    with_groups = threshold_sweep(y, score, groups)
+    without = threshold_sweep(y, score)
+    for name in ("thresholds", "precision", "recall", "f1"):
+        np.testing.assert_array_equal(with_groups[name], without[name])
+
+
+def test_metrics_at_matches_sklearn():
+    y, score = scored()
+    y_pred = score >= 0.5
+    metrics = metrics_at(y, y_pred)
+    np.testing.assert_array_equal(metrics["confusion_matrix"], confusion_matrix(y, y_pred))
+    assert metrics["precision"] == pytest.approx(precision_score(y, y_pred))
+    assert metrics["recall"] == pytest.approx(recall_score(y, y_pred))
+    assert metrics["f1"] == pytest.approx(f1_score(y, y_pred))
+    assert metrics_at(y, np.zeros_like(y))["precision"] == 0.0
+
+
+def test_calibration_bins_match_naive_binning():
+    y, score = scored(decimals=None)
+    table = calibration_bins(y, score, n_bins=5)
+    for b in range(5):
+        in_bin = (score >= b / 5) & ((score < (b + 1) / 5) | (b == 4))
+        assert table["counts"][b] == in_bin.sum()
+        assert table["mean_predicted"][b] == pytest.approx(score[in_bin].mean())
+        assert table["positive_rate"][b] == pytest.approx(y[in_bin].mean())
+    gaps = np.abs(table["mean_predicted"] - table["positive_rate"])
+    assert table["expected_calibration_error"] == pytest.approx(np.sum(table["counts"] * gaps) / len(y))
+
+
+def test_bootstrap_matches_row_resampling_in_distribution():
+    y, score = scored(n=4_000)
+    y_pred = score >= 0.5
+    samples = bootstrap_metrics(y, score, y_pred, n_bootstrap=400, random_state=0)
+
+    rng = np.random.default_rng(1)
+    naive = {"roc_auc": [], "f1": []}
+    for _ in range(400):
+        rows = rng.integers(0, len(y), len(y))
+        naive["roc_auc"].append(roc_auc_score(y[rows], score[rows]))
+        naive["f1"].append(f1_score(y[rows], y_pred[rows]))
+    for name, values in naive.items():
+        assert np.mean(samples[name]) == pytest.approx(np.mean(values), abs=0.004)
+        assert np.std(samples[name]) == pytest.approx(np.std(values), rel=0.2)
+
+
+def test_bootstrap_results_do_not_depend_on_batching():
+    y, score = scored(n=2_000)
+    y_pred = score >= 0.5
+    reference = bootstrap_metrics(y, score, y_pred, n_bootstrap=20, random_state=3)
+    small_batches = bootstrap_metrics(y, score, y_pred, n_bootstrap=20, batch_size=3, random_state=3)
+    tiny_budget = bootstrap_metrics(y, score, y_pred, n_bootstrap=20, random_state=3, memory_budget_mb=1e-4)
+    for name, values in reference.items():
+        np.testing.assert_array_equal(small_batches[name], values)
+        np.testing.assert_array_equal(tiny_budget[name], values)
+
+
+def test_bootstrap_single_class_resamples_are_nan():
+    y = np.array([1] + [0] * 9)
+    score = np.linspace(0.0, 1.0, 10)
+    samples = bootstrap_metrics(y, score, score >= 0.5, n_bootstrap=200, random_state=0)
+    one_class = np.isnan(samples["roc_auc"])
+    assert one_class.any() and not one_class.all()
+    np.testing.assert_array_equal(np.isnan(samples["pr_auc"]), one_class)
+    intervals = confidence_intervals(samples)
+    assert 0.0 <= intervals["roc_auc"]["lower"] <= intervals["roc_auc"]["upper"] <= 1.0
@@ -0,0 +1,132 @@
+# Tests for the compiled, pandas-free preprocessor.
+# Each compiled plan is compared with the fitted sklearn object it came from.
+
+"""Exactness of CompiledPreprocessor against sklearn, and the unsupported cases."""
+
+import numpy as np
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, MinMaxScaler, OneHotEncoder, StandardScaler
+
+from benchmarks.synthetic import fit_preprocessor, make_dataframe
+from constant import FEATURE_COLUMNS
+from utils.fast_preprocessor import CompiledPreprocessor
+
+CATEGORICAL = ["Vehicle_Age", "Vehicle_Damage", "Gender"]
+
+
+@pytest.fixture(scope="module")
+def frames():
+    return make_dataframe(3_000, seed=0)[FEATURE_COLUMNS], make_dataframe(500, seed=1)[FEATURE_COLUMNS]
+
+
+def compile_and_compare(preprocessor, train, test):
+    preprocessor.fit(train)
+    compiled = CompiledPreprocessor.from_sklearn(preprocessor)
+    expected = preprocessor.transform(test)
+    np.testing.assert_array_equal(compiled.transform(test.to_dict("records")), expected)
+    return compiled, expected
+
+
+def test_training_layout_is_bit_for_bit_identical(frames):
+    train, test = frames
+    preprocessor = fit_preprocessor(train)
+    compiled = CompiledPreprocessor.from_sklearn(preprocessor)
+    expected = preprocessor.transform(test)
+
+    np.testing.assert_array_equal(compiled.transform(test.to_dict("records")), expected)
+    np.testing.assert_array_equal(compiled.transform(test.iloc[0].to_dict()), expected[:1])
+    np.testing.assert_array_equal(compiled.transform(test.to_records(index=False)), expected)
+
+
+@pytest.mark.parametrize(
+    "scaler",
+    [
+        StandardScaler(),
+        StandardScaler(with_mean=False),
+        StandardScaler(with_std=False),
+        MinMaxScaler(),
+        MinMaxScaler(feature_range=(-1, 1)),
+        MinMaxScaler(clip=True),
+    ],
+    ids=["standard", "standard-no-mean", "standard-no-std", "minmax", "minmax-range", "minmax-clip"],
+)
+def test_scalers(frames, scaler):
+    train, test = frames
+    test = test.copy()
+    test.loc[test.index[:5], "Annual_Premium"] = [-1e6, 0.0, 1e7, 5e5, 1.0]
+    preprocessor = ColumnTransformer([("scaled", scaler, ["Age", "Annual_Premium", "Vintage"])])
+    compile_and_compare(preprocessor, train, test)
+
+
+def test_unknown_categories_are_ignored_or_rejected(frames):
+    train, test = frames
+    test = test.copy()
+    test.loc[test.index[:3], "Gender"] = "Unknown"
+
+    ignore = ColumnTransformer([("onehot", OneHotEncoder(handle_unknown="ignore", sparse_output=False), CATEGORICAL)])
+    compiled, expected = compile_and_compare(ignore, train, test)
+    assert expected[:3, -2:].sum() == 0
+
+    strict = ColumnTransformer([("onehot", OneHotEncoder(sparse_output=False), CATEGORICAL)]).fit(train)
+    compiled = CompiledPreprocessor.from_sklearn(strict)
+    with pytest.raises(ValueError, match="Gender"):
+        compiled.transform(test.to_dict("records"))
+    with pytest.raises(ValueError, match="Gender"):
+        compiled.check_row(test.iloc[0].to_dict())
+    np.testing.assert_array_equal(compiled.transform(test.iloc[3:].to_dict("records")), strict.transform(test.iloc[3:]))
+
+
+def test_passthrough_and_identity_function_transformer(frames):
+    train, test = frames
+    preprocessor = ColumnTransformer(
+        [
+            ("identity", FunctionTransformer(), ["Age"]),
+            ("passthrough", "passthrough", ["Vintage"]),
+            ("dropped", "drop", ["Annual_Premium"]),
+        ],
+        remainder="drop",
+    )
+    compile_and_compare(preprocessor, train, test)
+
+
+def test_integer_column_selectors(frames):
+    train, test = frames
+    preprocessor = ColumnTransformer(
+        [("scaled", StandardScaler(), [FEATURE_COLUMNS.index("Age")])], remainder="drop"
+    )
+    compile_and_compare(preprocessor, train, test)
+
+
+def test_check_row_coerces_numbers():
+    train = make_dataframe(200, seed=0)[FEATURE_COLUMNS]
+    compiled = CompiledPreprocessor.from_sklearn(fit_preprocessor(train))
+    row = dict(train.iloc[0].to_dict(), Age="42", Vintage=None)
+
+    checked = compiled.check_row(row)
+    assert checked["Age"] == 42.0
+    assert np.isnan(checked["Vintage"])
+    assert row["Age"] == "42"
+    with pytest.raises(ValueError, match="Age"):
+        compiled.check_row(dict(row, Age="abc"))
+
+
+@pytest.mark.parametrize(
+    "preprocessor",
+    [
+        ColumnTransformer([("onehot", OneHotEncoder(drop="first", sparse_output=False), CATEGORICAL)]),
+        ColumnTransformer([("onehot", OneHotEncoder(min_frequency=0.4, sparse_output=False), CATEGORICAL)]),
+        ColumnTransformer([("onehot", OneHotEncoder(sparse_output=True), CATEGORICAL)]),
+        ColumnTransformer([("log", FunctionTransformer(np.log1p), ["Age"])]),
+        Pipeline([("scale", ColumnTransformer([("s", StandardScaler(), ["Age"])])), ("again", StandardScaler())]),
+        StandardScaler(),
+    ],
+    ids=["drop", "infrequent", "sparse", "function", "two-step-pipeline", "bare-scaler"],
+)
+def test_unsupported_configurations_raise_not_implemented(frames, preprocessor):
+    train, _ = frames
+    columns = ["Age"] if isinstance(preprocessor, StandardScaler) else FEATURE_COLUMNS
+    preprocessor.fit(train[columns])
+    with pytest.raises(NotImplementedError):
+        CompiledPreprocessor.from_sklearn(preprocessor)
@@ -0,0 +1,98 @@
+# Tests for the flat-array forest engine.
+# FlatForest is compared with the RandomForestClassifier it was built from.
+
+"""FlatForest exactness against sklearn, and its save/load round trip."""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from utils.forest_engine import FlatForest
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(3_000, 8)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] ** 2 + rng.normal(scale=0.5, size=len(X)) > 1.0).astype(np.int64)
+    return X[:2_000], y[:2_000], X[2_000:]
+
+
+@pytest.mark.parametrize("max_depth", [1, 4, None])
+def test_predict_proba_is_identical_to_sklearn(data, max_depth):
+    X_train, y_train, X_test = data
+    model = RandomForestClassifier(n_estimators=15, max_depth=max_depth, random_state=0).fit(X_train, y_train)
+    forest = FlatForest.from_sklearn(model)
+
+    assert forest.n_estimators == 15
+    np.testing.assert_array_equal(forest.predict_proba(X_test), model.predict_proba(X_test))
+    np.testing.assert_array_equal(forest.predict_proba(X_test, chunk_rows=7), model.predict_proba(X_test))
+    np.testing.assert_array_equal(forest.predict(X_test), model.predict(X_test))
+
+
+def test_float64_inputs_at_thresholds_follow_sklearn(data):
+    X_train, y_train, _ = data
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X_train, y_train)
+    thresholds = model.estimators_[0].tree_.threshold
+    X = np.repeat(X_train[:50].astype(np.float64), 3, axis=0)
+    X[:, 0] = np.resize(thresholds[thresholds != -2], len(X))
+    np.testing.assert_array_equal(FlatForest.from_sklearn(model).predict_proba(X), model.predict_proba(X))
+
+
+def test_missing_values_follow_the_learned_direction(data):
+    X_train, y_train, X_test = data
+    X_train = X_train.copy()
+    X_train[::9, 2] = np.nan
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X_train, y_train)
+    X_test = X_test.copy()
+    X_test[::4, 2] = np.nan
+    np.testing.assert_array_equal(FlatForest.from_sklearn(model).predict_proba(X_test), model.predict_proba(X_test))
+
+
+def test_multiclass_string_labels(data):
+    X_train, _, X_test = data
+    labels = np.array(["low", "mid", "high"])[np.digitize(X_train[:, 0], [-0.5, 0.5])]
+    model = RandomForestClassifier(n_estimators=8, random_state=0).fit(X_train, labels)
+    forest = FlatForest.from_sklearn(model)
+    np.testing.assert_array_equal(forest.predict_proba(X_test), model.predict_proba(X_test))
+    np.testing.assert_array_equal(forest.predict(X_test), model.predict(X_test))
+
+
+def test_wrong_width_and_multi_output_are_rejected(data):
+    X_train, y_train, X_test = data
+    model = RandomForestClassifier(n_estimators=3, random_state=0).fit(X_train, y_train)
+    with pytest.raises(ValueError):
+        FlatForest.from_sklearn(model).predict_proba(X_test[:, :5])
+    multi = RandomForestClassifier(n_estimators=3, random_state=0).fit(X_train, np.stack([y_train, y_train], axis=1))
+    with pytest.raises(NotImplementedError):
+        FlatForest.from_sklearn(multi)
+
+
+@pytest.mark.parametrize("mmap_mode", ["r", None])
+def test_save_and_load_round_trip(data, tmp_path, mmap_mode):
+    X_train, y_train, X_test = data
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X_train, y_train)
+    forest = FlatForest.from_sklearn(model)
+    forest.save(str(tmp_path))
+
+    loaded = FlatForest.load(str(tmp_path), mmap_mode=mmap_mode)
+    assert isinstance(loaded.value, np.memmap) == (mmap_mode is not None)
+    np.testing.assert_array_equal(loaded.predict_proba(X_test), model.predict_proba(X_test))
+    np.testing.assert_array_equal(loaded.classes_, forest.classes_)
+
+
+def test_materializer_round_trip(data, tmp_path):
+    materializers = pytest.importorskip("materializers")
+    X_train, y_train, X_test = data
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X_train, y_train)
+    forest = FlatForest.from_sklearn(model)
+
+    uri = tmp_path / "flat_forest"
+    uri.mkdir()
+    materializer = materializers.FlatForestMaterializer(str(uri))
+    materializer.save(forest)
+    loaded = materializer.load(FlatForest)
+
+    assert isinstance(loaded.feature, np.memmap)
+    assert materializer.extract_metadata(forest)["n_estimators"] == 10
+    np.testing.assert_array_equal(loaded.predict_proba(X_test), model.predict_proba(X_test))
@@ -0,0 +1,75 @@
+# Tests for incremental forest growth with OOB early stopping.
+# The OOB accumulator is checked against sklearn's own OOB computation.
+
+"""OOBAccumulator equivalence with oob_decision_function_, and grow_forest."""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+
+from utils.forest_growth import OOBAccumulator, grow_forest
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1_500, 6))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.7, size=len(X)) > 0.5).astype(np.int64)
+    return X, y
+
+
+@pytest.mark.parametrize("max_samples", [None, 0.5])
+def test_accumulated_oob_equals_sklearn_oob(data, max_samples):
+    X, y = data
+    reference = RandomForestClassifier(
+        n_estimators=40, oob_score=True, max_samples=max_samples, random_state=3
+    ).fit(X, y)
+
+    model = RandomForestClassifier(n_estimators=10, warm_start=True, max_samples=max_samples, random_state=3)
+    accumulator = None
+    for n_estimators in (10, 25, 40):
+        model.set_params(n_estimators=n_estimators).fit(X, y)
+        if accumulator is None:
+            accumulator = OOBAccumulator(X, y, len(model.classes_))
+        accumulator.add_new_trees(model)
+
+    assert accumulator.n_seen == 40
+    np.testing.assert_allclose(accumulator.decision_function(), reference.oob_decision_function_, rtol=1e-12)
+    scores = accumulator.scores(model.classes_)
+    assert scores["oob_accuracy"] == pytest.approx(reference.oob_score_)
+    assert scores["oob_coverage"] == 1.0
+    assert scores["oob_roc_auc"] == pytest.approx(roc_auc_score(y, reference.oob_decision_function_[:, 1]))
+
+
+def test_rows_never_out_of_bag_are_nan(data):
+    X, y = data
+    model = RandomForestClassifier(n_estimators=1, random_state=0).fit(X, y)
+    accumulator = OOBAccumulator(X, y, 2)
+    accumulator.add_new_trees(model)
+
+    in_bag = accumulator.n_trees == 0
+    assert in_bag.any()
+    assert np.isnan(accumulator.decision_function()[in_bag]).all()
+    assert accumulator.scores(model.classes_)["oob_coverage"] == pytest.approx(1.0 - in_bag.mean())
+
+
+def test_grow_forest_trims_to_the_best_tree_count(data):
+    X, y = data
+    model, curve = grow_forest(
+        RandomForestClassifier(random_state=0), X, y, increment=10, max_estimators=200, min_estimators=20, patience=2
+    )
+
+    best = int(np.argmax(curve["oob_roc_auc"]))
+    assert curve["chosen_n_estimators"] == curve["n_estimators"][best]
+    assert model.n_estimators == len(model.estimators_) == curve["chosen_n_estimators"]
+    assert not model.warm_start
+    assert curve["grown_n_estimators"] == curve["n_estimators"][-1] <= 200
+    if curve["stopped_early"]:
+        assert curve["grown_n_estimators"] - curve["chosen_n_estimators"] >= 2 * 10
+
+
+def test_grow_forest_needs_bootstrap(data):
+    X, y = data
+    with pytest.raises(ValueError, match="bootstrap"):
+        grow_forest(RandomForestClassifier(bootstrap=False), X, y)
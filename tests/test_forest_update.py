@@ -0,0 +1,66 @@
+# Tests for the incremental forest refresh and its promotion check.
+# Forests are fitted on small synthetic data.
+
+"""refresh_forest tree turnover and OOB attributes, and compare_with_production."""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from utils.forest_update import OOB_ATTRIBUTES, refresh_forest
+
+
+def make_data(n_rows, seed, shift=0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 5))
+    y = (X[:, 0] + shift * X[:, 1] + rng.normal(scale=0.5, size=n_rows) > 0).astype(np.int64)
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def production():
+    X, y = make_data(2_000, seed=0)
+    return RandomForestClassifier(n_estimators=20, oob_score=True, random_state=0).fit(X, y)
+
+
+def test_refresh_keeps_the_size_and_appends_new_trees(production):
+    X_new, y_new = make_data(500, seed=1, shift=2.0)
+    refreshed, report = refresh_forest(production, X_new, y_new, n_new_trees=5, random_state=0)
+
+    assert len(refreshed.estimators_) == refreshed.n_estimators == 20
+    assert refreshed.estimators_[:15] == production.estimators_[5:]
+    assert report == {"previous_trees": 20, "retired_trees": 5, "new_trees": 5, "forest_size": 20, "new_rows": 500}
+    assert len(production.estimators_) == 20
+
+
+def test_refresh_drops_the_old_forests_oob_statistics(production):
+    X_new, y_new = make_data(500, seed=1, shift=2.0)
+    refreshed, _ = refresh_forest(production, X_new, y_new, n_new_trees=5, random_state=0)
+
+    assert hasattr(production, "oob_score_")
+    assert not any(hasattr(refreshed, name) for name in OOB_ATTRIBUTES)
+    assert refreshed.oob_score is False
+    refreshed.predict_proba(X_new)
+
+
+@pytest.mark.parametrize("min_gain, approved", [(0.0, True), (1.0, False)])
+def test_promotion_compares_both_models_on_the_same_rows(production, monkeypatch, min_gain, approved):
+    pytest.importorskip("zenml")
+    import steps.incremental_update as update_steps
+
+    logged = []
+    monkeypatch.setattr(update_steps, "log_metadata", lambda metadata: logged.append(metadata))
+    X_new, y_new = make_data(3_000, seed=2, shift=2.0)
+    refreshed, _ = refresh_forest(production, X_new[:2_000], y_new[:2_000], n_new_trees=20, random_state=0)
+
+    result = update_steps.compare_with_production.entrypoint(
+        production, refreshed, X_new[2_000:], y_new[2_000:],
+        update_steps.IncrementalUpdateParameters(min_roc_auc_gain=min_gain),
+    )
+    comparison = logged[0]["production_comparison"]
+    assert result is approved and comparison["approved"] is approved
+    assert comparison["n_rows"] == 1_000
+    assert comparison["refreshed"]["roc_auc"] > comparison["production"]["roc_auc"]
+    assert comparison["roc_auc_gain"] == pytest.approx(
+        comparison["refreshed"]["roc_auc"] - comparison["production"]["roc_auc"]
+    )
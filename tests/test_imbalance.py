@@ -0,0 +1,54 @@
+# Tests for the threaded SMOTEENN and the core budgeting helpers.
+# The threaded resampler must reproduce imblearn's default SMOTEENN exactly.
+
+"""build_smoteenn equivalence with SMOTEENN, and n_jobs resolution."""
+
+import numpy as np
+import pytest
+from imblearn.combine import SMOTEENN
+
+from utils import parallel
+from utils.imbalance import build_smoteenn, rebalance
+
+
+@pytest.fixture(scope="module")
+def imbalanced():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(3_000, 6))
+    y = (X[:, 0] + 0.5 * rng.normal(size=len(X)) > 1.6).astype(np.int64)
+    return X, y
+
+
+@pytest.mark.parametrize("n_jobs", [None, 1, 2, -1])
+def test_threaded_smoteenn_equals_default_smoteenn(imbalanced, n_jobs):
+    X, y = imbalanced
+    expected_X, expected_y = SMOTEENN(sampling_strategy="minority", random_state=42).fit_resample(X, y)
+    X_resampled, y_resampled = build_smoteenn(random_state=42, n_jobs=n_jobs).fit_resample(X, y)
+
+    np.testing.assert_array_equal(X_resampled, expected_X)
+    np.testing.assert_array_equal(y_resampled, expected_y)
+
+
+def test_rebalance_smoteenn_equals_default_smoteenn(imbalanced):
+    X, y = imbalanced
+    expected_X, expected_y = SMOTEENN(sampling_strategy="minority", random_state=7).fit_resample(X, y)
+    X_resampled, y_resampled, class_weight = rebalance(X, y, strategy="smoteenn", random_state=7, n_jobs=2)
+
+    assert class_weight is None
+    np.testing.assert_array_equal(X_resampled, expected_X)
+    np.testing.assert_array_equal(y_resampled, expected_y)
+
+
+def test_resolve_n_jobs(monkeypatch):
+    monkeypatch.setattr(parallel, "available_cores", lambda: 8)
+    assert parallel.resolve_n_jobs(None) == 8
+    assert parallel.resolve_n_jobs(-1) == 8
+    assert parallel.resolve_n_jobs(-2) == 7
+    assert parallel.resolve_n_jobs(-20) == 1
+    assert parallel.resolve_n_jobs(3) == 3
+    assert parallel.resolve_n_jobs(32) == 8
+    with pytest.raises(ValueError):
+        parallel.resolve_n_jobs(0)
+    assert parallel.blas_threads_per_job(4) == 2
+    assert parallel.blas_threads_per_job(16) == 1
+    assert parallel.blas_threads_per_job(4, blas_threads=3) == 3
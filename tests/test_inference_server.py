@@ -0,0 +1,142 @@
+# Tests for the micro-batching inference server.
+# Drives InferenceServer.predict and MicroBatcher directly, without a socket.
+
+"""Batching, latency bounds and per-request isolation of bad rows."""
+
+import asyncio
+import time
+
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.synthetic import fit_preprocessor, make_dataframe
+from constant import FEATURE_COLUMNS, TARGET_COLUMN
+from inference_server import InferenceServer, MicroBatcher, ServingMetrics
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    df = make_dataframe(2_000, seed=0, signal=True)
+    preprocessor = fit_preprocessor(df[FEATURE_COLUMNS])
+    model = RandomForestClassifier(n_estimators=10, random_state=0)
+    model.fit(preprocessor.transform(df[FEATURE_COLUMNS]), df[TARGET_COLUMN])
+    rows = make_dataframe(50, seed=1)[FEATURE_COLUMNS].to_dict("records")
+    return model, preprocessor, rows
+
+
+async def serving(server, coroutine):
+    server.batcher = MicroBatcher(server.score_rows, server.max_batch_size, server.max_wait_ms, server.metrics)
+    task = asyncio.create_task(server.batcher.run())
+    try:
+        return await coroutine
+    finally:
+        task.cancel()
+        server.batcher.executor.shutdown(wait=True)
+
+
+def test_concurrent_requests_share_batches_and_match_direct_scoring(fitted):
+    model, preprocessor, rows = fitted
+    server = InferenceServer(model, preprocessor, max_batch_size=8, max_wait_ms=50)
+
+    async def clients():
+        return await asyncio.gather(*(server.predict(dict(row)) for row in rows[:16]))
+
+    responses = asyncio.run(serving(server, clients()))
+    assert [status for status, _ in responses] == [200] * 16
+    assert [result for _, result in responses] == server.score_rows(rows[:16])
+    assert server.metrics.batches == 2
+    assert server.metrics.batched_rows == 16
+
+
+def test_full_batch_closes_before_the_wait_deadline(fitted):
+    model, preprocessor, rows = fitted
+    server = InferenceServer(model, preprocessor, max_batch_size=4, max_wait_ms=5_000)
+
+    async def client():
+        start = time.perf_counter()
+        status, _ = await server.predict([dict(row) for row in rows[:4]])
+        return status, time.perf_counter() - start
+
+    status, seconds = asyncio.run(serving(server, client()))
+    assert status == 200
+    assert seconds < 2.0
+
+
+def test_partial_batch_waits_at_most_max_wait(fitted):
+    model, preprocessor, rows = fitted
+    server = InferenceServer(model, preprocessor, max_batch_size=64, max_wait_ms=100)
+
+    async def client():
+        start = time.perf_counter()
+        status, _ = await server.predict(dict(rows[0]))
+        return status, time.perf_counter() - start
+
+    status, seconds = asyncio.run(serving(server, client()))
+    assert status == 200
+    assert 0.09 <= seconds < 2.0
+
+
+@pytest.mark.parametrize("bad_value", ["abc", [1, 2], {"years": 40}])
+def test_bad_row_fails_only_its_own_request(fitted, bad_value):
+    model, preprocessor, rows = fitted
+    server = InferenceServer(model, preprocessor, max_batch_size=8, max_wait_ms=50)
+    bad = dict(rows[0], Age=bad_value)
+
+    async def clients():
+        return await asyncio.gather(server.predict(bad), *(server.predict(dict(row)) for row in rows[1:8]))
+
+    responses = asyncio.run(serving(server, clients()))
+    assert responses[0][0] == 400
+    assert "Age" in responses[0][1]["error"]
+    assert [status for status, _ in responses[1:]] == [200] * 7
+    assert [result for _, result in responses[1:]] == server.score_rows(rows[1:8])
+
+
+def test_numeric_strings_and_unseen_categories_are_scored(fitted):
+    model, preprocessor, rows = fitted
+    server = InferenceServer(model, preprocessor)
+    row = dict(rows[0], Age=str(rows[0]["Age"]), Gender="Unknown")
+
+    status, result = asyncio.run(serving(server, server.predict(row)))
+    assert status == 200
+    assert result == server.score_rows([dict(rows[0], Gender="Unknown")])[0]
+
+
+def test_uncompiled_preprocessor_rescores_a_failed_batch_row_by_row(fitted):
+    model, preprocessor, rows = fitted
+    server = InferenceServer(model, preprocessor, max_batch_size=8, max_wait_ms=50)
+    loaded = server._loaded
+    server._loaded = (loaded[0], loaded[1], None, loaded[3])
+
+    async def clients():
+        bad = server.predict(dict(rows[0], Age="abc"))
+        return await asyncio.gather(bad, *(server.predict(dict(row)) for row in rows[1:4]))
+
+    responses = asyncio.run(serving(server, clients()))
+    assert responses[0][0] == 400
+    assert [status for status, _ in responses[1:]] == [200] * 3
+    assert server.metrics.errors == 1
+
+
+def test_micro_batcher_isolates_failing_rows():
+    def score(rows):
+        if any(row["fail"] for row in rows):
+            raise RuntimeError("bad row")
+        return [row["value"] * 2 for row in rows]
+
+    async def clients():
+        batcher = MicroBatcher(score, max_batch_size=16, max_wait_ms=50, metrics=ServingMetrics())
+        task = asyncio.create_task(batcher.run())
+        try:
+            requests = [batcher.submit([{"value": i, "fail": i == 3}]) for i in range(6)]
+            return await asyncio.gather(*requests, return_exceptions=True), batcher.metrics
+        finally:
+            task.cancel()
+            batcher.executor.shutdown(wait=True)
+
+    results, metrics = asyncio.run(clients())
+    assert isinstance(results[3], RuntimeError)
+    assert [results[i] for i in (0, 1, 2, 4, 5)] == [[0], [2], [4], [8], [10]]
+    assert metrics.batches == 1
+    assert metrics.errors == 1
+    assert metrics.batched_rows == 6
@@ -0,0 +1,92 @@
+# Tests for the memory-mapping ZenML materializers.
+# Each artifact is saved, loaded back and compared with the original.
+
+"""Round trips through MmapNumpyMaterializer and ArrowDataFrameMaterializer."""
+
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("zenml")
+
+from materializers import ArrowDataFrameMaterializer, MmapNumpyMaterializer
+from benchmarks.synthetic import make_dataframe
+from utils.dtype_policy import apply_dtype_policy
+
+
+@pytest.fixture
+def artifact_uri():
+    """Directory inside the active artifact store, which the default materializers require."""
+    from zenml.client import Client
+
+    uri = os.path.join(Client().active_stack.artifact_store.path, f"test-materializers-{uuid.uuid4().hex[:8]}")
+    os.makedirs(uri)
+    yield uri
+    shutil.rmtree(uri, ignore_errors=True)
+
+
+def round_trip(materializer_class, data, uri):
+    materializer = materializer_class(uri)
+    materializer.save(data)
+    return materializer.load(type(data))
+
+
+@pytest.mark.parametrize(
+    "array",
+    [
+        np.random.default_rng(0).normal(size=(500, 12)).astype(np.float32),
+        np.arange(1_000, dtype=np.int64),
+        np.array([[True, False], [False, True]]),
+    ],
+    ids=["float32-matrix", "int64-vector", "bool"],
+)
+def test_array_round_trip_is_memory_mapped(array, artifact_uri):
+    loaded = round_trip(MmapNumpyMaterializer, array, artifact_uri)
+    assert isinstance(loaded, np.memmap)
+    assert loaded.dtype == array.dtype
+    np.testing.assert_array_equal(loaded, array)
+
+
+def test_object_array_falls_back_to_the_default_materializer(artifact_uri):
+    array = np.array(["a", 1, None], dtype=object)
+    loaded = round_trip(MmapNumpyMaterializer, array, artifact_uri)
+    assert not isinstance(loaded, np.memmap)
+    np.testing.assert_array_equal(loaded, array)
+
+
+def test_categorical_frame_round_trip(artifact_uri):
+    df = apply_dtype_policy(make_dataframe(2_000, seed=0))
+    df.loc[df.index[::11], "Annual_Premium"] = np.nan
+    assert (df.dtypes == "category").any()
+
+    loaded = round_trip(ArrowDataFrameMaterializer, df, artifact_uri)
+    pd.testing.assert_frame_equal(loaded, df)
+    for column in df.select_dtypes("category"):
+        assert list(loaded[column].cat.categories) == list(df[column].cat.categories)
+
+
+def test_series_round_trip_keeps_name_and_index(artifact_uri):
+    series = pd.Series(np.arange(50, dtype=np.int8), index=np.arange(100, 150), name="Response")
+    loaded = round_trip(ArrowDataFrameMaterializer, series, artifact_uri)
+    pd.testing.assert_series_equal(loaded, series)
+
+
+def test_materializers_are_attached_per_step_not_registered_globally():
+    from zenml.materializers.materializer_registry import materializer_registry
+
+    from steps.data_splitter import split_data
+    from steps.data_transformation import data_transformation
+
+    assert materializer_registry[np.ndarray] is not MmapNumpyMaterializer
+    assert materializer_registry[pd.DataFrame] is not ArrowDataFrameMaterializer
+
+    def attached(step, output):
+        return [source.attribute for source in step.configuration.outputs[output].materializer_source]
+
+    assert attached(split_data, "X_train") == ["ArrowDataFrameMaterializer"]
+    assert attached(split_data, "y_test") == ["ArrowDataFrameMaterializer"]
+    assert attached(data_transformation, "X_train_transformed") == ["MmapNumpyMaterializer"]
@@ -0,0 +1,93 @@
+# Tests for the local model cache and the hot-reload thread.
+# The ZenML registry is replaced by stub model versions.
+
+"""Integrity checks, staging directories and hot reload of model versions."""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+from sklearn.dummy import DummyClassifier
+
+from utils import model_cache
+from utils.disk_cache import STAGING_DIR
+from utils.model_cache import MANIFEST_FILE, MODEL_FILE, ModelCache, ModelReloader, load_cached_model
+
+
+class Registry:
+    """Stub registry whose current version can be changed, counting artifact loads."""
+
+    def __init__(self):
+        self.loads = 0
+        self.promote("v1")
+
+    def promote(self, name):
+        model = DummyClassifier(strategy="constant", constant=int(name[1:]))
+        artifacts = {"model": model, "preprocessor": f"preprocessor-{name}"}
+
+        def get_artifact(artifact_name):
+            def load():
+                self.loads += 1
+                return artifacts[artifact_name]
+            return SimpleNamespace(load=load)
+
+        self.current = SimpleNamespace(id=f"id-{name}", name=name, get_artifact=get_artifact)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = Registry()
+    monkeypatch.setattr(model_cache, "resolve_model_version", lambda model_name: registry.current)
+    return registry
+
+
+def test_cached_version_is_loaded_without_the_registry_artifacts(registry, tmp_path):
+    cache = ModelCache(str(tmp_path))
+    _, preprocessor, version_id = load_cached_model(cache=cache)
+    assert (preprocessor, version_id, registry.loads) == ("preprocessor-v1", "id-v1", 2)
+
+    _, preprocessor, _ = load_cached_model(cache=cache)
+    assert preprocessor == "preprocessor-v1" and registry.loads == 2
+
+
+def test_corrupted_file_is_discarded_and_fetched_again(registry, tmp_path):
+    cache = ModelCache(str(tmp_path))
+    load_cached_model(cache=cache)
+    with open(os.path.join(tmp_path, "id-v1", MODEL_FILE), "r+b") as f:
+        f.seek(-8, os.SEEK_END)
+        f.write(b"\xff" * 8)
+
+    assert cache.model_file("id-v1") is None
+    assert not os.path.exists(os.path.join(tmp_path, "id-v1"))
+    _, preprocessor, _ = load_cached_model(cache=cache)
+    assert preprocessor == "preprocessor-v1" and registry.loads == 4
+    assert cache.model_file("id-v1") is not None
+
+
+def test_staging_directories_are_never_listed_or_pruned(registry, tmp_path):
+    cache = ModelCache(str(tmp_path), keep_versions=1)
+    leftovers = [os.path.join(tmp_path, STAGING_DIR, "id-v9-1-2"), os.path.join(tmp_path, "id-v8.tmp-1-2")]
+    for leftover in leftovers:
+        os.makedirs(leftover)
+        with open(os.path.join(leftover, MANIFEST_FILE), "w") as f:
+            f.write("{}")
+
+    load_cached_model(cache=cache)
+    assert cache.latest_version() == "id-v1"
+    assert all(os.path.isdir(leftover) for leftover in leftovers)
+
+
+def test_reloader_swaps_only_when_the_version_changes(registry, tmp_path):
+    cache = ModelCache(str(tmp_path))
+    model, _, version_id = load_cached_model(cache=cache)
+    swaps = []
+    reloader = ModelReloader(lambda *loaded: swaps.append(loaded), version_id, cache=cache)
+
+    assert reloader.check_once() is False and swaps == []
+
+    registry.promote("v2")
+    assert reloader.check_once() is True
+    new_model, preprocessor, new_version_id = swaps[0]
+    assert (preprocessor, new_version_id, reloader.current_version_id) == ("preprocessor-v2", "id-v2", "id-v2")
+    assert new_model.constant == 2
+    assert reloader.check_once() is False and len(swaps) == 1
@@ -0,0 +1,178 @@
+# Tests for out-of-core training.
+# The streamed preprocessor and merged forest are compared with in-memory fits.
+
+"""Split hashing, streamed scalers, sub-forest sizing and the merged forest."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+
+from benchmarks.synthetic import make_dataframe, make_preprocessor
+from constant import TARGET_COLUMN
+from utils.dtype_policy import apply_dtype_policy, as_model_input, transform_to_float32
+from utils.imbalance import rebalance
+from utils.out_of_core import fit_preprocessor_streaming, hash_unit, train_out_of_core
+
+TEST_SIZE = 0.2
+CHUNK_ROWS = 1_000
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return apply_dtype_policy(make_dataframe(6_000, seed=0, signal=True))
+
+
+def source(df, extra=None):
+    """Chunk source over ``df``; ``extra`` rows only appear from the second read on."""
+    reads = []
+
+    def chunks():
+        reads.append(1)
+        data = df if extra is None or len(reads) == 1 else pd.concat([df, extra], ignore_index=True)
+        for start in range(0, len(data), CHUNK_ROWS):
+            yield data.iloc[start:start + CHUNK_ROWS]
+    return chunks
+
+
+def training_rows(df):
+    train = df[hash_unit(df["id"].to_numpy()) >= TEST_SIZE]
+    return train.drop(columns=[TARGET_COLUMN, "id", "batch_tag"]), train[TARGET_COLUMN].to_numpy()
+
+
+def test_hash_unit_is_deterministic_uniform_and_rejects_nan():
+    ids = np.arange(1, 100_001)
+    u = hash_unit(ids, seed=3)
+    np.testing.assert_array_equal(u, hash_unit(ids, seed=3))
+    np.testing.assert_array_equal(u[:10], hash_unit(ids[:10].astype(np.float64), seed=3))
+    assert ((u >= 0) & (u < 1)).all()
+    assert np.mean(u < 0.2) == pytest.approx(0.2, abs=0.005)
+    assert not np.array_equal(u, hash_unit(ids, seed=4))
+    with pytest.raises(ValueError, match="NaN"):
+        hash_unit(np.array([1.0, np.nan]))
+
+
+def test_streamed_scalers_and_categories_match_in_memory_fit(frame):
+    streamed, counts = fit_preprocessor_streaming(make_preprocessor(), source(frame), TARGET_COLUMN, TEST_SIZE)
+    X_train, y_train = training_rows(frame)
+    in_memory = make_preprocessor().fit(as_model_input(X_train))
+
+    assert counts["train_rows"] == len(y_train)
+    assert counts["test_rows"] == len(frame) - len(y_train)
+    assert counts["chunks"] == 6
+    assert sum(counts["train_class_counts"].values()) == len(y_train)
+
+    fitted, expected = streamed[-1].named_transformers_, in_memory[-1].named_transformers_
+    np.testing.assert_allclose(fitted["StandardScaler"].mean_, expected["StandardScaler"].mean_, rtol=1e-12)
+    np.testing.assert_allclose(fitted["StandardScaler"].var_, expected["StandardScaler"].var_, rtol=1e-10)
+    np.testing.assert_array_equal(fitted["MinMaxScaler"].data_min_, expected["MinMaxScaler"].data_min_)
+    np.testing.assert_array_equal(fitted["MinMaxScaler"].data_max_, expected["MinMaxScaler"].data_max_)
+    for got, want in zip(fitted["OneHotEncoder"].categories_, expected["OneHotEncoder"].categories_):
+        assert list(got) == list(want)
+
+    X_test = as_model_input(frame.drop(columns=[TARGET_COLUMN, "id", "batch_tag"]))
+    np.testing.assert_allclose(streamed.transform(X_test), in_memory.transform(X_test), rtol=1e-10, atol=1e-12)
+
+
+def test_single_subforest_equals_the_in_memory_forest(frame):
+    model, preprocessor, _, X_eval, y_eval, report = train_out_of_core(
+        make_preprocessor(), source(frame), TARGET_COLUMN,
+        n_estimators=15, rows_per_subforest=100_000, test_size=TEST_SIZE,
+        imbalance_params={"strategy": "undersample"}, random_state=42,
+    )
+    X_train, y_train = training_rows(frame)
+    X_res, y_res, _ = rebalance(
+        transform_to_float32(preprocessor, X_train), y_train, strategy="undersample", random_state=42
+    )
+    in_memory = RandomForestClassifier(n_estimators=15, random_state=42).fit(X_res, y_res)
+
+    assert report["subforests"] == 1
+    assert report["rows_per_subforest"] == [len(y_train)]
+    np.testing.assert_array_equal(model.predict_proba(X_eval), in_memory.predict_proba(X_eval))
+
+
+def test_merged_subforests_match_in_memory_quality(frame):
+    model, preprocessor, _, X_eval, y_eval, report = train_out_of_core(
+        make_preprocessor(), source(frame), TARGET_COLUMN,
+        n_estimators=20, rows_per_subforest=1_500, test_size=TEST_SIZE,
+        imbalance_params={"strategy": "undersample"},
+    )
+    X_train, y_train = training_rows(frame)
+
+    assert report["subforests"] == 3
+    assert model.n_estimators == len(model.estimators_) == sum(report["trees_per_subforest"]) == 20
+    assert sum(report["rows_per_subforest"]) == report["train_rows"] == len(y_train)
+    assert max(report["rows_per_subforest"]) - min(report["rows_per_subforest"]) <= 1
+    assert report["overflow_rows"] == 0
+    assert report["eval_rows"] == report["test_rows"] == len(y_eval)
+
+    X_res, y_res, _ = rebalance(
+        transform_to_float32(preprocessor, X_train), y_train, strategy="undersample", random_state=42
+    )
+    in_memory = RandomForestClassifier(n_estimators=20, random_state=42).fit(X_res, y_res)
+    merged_auc = roc_auc_score(y_eval, model.predict_proba(X_eval)[:, 1])
+    in_memory_auc = roc_auc_score(y_eval, in_memory.predict_proba(X_eval)[:, 1])
+    assert merged_auc == pytest.approx(in_memory_auc, abs=0.03)
+
+
+def test_rows_added_between_passes_overflow_instead_of_growing_the_last_subforest(frame):
+    extra = apply_dtype_policy(make_dataframe(2_000, seed=1, signal=True))
+    extra["id"] += len(frame)
+    extra_train = int((hash_unit(extra["id"].to_numpy()) >= TEST_SIZE).sum())
+
+    _, _, _, _, _, report = train_out_of_core(
+        make_preprocessor(), source(frame, extra), TARGET_COLUMN,
+        n_estimators=9, rows_per_subforest=1_500, test_size=TEST_SIZE,
+        imbalance_params={"strategy": "undersample"},
+    )
+    planned = report["train_rows"]
+    assert sum(report["rows_per_subforest"]) == planned
+    assert max(report["rows_per_subforest"]) <= -(-planned // report["subforests"])
+    assert report["overflow_rows"] == extra_train
+
+
+def test_rows_without_an_id_are_skipped_in_both_passes(frame):
+    df = frame.copy()
+    df["id"] = df["id"].astype("float64")
+    df.loc[df.index[::50], "id"] = np.nan
+
+    _, _, _, _, y_eval, report = train_out_of_core(
+        make_preprocessor(), source(df), TARGET_COLUMN,
+        n_estimators=5, rows_per_subforest=100_000, test_size=TEST_SIZE,
+        imbalance_params={"strategy": "undersample"},
+    )
+    _, y_train = training_rows(df.dropna(subset=["id"]))
+    assert report["missing_ids"] == len(df.index[::50])
+    assert report["train_rows"] == sum(report["rows_per_subforest"]) == len(y_train)
+    assert report["train_rows"] + report["test_rows"] + report["missing_ids"] == len(df)
+
+
+def test_step_streams_mongodb_through_the_utility(frame, monkeypatch):
+    pytest.importorskip("zenml")
+    import steps.out_of_core_training as step_module
+    from steps.data_transformation import DataTransformationParameters
+    from steps.model_trainer import ModelTrainerParameters
+
+    reads = []
+
+    class StubClient:
+        def iter_dataframes(self, collection_name, query, columns=None, batch_size=50_000):
+            reads.append((collection_name, query, batch_size))
+            data = frame.drop(columns=["batch_tag"])[columns]
+            for start in range(0, len(data), batch_size):
+                yield data.iloc[start:start + batch_size]
+
+    logged = []
+    monkeypatch.setattr(step_module, "MongoDBClient", StubClient)
+    monkeypatch.setattr(step_module, "log_metadata", lambda metadata: logged.append(metadata))
+
+    model, _, X_test, X_test_transformed, y_test = step_module.train_out_of_core.entrypoint(
+        step_module.OutOfCoreParameters(collection_name="vehicles", chunk_rows=CHUNK_ROWS, rows_per_subforest=2_500),
+        DataTransformationParameters(use_cache=False),
+        ModelTrainerParameters(n_estimators=6, imbalance_strategy="undersample", n_jobs=1),
+    )
+    assert len(reads) == 2 and all(read[0] == "vehicles" for read in reads)
+    assert model.n_estimators == len(model.estimators_) == 6
+    assert len(X_test) == len(X_test_transformed) == len(y_test) > 0
+    assert logged[0]["forest"]["subforests"] == 2
@@ -0,0 +1,49 @@
+# Tests for loading the monitoring reference profile.
+# The ZenML client is replaced by a stub registry of model versions.
+
+"""load_reference_profile reads the profile linked to the production model version."""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("zenml")
+
+import steps.monitoring.profile_data as profile_data
+
+
+class StubClient:
+    """Registry in which the newest version is not the production one."""
+
+    def __init__(self, linked):
+        self.linked = linked
+        self.requested = []
+
+    def get_model_version(self, model_name, version):
+        self.requested.append((model_name, version))
+        artifact = None
+        if self.linked is not None:
+            artifact = SimpleNamespace(version="7", load=lambda: self.linked)
+        return SimpleNamespace(name="3", get_artifact=lambda name: artifact if name == "reference_profile" else None)
+
+    def get_artifact_version(self, name):
+        raise AssertionError("the latest reference_profile may belong to an unpromoted run")
+
+
+def test_profile_comes_from_the_production_model_version(monkeypatch):
+    client = StubClient({"n_rows": 100})
+    monkeypatch.setattr(profile_data, "Client", lambda: client)
+
+    assert profile_data.load_reference_profile.entrypoint() == {"n_rows": 100}
+    assert client.requested == [("vehicle_insurance_model", "production")]
+
+
+def test_production_version_without_a_profile_fails_clearly(monkeypatch):
+    monkeypatch.setattr(profile_data, "Client", lambda: StubClient(None))
+    with pytest.raises(RuntimeError, match="no 'reference_profile' artifact"):
+        profile_data.load_reference_profile.entrypoint()
+
+
+def test_reference_profile_steps_are_linked_to_the_trained_model():
+    for step in (profile_data.build_reference_profile, profile_data.stream_reference_profile):
+        assert step.configuration.model.name == "vehicle_insurance_model"
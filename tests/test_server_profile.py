@@ -0,0 +1,108 @@
+# Tests for server-side profiling against a local mongod.
+# The aggregation profile is compared with build_profile on the same documents.
+
+"""``$group``/``$percentile`` profiles and the ``$bucketAuto`` fallback."""
+
+import numpy as np
+import pandas as pd
+import pymongo
+import pytest
+
+from benchmarks.synthetic import make_documents
+from utils import server_profile
+from utils.drift_engine import compare_profiles
+from utils.profile_utils import CATEGORICAL_FEATURES, NUMERIC_FEATURES, QUANTILE_LEVELS, build_profile
+from utils.server_profile import profile_collection_server_side
+
+COLLECTION = "server_profile"
+FEATURES = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+
+@pytest.fixture(scope="module")
+def seeded(mongo_database):
+    reference_docs = make_documents(5_000, seed=0, batch_tag="train")
+    incoming_docs = make_documents(5_000, seed=1, batch_tag="incoming")
+    for i, document in enumerate(incoming_docs):
+        document["id"] += len(reference_docs)
+        if i % 17 == 0:
+            document["Age"] = None
+        if i % 23 == 0:
+            del document["Gender"]
+        if i % 29 == 0:
+            document["Region_Code"] = 99.0  # unseen in the reference
+    collection = mongo_database[COLLECTION]
+    collection.drop()
+    collection.insert_many(reference_docs + incoming_docs)
+
+    reference = build_profile(pd.DataFrame(reference_docs)[FEATURES])
+    incoming = pd.DataFrame(incoming_docs).reindex(columns=FEATURES)
+    yield mongo_database.name, reference, incoming
+    collection.drop()
+
+
+def server_version(database):
+    return tuple(int(part) for part in database.client.server_info()["version"].split(".")[:2])
+
+
+def profile(seeded, **kwargs):
+    database_name, reference, _ = seeded
+    return profile_collection_server_side(
+        COLLECTION, {"batch_tag": "incoming"}, NUMERIC_FEATURES, CATEGORICAL_FEATURES,
+        reference=reference, database_name=database_name, **kwargs,
+    )
+
+
+def assert_matches_build_profile(result, seeded, max_rank_error):
+    _, reference, incoming = seeded
+    exact = build_profile(incoming, reference=reference)
+
+    assert result["n_rows"] == exact["n_rows"]
+    assert result["histograms"] == exact["histograms"]
+    assert result["categorical"] == exact["categorical"]
+    for feature in NUMERIC_FEATURES:
+        stats, truth = result["numeric"][feature], exact["numeric"][feature]
+        assert stats["count"] == truth["count"]
+        assert (stats["min"], stats["max"]) == (truth["min"], truth["max"])
+        assert stats["mean"] == pytest.approx(truth["mean"], rel=1e-9)
+        assert stats["var"] == pytest.approx(truth["var"], rel=1e-9)
+
+        values = np.sort(incoming[feature].dropna().to_numpy(dtype=np.float64))
+        low = np.searchsorted(values, stats["quantiles"], side="left") / len(values)
+        high = np.searchsorted(values, stats["quantiles"], side="right") / len(values)
+        assert np.max(np.maximum(0.0, np.maximum(low - QUANTILE_LEVELS, QUANTILE_LEVELS - high))) <= max_rank_error
+
+    drift, exact_drift = compare_profiles(reference, result), compare_profiles(reference, exact)
+    assert drift == pytest.approx(exact_drift, nan_ok=True)
+
+
+def test_percentile_profile_matches_build_profile(mongo_database, seeded):
+    if server_version(mongo_database) < (7, 0):
+        pytest.skip("$percentile needs MongoDB 7.0+")
+    assert_matches_build_profile(profile(seeded, use_percentile=True), seeded, max_rank_error=0.02)
+
+
+def test_bucket_auto_fallback_matches_build_profile(seeded):
+    assert_matches_build_profile(profile(seeded, use_percentile=False), seeded, max_rank_error=0.02)
+
+
+@pytest.fixture
+def monitor_facets(monkeypatch):
+    """Makes the server reject ``$percentile`` as MongoDB < 7.0 does; records each attempt."""
+    attempts = []
+    run_facets = server_profile._run_facets
+
+    def without_percentile(collection, query, facets):
+        uses_percentile = "$percentile" in repr(facets)
+        attempts.append(uses_percentile)
+        if uses_percentile:
+            raise pymongo.errors.OperationFailure("Unrecognized expression '$percentile'", code=168)
+        return run_facets(collection, query, facets)
+
+    monkeypatch.setattr(server_profile, "_run_facets", without_percentile)
+    return attempts
+
+
+def test_falls_back_when_the_server_rejects_percentile(seeded, monitor_facets):
+    result = profile(seeded)
+    assert monitor_facets == [True, False]
+    assert_matches_build_profile(result, seeded, max_rank_error=0.02)
@@ -0,0 +1,103 @@
+# Tests for the mergeable sketches and the streaming profiler.
+# The streamed profile is checked against profile_utils.build_profile.
+
+"""Sketch accuracy and streamed-versus-in-memory profile equivalence."""
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_dataframe
+from utils.drift_engine import compare_profiles
+from utils.dtype_policy import apply_dtype_policy
+from utils.profile_utils import CATEGORICAL_FEATURES, NUMERIC_FEATURES, build_profile
+from utils.sketches import KLLSketch, RunningMoments
+from utils.streaming_profile import profile_chunks
+
+
+def chunked(df, rows):
+    return [df.iloc[start:start + rows] for start in range(0, len(df), rows)]
+
+
+def reference_frame(n_rows, seed=0):
+    df = apply_dtype_policy(make_dataframe(n_rows, seed=seed))
+    df.loc[df.index[::7], "Annual_Premium"] = np.nan
+    return df
+
+
+def test_running_moments_match_numpy_across_merges():
+    rng = np.random.default_rng(0)
+    values = rng.gamma(4.0, 7_500.0, size=10_000)
+    values[::13] = np.nan
+    left, right = RunningMoments(), RunningMoments()
+    for chunk in np.array_split(values[:6_000], 7):
+        left.update(chunk)
+    right.update(values[6_000:])
+    left.merge(right)
+
+    finite = values[~np.isnan(values)]
+    assert left.count == finite.size
+    assert left.min == finite.min() and left.max == finite.max()
+    assert left.mean == pytest.approx(finite.mean(), rel=1e-12)
+    assert left.variance == pytest.approx(finite.var(ddof=1), rel=1e-10)
+
+
+def test_kll_is_exact_before_compaction():
+    values = np.random.default_rng(1).normal(size=150)
+    sketch = KLLSketch(k=200, seed=0)
+    sketch.update(values)
+    levels = np.linspace(0.0, 1.0, 101)
+    np.testing.assert_allclose(sketch.quantiles(levels), np.quantile(values, levels))
+    edges = np.quantile(values, [0.25, 0.5, 0.75])
+    expected = np.bincount(np.searchsorted(edges, values, side="right"), minlength=4)
+    np.testing.assert_array_equal(sketch.histogram(edges), expected)
+
+
+def test_kll_rank_error_and_weight_after_merges():
+    rng = np.random.default_rng(2)
+    values = rng.gamma(4.0, 7_500.0, size=200_000)
+    sketch = KLLSketch(k=200, seed=0)
+    for i, chunk in enumerate(np.array_split(values, 8)):
+        part = KLLSketch(k=200, seed=i + 1)
+        part.update(chunk)
+        sketch.merge(part)
+
+    assert sketch.n == values.size
+    assert sketch.size < 2_000
+    levels = np.linspace(0.01, 0.99, 99)
+    ranks = np.searchsorted(np.sort(values), sketch.quantiles(levels)) / values.size
+    assert np.max(np.abs(ranks - levels)) < 1.7 / 200 * 2
+    assert sketch.histogram(np.quantile(values, [0.5])).sum() == values.size
+
+
+def test_streamed_profile_equals_build_profile_before_compaction():
+    df = reference_frame(150)
+    streamed = profile_chunks(chunked(df, 40), NUMERIC_FEATURES, CATEGORICAL_FEATURES, seed=0).to_profile()
+    in_memory = build_profile(df)
+
+    assert streamed["histograms"] == in_memory["histograms"]
+    assert streamed["categorical"] == in_memory["categorical"]
+    for feature, stats in in_memory["numeric"].items():
+        np.testing.assert_allclose(streamed["numeric"][feature]["quantiles"], stats["quantiles"])
+
+
+@pytest.mark.parametrize("n_rows", [150, 100_000])
+def test_streamed_reference_gives_in_memory_drift_metrics(n_rows):
+    df = reference_frame(n_rows)
+    incoming = make_dataframe(n_rows, seed=1)
+    incoming["Gender"] = "Male"
+
+    streamed = profile_chunks(chunked(df, 10_000), NUMERIC_FEATURES, CATEGORICAL_FEATURES, seed=0).to_profile()
+    in_memory = build_profile(df)
+    streamed_metrics = compare_profiles(streamed, build_profile(incoming, reference=streamed))
+    in_memory_metrics = compare_profiles(in_memory, build_profile(incoming, reference=in_memory))
+
+    assert set(streamed_metrics) == set(in_memory_metrics) == set(NUMERIC_FEATURES + CATEGORICAL_FEATURES)
+    assert streamed_metrics["Gender"]["psi"] > 1.0
+    for feature in CATEGORICAL_FEATURES:
+        assert streamed_metrics[feature] == pytest.approx(in_memory_metrics[feature], nan_ok=True)
+    for feature in NUMERIC_FEATURES:
+        for metric in ("psi", "ks", "js"):
+            # Sketch-estimated reference bins: exact before compaction, close after.
+            assert streamed_metrics[feature][metric] == pytest.approx(
+                in_memory_metrics[feature][metric], abs=0.05
+            )
@@ -1,6 +1,13 @@
 # Initializes the utils package.
 """Exports utility modules for MongoDB access and helper functions."""
 
-from .db_utils import MongoDBClient, get_data_as_dataframe
+from .db_utils import MongoDBClient, get_mongo_client, get_data_as_dataframe, ensure_index
+from .snapshot_cache import SnapshotCache
 
-__all__ = ["MongoDBClient", "get_data_as_dataframe"]
+__all__ = [
+    "MongoDBClient",
+    "get_mongo_client",
+    "get_data_as_dataframe",
+    "ensure_index",
+    "SnapshotCache",
+]
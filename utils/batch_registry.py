@@ -0,0 +1,71 @@
+# Bookkeeping of which data batches the monitoring pipeline has checked.
+# Lets a monitoring run pick up every batch that arrived since the last one.
+
+"""Lists batch tags in a collection and records which ones have been checked.
+
+Checked batches are stored in ``MONITORED_BATCHES_COLLECTION`` as one
+document per (collection, batch_tag) with the time of the check and its
+drift verdict, so "all batches not yet checked" is a set difference
+between ``distinct("batch_tag")`` and that registry.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List
+
+from pymongo import UpdateOne
+
+from constant import DATABASE_NAME, MONITORED_BATCHES_COLLECTION, REFERENCE_BATCH_TAG
+from utils.db_utils import MongoDBClient
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def list_batch_tags(collection_name: str, database_name: str = DATABASE_NAME) -> List[str]:
+    """All batch tags present in ``collection_name`` (served by the batch_tag index)."""
+    collection = MongoDBClient(database_name=database_name).get_collection(collection_name)
+    return sorted(tag for tag in collection.distinct("batch_tag") if tag is not None)
+
+
+def checked_batch_tags(collection_name: str, database_name: str = DATABASE_NAME) -> List[str]:
+    """Batch tags of ``collection_name`` already recorded as checked."""
+    registry = MongoDBClient(database_name=database_name).database[MONITORED_BATCHES_COLLECTION]
+    return sorted(registry.distinct("batch_tag", {"collection": collection_name}))
+
+
+def unchecked_batch_tags(
+    collection_name: str,
+    exclude: Iterable[str] = (REFERENCE_BATCH_TAG,),
+    database_name: str = DATABASE_NAME,
+) -> List[str]:
+    """Batch tags not yet checked, excluding ``exclude`` (the reference batch)."""
+    skip = set(checked_batch_tags(collection_name, database_name)) | set(exclude)
+    tags = [tag for tag in list_batch_tags(collection_name, database_name) if tag not in skip]
+    logger.info(f"Unchecked batches in '{collection_name}': {tags}")
+    return tags
+
+
+def mark_batches_checked(
+    collection_name: str,
+    drift_by_batch: Dict[str, bool],
+    database_name: str = DATABASE_NAME,
+) -> None:
+    """Record each batch in ``drift_by_batch`` as checked, with its drift verdict."""
+    if not drift_by_batch:
+        return
+
+    registry = MongoDBClient(database_name=database_name).database[MONITORED_BATCHES_COLLECTION]
+    checked_at = datetime.now(timezone.utc)
+    registry.bulk_write(
+        [
+            UpdateOne(
+                {"collection": collection_name, "batch_tag": tag},
+                {"$set": {"checked_at": checked_at, "drift_detected": bool(drift)}},
+                upsert=True,
+            )
+            for tag, drift in drift_by_batch.items()
+        ],
+        ordered=False,
+    )
+    logger.info(f"Marked {len(drift_by_batch)} batches of '{collection_name}' as checked")
@@ -7,69 +7,181 @@ query-based filtering (e.g. batch_tag).
 """
 
 import os
+import time
 import logging
-from typing import Optional, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterator, List, Set, Tuple
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import pymongo
+from bson import ObjectId
 from dotenv import load_dotenv
 
 from constant import DATABASE_NAME, MONGODB_URL_KEY
+from utils.snapshot_cache import SnapshotCache
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Connection pool settings, overridable through environment variables.
+POOL_SETTINGS_ENV = {
+    "maxPoolSize": ("MONGO_MAX_POOL_SIZE", 50),
+    "minPoolSize": ("MONGO_MIN_POOL_SIZE", 0),
+    "serverSelectionTimeoutMS": ("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30_000),
+    "connectTimeoutMS": ("MONGO_CONNECT_TIMEOUT_MS", 20_000),
+    "socketTimeoutMS": ("MONGO_SOCKET_TIMEOUT_MS", 0),
+}
+COLLECTION_NAMES_TTL_KEY = "MONGO_COLLECTION_NAMES_TTL_SECONDS"
+
+_client_lock = threading.Lock()
+_shared_clients: Dict[Tuple[int, str], pymongo.MongoClient] = {}
+_collection_names: Dict[Tuple[int, str, str], Tuple[float, Set[str]]] = {}
+
+
+def get_mongo_client(mongo_url: Optional[str] = None) -> pymongo.MongoClient:
+    """
+    Return the process-wide ``MongoClient`` for ``mongo_url``.
+
+    The client (and its connection pool) is created once per process and
+    URL with ``connect=False``, so no connection is opened until the first
+    operation. Clients are keyed by PID, so forked workers get their own.
+    """
+    if mongo_url is None:
+        mongo_url = os.getenv(MONGODB_URL_KEY, "mongodb://localhost:27017")
+
+    key = (os.getpid(), mongo_url)
+    with _client_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            options = {
+                option: int(os.getenv(env_key, default))
+                for option, (env_key, default) in POOL_SETTINGS_ENV.items()
+            }
+            options["socketTimeoutMS"] = options["socketTimeoutMS"] or None
+            client = pymongo.MongoClient(mongo_url, connect=False, **options)
+            _shared_clients[key] = client
+            logger.info(f"Created shared MongoDB client with {options}")
+        return client
+
 
 class MongoDBClient:
     """
     MongoDB client wrapper to manage connections and collections.
+
+    All instances in a process share one pooled ``pymongo.MongoClient``
+    (see ``get_mongo_client``), so creating a wrapper is cheap.
     """
 
     def __init__(self, database_name: str = DATABASE_NAME):
         self.mongo_url = os.getenv(MONGODB_URL_KEY, "mongodb://localhost:27017")
-        self.client = pymongo.MongoClient(self.mongo_url)
+        self.client = get_mongo_client(self.mongo_url)
 
         self.database_name = os.getenv("MONGO_DB_NAME", database_name)
         self.database = self.client[self.database_name]
 
-        logger.info(f"Connected to MongoDB database: {self.database_name}")
+        logger.info(f"Using MongoDB database: {self.database_name}")
 
     def get_collection(self, collection_name: str):
         """
         Retrieve a MongoDB collection handle.
         """
-        if collection_name not in self.database.list_collection_names():
+        collection_names, fresh = self._collection_names()
+        if collection_name not in collection_names and not fresh:
+            # The cached list may predate the collection; look once more.
+            collection_names, _ = self._collection_names(refresh=True)
+
+        if collection_name not in collection_names:
             logger.warning(
                 f"Collection '{collection_name}' not found in database "
                 f"'{self.database_name}'. Available collections: "
-                f"{self.database.list_collection_names()}"
+                f"{sorted(collection_names)}"
             )
 
         return self.database[collection_name]
 
+    def _collection_names(self, refresh: bool = False) -> Tuple[Set[str], bool]:
+        """
+        Collection names of the database, cached process-wide with a TTL.
+
+        Returns the names and whether they were just fetched from the server.
+        """
+        ttl = float(os.getenv(COLLECTION_NAMES_TTL_KEY, 60))
+        key = (os.getpid(), self.mongo_url, self.database_name)
+        now = time.monotonic()
+
+        with _client_lock:
+            cached = _collection_names.get(key)
+        if not refresh and cached is not None and now - cached[0] < ttl:
+            return cached[1], False
+
+        names = set(self.database.list_collection_names())
+        with _client_lock:
+            _collection_names[key] = (now, names)
+        return names, True
+
+    def ensure_index(self, collection_name: str, field: str) -> str:
+        """
+        Make sure ``field`` is indexed so filtered reads avoid collection scans.
+
+        ``create_index`` is a no-op when the index already exists.
+        """
+        index_name = self.get_collection(collection_name).create_index(field)
+        logger.info(f"Index '{index_name}' ensured on collection='{collection_name}'")
+        return index_name
+
     # Fetch documents from a MongoDB collection and return as a DataFrame.
     
     def fetch_as_dataframe(
         self,
         collection_name: str,
         query: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+        n_workers: int = 1,
+        partition_key: str = "id",
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None,
     ) -> pd.DataFrame:
-        
+        """
+        Fetch documents matching ``query`` as a DataFrame.
+
+        ``columns`` is pushed down as a projection, so only those fields
+        are transferred, and ``limit`` caps the number of documents read.
+
+        When ``batch_size`` is set, the cursor is streamed in batches of that
+        size into columnar Arrow buffers, so only one batch of raw documents
+        is held as Python dicts at any time.
+
+        When ``n_workers`` is greater than one, the query is split into
+        disjoint ranges of ``partition_key`` that are read concurrently
+        (see ``fetch_partitioned``).
+        """
 
         if query is None:
             query = {}
 
+        if n_workers > 1 and limit is not None:
+            logger.info(f"limit={limit} is read sequentially; n_workers={n_workers} ignored")
+        elif n_workers > 1:
+            return self.fetch_partitioned(
+                collection_name=collection_name,
+                query=query,
+                partition_key=partition_key,
+                n_workers=n_workers,
+                batch_size=batch_size,
+                columns=columns,
+            )
+
         collection = self.get_collection(collection_name)
 
         logger.info(
             f"Fetching data from collection='{collection_name}' "
-            f"with query={query}"
+            f"with query={query}, columns={columns}, limit={limit}"
         )
 
-        cursor = collection.find(query, {"_id": 0})
-        data = list(cursor)
-
-        df = pd.DataFrame(data)
+        df = self._read_query(collection, query, batch_size, columns, limit)
 
         if df.empty:
             logger.warning(
@@ -79,11 +191,367 @@ class MongoDBClient:
 
         return df
 
+    def fetch_partitioned(
+        self,
+        collection_name: str,
+        query: Optional[Dict[str, Any]] = None,
+        partition_key: str = "id",
+        n_workers: int = 4,
+        batch_size: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Read a query as ``n_workers`` disjoint ranges of ``partition_key``
+        in parallel and merge them into one DataFrame.
+
+        ``partition_key`` must be numeric (e.g. ``id``) or ``_id``
+        (ObjectIds are split on their embedded timestamp). Documents without
+        the key are read as one extra trailing partition. Partitions are
+        concatenated in key order and each partition is sorted by the key
+        (read even when ``columns`` leaves it out, and dropped afterwards;
+        ``_id`` is sorted by the server), so the row order is deterministic.
+        """
+        if query is None:
+            query = {}
+
+        collection = self.get_collection(collection_name)
+        partitions = self.partition_queries(
+            collection_name, query, partition_key, n_workers
+        )
+
+        logger.info(
+            f"Fetching data from collection='{collection_name}' "
+            f"with query={query} in {len(partitions)} partitions on "
+            f"'{partition_key}' using {n_workers} workers"
+        )
+
+        if partition_key == "_id":
+            # Always indexed: sorted by the server, without adding ObjectIds to the result.
+            read_columns, sort_key = columns, "_id"
+        else:
+            key_requested = columns is None or partition_key in columns
+            read_columns = columns if key_requested else [*columns, partition_key]
+            sort_key = None
+
+        def read_partition(partition_query: Dict[str, Any]) -> pd.DataFrame:
+            df = self._read_query(collection, partition_query, batch_size, read_columns, sort_key=sort_key)
+            if sort_key is None and partition_key in df.columns:
+                df = df.sort_values(partition_key, kind="mergesort")
+                if not key_requested:
+                    df = df.drop(columns=partition_key)
+            return df
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            frames = list(executor.map(read_partition, partitions))
+
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            logger.warning(
+                f"No documents found in collection='{collection_name}' "
+                f"for query={query}"
+            )
+            return pd.DataFrame()
+
+        return pd.concat(frames, ignore_index=True, sort=False)
+
+    def iter_dataframes(
+        self,
+        collection_name: str,
+        query: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None,
+        batch_size: int = 50_000,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream a query as DataFrames of at most ``batch_size`` rows.
+        """
+        if query is None:
+            query = {}
+
+        collection = self.get_collection(collection_name)
+        cursor = collection.find(query, build_projection(columns))
+        for table in iter_arrow_batches(cursor, batch_size=batch_size):
+            yield table.to_pandas(self_destruct=True, split_blocks=True)
+
+    def fingerprint(
+        self,
+        collection_name: str,
+        query: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Cheap freshness fingerprint of a query: the largest matching ``_id``
+        and the count of matching documents up to it, so documents inserted
+        while the fingerprint is taken are not counted.
+        """
+        if query is None:
+            query = {}
+
+        collection = self.get_collection(collection_name)
+        last = collection.find_one(query, {"_id": 1}, sort=[("_id", pymongo.DESCENDING)])
+        if last is None:
+            return {"count": 0, "max_id": None}
+        return {
+            "count": collection.count_documents(id_range(query, upper=last["_id"])),
+            "max_id": last["_id"],
+        }
+
+    def fetch_with_snapshot_cache(
+        self,
+        snapshot_cache: SnapshotCache,
+        collection_name: str,
+        query: Optional[Dict[str, Any]] = None,
+        **fetch_kwargs: Any,
+    ) -> pd.DataFrame:
+        """
+        ``fetch_as_dataframe`` backed by a local snapshot cache.
+
+        Appended documents are fetched incrementally using an ``_id`` range.
+        Every read is bounded by the fingerprint's ``max_id``, so documents
+        inserted during the read are left for the next refresh.
+        """
+        if query is None:
+            query = {}
+
+        key = snapshot_cache.make_key(
+            database=self.database_name,
+            collection=collection_name,
+            query=query,
+            columns=fetch_kwargs.get("columns"),
+        )
+
+        def fetch(after_id: Optional[Any], max_id: Optional[Any]) -> pd.DataFrame:
+            fetch_query = id_range(query, lower=after_id, upper=max_id)
+            return self.fetch_as_dataframe(collection_name, fetch_query, **fetch_kwargs)
+
+        return snapshot_cache.get_or_fetch(
+            key, self.fingerprint(collection_name, query), fetch
+        )
+
+    @staticmethod
+    def _read_query(
+        collection,
+        query: Dict[str, Any],
+        batch_size: Optional[int],
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        sort_key: Optional[str] = None,
+    ) -> pd.DataFrame:
+        cursor = collection.find(query, build_projection(columns))
+        if sort_key is not None:
+            cursor = cursor.sort(sort_key, pymongo.ASCENDING)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+
+        if batch_size is None:
+            return pd.DataFrame(list(cursor))
+
+        return arrow_batches_to_dataframe(
+            iter_arrow_batches(cursor, batch_size=batch_size)
+        )
+
+    def partition_queries(
+        self,
+        collection_name: str,
+        query: Dict[str, Any],
+        partition_key: str,
+        n_partitions: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Split ``query`` into disjoint range queries over ``partition_key``.
+        """
+        collection = self.get_collection(collection_name)
+
+        def bound(direction: int):
+            doc = collection.find_one(
+                {"$and": [query, {partition_key: {"$ne": None}}]},
+                {partition_key: 1},
+                sort=[(partition_key, direction)],
+            )
+            return None if doc is None else doc[partition_key]
+
+        low, high = bound(pymongo.ASCENDING), bound(pymongo.DESCENDING)
+        missing_key = {"$and": [query, {partition_key: None}]}
+        if low is None:
+            return [missing_key]
+
+        edges = _partition_edges(low, high, n_partitions)
+        ranges = []
+        for i, start in enumerate(edges[:-1]):
+            is_last = i == len(edges) - 2
+            stop_op = "$lte" if is_last else "$lt"
+            ranges.append({
+                "$and": [query, {partition_key: {"$gte": start, stop_op: edges[i + 1]}}]
+            })
+
+        return ranges + [missing_key]
+
+
+def build_query(
+    batch_tag: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    sample_fraction: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Combine a batch tag, extra filter predicates and an optional random
+    sample fraction into a single server-side MongoDB query.
+
+    Sampling uses ``$rand`` (MongoDB >= 4.4.2), so each document is kept
+    with probability ``sample_fraction`` without being sent to the client.
+    """
+    conditions = []
+    if batch_tag is not None:
+        conditions.append({"batch_tag": batch_tag})
+    if filters:
+        conditions.append(dict(filters))
+    if sample_fraction is not None and sample_fraction < 1.0:
+        conditions.append({"$expr": {"$lt": [{"$rand": {}}, sample_fraction]}})
+
+    if not conditions:
+        return {}
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def id_range(query: Dict[str, Any], lower: Any = None, upper: Any = None) -> Dict[str, Any]:
+    """Restrict ``query`` to ``lower < _id <= upper``; a None bound is left open."""
+    bounds = {}
+    if lower is not None:
+        bounds["$gt"] = lower
+    if upper is not None:
+        bounds["$lte"] = upper
+    if not bounds:
+        return query
+    if not query:
+        return {"_id": bounds}
+    return {"$and": [query, {"_id": bounds}]}
+
+
+def build_projection(columns: Optional[List[str]] = None) -> Dict[str, int]:
+    """Projection returning only ``columns`` (all fields if None), never ``_id`` unless requested."""
+    if columns is None:
+        return {"_id": 0}
+
+    projection = {column: 1 for column in columns}
+    projection.setdefault("_id", 0)
+    return projection
+
+
+def _partition_edges(low, high, n_partitions: int) -> list:
+    """
+    Evenly spaced, strictly increasing range edges from ``low`` to ``high``.
+    """
+    if isinstance(low, ObjectId):
+        start = low.generation_time.timestamp()
+        stop = high.generation_time.timestamp()
+        seconds = np.unique(np.linspace(start, stop, n_partitions + 1).astype(np.int64))
+        inner = [
+            ObjectId.from_datetime(pd.Timestamp(int(t), unit="s", tz="UTC").to_pydatetime())
+            for t in seconds[1:-1]
+        ]
+        return [low] + [oid for oid in inner if low < oid <= high] + [high]
+
+    if isinstance(low, bool) or not isinstance(low, (int, float, np.number)):
+        raise TypeError(
+            f"Cannot partition on values of type {type(low).__name__}; "
+            f"use a numeric key or '_id'"
+        )
+
+    edges = np.linspace(low, high, n_partitions + 1)
+    if isinstance(low, (int, np.integer)) and isinstance(high, (int, np.integer)):
+        edges = np.round(edges).astype(np.int64)
+
+    edges = np.unique(edges).tolist()
+    if len(edges) == 1:
+        edges = edges * 2
+    return edges
+
+
+def iter_arrow_batches(
+    cursor: pymongo.cursor.Cursor,
+    batch_size: int,
+) -> Iterator[pa.Table]:
+    """
+    Read a cursor in batches of ``batch_size`` documents.
+
+    Each batch is converted to a typed, columnar ``pyarrow.Table`` before the
+    next one is read, so the documents themselves never accumulate.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+    cursor = cursor.batch_size(batch_size)
+    documents = []
+    for document in cursor:
+        documents.append(document)
+        if len(documents) >= batch_size:
+            yield _documents_to_table(documents)
+            documents = []
+
+    if documents:
+        yield _documents_to_table(documents)
+
+
+def _documents_to_table(documents) -> pa.Table:
+    """Transpose documents into one typed Arrow column per field."""
+    # Field order follows first appearance; documents missing a field get nulls.
+    fields = list(dict.fromkeys(key for document in documents for key in document))
+    return pa.table({
+        field: _field_to_array(field, [document.get(field) for document in documents])
+        for field in fields
+    })
+
+
+def _field_to_array(field: str, values: list) -> pa.Array:
+    """
+    Typed Arrow array of one field's values.
+
+    Values Arrow cannot hold in one type (e.g. int and str ``Region_Code``
+    in one batch, or ObjectIds) are kept as strings, with nulls preserved.
+    """
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError) as exc:
+        logger.warning(f"Field '{field}' has mixed types in one batch; reading it as strings ({exc})")
+        return pa.array(pd.Series(values, dtype=object).map(str, na_action="ignore"), type=pa.string())
+
+
+def arrow_batches_to_dataframe(batches) -> pd.DataFrame:
+    """
+    Concatenate Arrow batches once and convert them to a DataFrame.
+
+    Columns missing from some batches are null-filled and numeric types are
+    widened (e.g. int64 + double -> double). Arrow buffers are released while
+    pandas takes ownership of the data, so peak memory stays close to the
+    size of the final frame.
+    """
+    tables = list(batches)
+    if not tables:
+        return pd.DataFrame()
+
+    try:
+        table = pa.concat_tables(tables, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as exc:
+        # Mixed, non-promotable types (e.g. str and int in one field):
+        # let pandas fall back to object columns.
+        logger.warning(f"Falling back to pandas concat for Arrow batches: {exc}")
+        return pd.concat(
+            [t.to_pandas() for t in tables], ignore_index=True, sort=False
+        )
+
+    del tables
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
 
 def get_data_as_dataframe(
     collection_name: str,
     query: Optional[Dict[str, Any]] = None,
     database_name: str = DATABASE_NAME,
+    batch_size: Optional[int] = None,
+    n_workers: int = 1,
+    partition_key: str = "id",
+    columns: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    snapshot_cache: Optional[SnapshotCache] = None,
 ) -> pd.DataFrame:
     """
     Convenience helper to fetch MongoDB data as a Pandas DataFrame.
@@ -91,12 +559,26 @@ def get_data_as_dataframe(
     This function abstracts away client creation and should be used
     by ZenML ingestion steps and other pipelines.
 
+    When ``snapshot_cache`` is given (and no ``limit`` is set), results are
+    served from the local snapshot cache when still fresh.
     """
     try:
         mongo_client = MongoDBClient(database_name=database_name)
+        fetch_kwargs = dict(
+            batch_size=batch_size,
+            n_workers=n_workers,
+            partition_key=partition_key,
+            columns=columns,
+            limit=limit,
+        )
+        if snapshot_cache is not None and limit is None:
+            return mongo_client.fetch_with_snapshot_cache(
+                snapshot_cache, collection_name, query, **fetch_kwargs
+            )
         return mongo_client.fetch_as_dataframe(
             collection_name=collection_name,
             query=query,
+            **fetch_kwargs,
         )
     except Exception as exc:
         logger.error(
@@ -104,3 +586,27 @@ def get_data_as_dataframe(
             f"with query={query} | Error: {exc}"
         )
         raise
+
+
+def ensure_index(
+    collection_name: str,
+    field: str = "batch_tag",
+    database_name: str = DATABASE_NAME,
+) -> Optional[str]:
+    """
+    Convenience helper to make sure ``field`` is indexed on a collection.
+    Meant as a one-off setup call by a user allowed to create indexes.
+
+    Failures (missing privileges, a read-only secondary, an unreachable
+    server) are logged and ignored, so ingestion can go ahead without the
+    index (at the cost of a collection scan).
+    """
+    try:
+        mongo_client = MongoDBClient(database_name=database_name)
+        return mongo_client.ensure_index(collection_name, field)
+    except pymongo.errors.PyMongoError as exc:
+        logger.warning(
+            f"Could not ensure index on '{field}' for collection="
+            f"'{collection_name}': {exc}"
+        )
+        return None
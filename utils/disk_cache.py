@@ -0,0 +1,108 @@
+"""
+Shared bookkeeping of the size-bounded, on-disk caches.
+
+``SnapshotCache`` and ``TransformCache`` both keep one directory per entry
+under ``cache_dir``, with a ``meta.json`` whose modification time marks
+the entry's last use. ``DiskCache`` is their common base:
+
+* ``record`` counts an outcome (hit, miss, ...) in the subclass's
+  process-wide ``stats`` and logs it with the running totals;
+* ``touch`` marks an entry as just used;
+* ``evict`` drops least recently used entries until the cache fits in
+  ``max_bytes``.
+
+New entries are written under ``staging_dir`` and renamed into place.
+``evict`` ignores names starting with ``.``, so it never removes an entry
+that another process is still writing.
+"""
+
+import logging
+import os
+import shutil
+import threading
+from collections import Counter
+from typing import ClassVar, Dict
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+META_FILE = "meta.json"
+# Directory under ``cache_dir`` holding entries that are still being written.
+STAGING_DIR = ".staging"
+
+# Counter incremented by each outcome passed to ``record``.
+OUTCOME_STATS: Dict[str, str] = {"hit": "hits", "miss": "misses", "refresh": "refreshes"}
+
+
+class DiskCache:
+    """
+    Base of the on-disk caches: entry directories, statistics and LRU eviction.
+    """
+
+    # Name used in log lines, e.g. "Snapshot cache".
+    label: ClassVar[str] = "Cache"
+    # Process-wide counters; each subclass defines its own, in log order.
+    stats: ClassVar[Counter] = Counter(hits=0, misses=0, evictions=0)
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def staging_dir(self, key: str) -> str:
+        """Private directory in which this process and thread writes ``key``."""
+        name = f"{key}-{os.getpid()}-{threading.get_ident()}"
+        return os.path.join(self.cache_dir, STAGING_DIR, name)
+
+    def publish(self, staging_dir: str, key: str) -> None:
+        """Move a fully written ``staging_dir`` into place as the entry for ``key``."""
+        entry_dir = self.entry_dir(key)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        try:
+            os.replace(staging_dir, entry_dir)
+        except OSError:
+            # Another writer published the same key first; keep theirs.
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def touch(self, key: str) -> None:
+        """Mark ``key`` as the most recently used entry."""
+        os.utime(os.path.join(self.entry_dir(key), META_FILE))
+
+    def record(self, outcome: str, key: str, detail: str = "") -> None:
+        """Count ``outcome`` ("hit", "miss" or "refresh") and log it with the totals."""
+        self.stats[OUTCOME_STATS[outcome]] += 1
+        totals = " ".join(f"{name}={count}" for name, count in self.stats.items())
+        logger.info(f"{self.label} {outcome}{detail} | key={key} | {totals}")
+
+    def evict(self, keep: str) -> None:
+        """Drop least recently used entries, never ``keep``, until the cache fits in max_bytes."""
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            entry_dir = self.entry_dir(key)
+            if key.startswith(".") or not os.path.isdir(entry_dir):
+                continue
+            try:
+                size = sum(
+                    os.path.getsize(os.path.join(entry_dir, name))
+                    for name in os.listdir(entry_dir)
+                )
+                meta_path = os.path.join(entry_dir, META_FILE)
+                last_used = os.path.getmtime(meta_path) if os.path.exists(meta_path) else 0.0
+            except FileNotFoundError:
+                # Removed by a concurrent eviction.
+                continue
+            entries.append((last_used, key, size))
+
+        total = sum(size for _, _, size in entries)
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+            total -= size
+            self.stats["evictions"] += 1
+            logger.info(f"{self.label} evicted entry={key} ({size / 1e6:.1f} MB)")
@@ -0,0 +1,247 @@
+# Vectorized drift statistics over binned feature histograms.
+# Computes PSI, Kolmogorov-Smirnov and Jensen-Shannon for every feature at once.
+
+"""Histogram binning against a reference layout and vectorized drift metrics.
+
+Every feature is binned against the reference profile:
+
+* numeric features use the reference percentile grid as bin edges, with
+  open-ended outer bins and a trailing bin for missing values;
+* categorical features use the reference categories, plus a bin for
+  categories unseen in the reference and a trailing bin for missing values.
+
+Bin codes for all features are offset into one index space, so a single
+``np.bincount`` per row chunk counts every histogram. The metrics are then
+computed on a padded ``(n_features, n_bins)`` matrix without looping in
+Python.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+PSI_EPSILON = 1e-6
+DEFAULT_CHUNK_ROWS = 1_000_000
+# Integer-valued columns spanning at most this many values are binned with a
+# lookup table instead of a binary search per row.
+MAX_LOOKUP_RANGE = 1 << 16
+
+
+def category_key(value: Any) -> str:
+    """Stable string key for a category value (28.0 and 28 both map to '28')."""
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class FeatureBins(NamedTuple):
+    """Binning of one feature: edges for numeric, categories for categorical."""
+    name: str
+    kind: str
+    edges: Optional[np.ndarray] = None
+    categories: Optional[List[str]] = None
+
+    @property
+    def n_bins(self) -> int:
+        if self.kind == "numeric":
+            # (-inf, e0), [e0, e1), ..., [e_last, inf), missing
+            return len(self.edges) + 2
+        # categories..., unseen, missing
+        return len(self.categories) + 2
+
+
+def layout_from_profile(profile: Dict[str, Any]) -> List[FeatureBins]:
+    """Bin layout defined by a reference profile."""
+    layout = []
+    for name, stats in profile["numeric"].items():
+        if stats.get("quantiles") is None:
+            continue
+        grid = np.unique(np.asarray(stats["quantiles"], dtype=np.float64))
+        layout.append(FeatureBins(name, "numeric", edges=grid[1:-1]))
+    for name, stats in profile["categorical"].items():
+        layout.append(FeatureBins(name, "categorical", categories=list(stats["frequencies"])))
+    return layout
+
+
+def _with_lookup_table(values: np.ndarray, encode, missing: int) -> np.ndarray:
+    """
+    Apply ``encode`` (float array -> int codes) to ``values``.
+
+    Small-range integer columns (ages, region codes, ...) are encoded once
+    per distinct value and then gathered, which is several times faster
+    than encoding every row. NaNs get the ``missing`` code.
+    """
+    is_nan = np.isnan(values)
+    finite = values[~is_nan] if is_nan.any() else values
+    if finite.size:
+        low, high = finite.min(), finite.max()
+        if high - low < MAX_LOOKUP_RANGE and np.array_equal(finite, np.floor(finite)):
+            table = encode(np.arange(low, high + 1))
+            codes = np.full(len(values), missing, dtype=np.int64)
+            codes[~is_nan] = table[(finite - low).astype(np.int64)]
+            return codes
+
+    codes = np.full(len(values), missing, dtype=np.int64)
+    codes[~is_nan] = encode(finite)
+    return codes
+
+
+def _numeric_codes(values: np.ndarray, bins: FeatureBins) -> np.ndarray:
+    return _with_lookup_table(
+        values,
+        lambda x: np.searchsorted(bins.edges, x, side="right"),
+        missing=bins.n_bins - 1,
+    )
+
+
+def _categorical_codes(series: pd.Series, bins: FeatureBins) -> np.ndarray:
+    unseen, missing = bins.n_bins - 2, bins.n_bins - 1
+
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        # Numeric codes (e.g. Region_Code): match against the numeric value of
+        # each category key instead of converting every row to a string.
+        keys = pd.to_numeric(pd.Series(bins.categories, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+        order = np.argsort(keys, kind="mergesort")
+        sorted_keys = keys[order]
+
+        def encode(x: np.ndarray) -> np.ndarray:
+            if not len(keys):
+                return np.full(len(x), unseen)
+            position = np.clip(np.searchsorted(sorted_keys, x), 0, len(keys) - 1)
+            return np.where(sorted_keys[position] == x, order[position], unseen)
+
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return _with_lookup_table(values, encode, missing=missing)
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Map the (few) categories once, then index with the integer codes.
+        lookup = pd.Index(bins.categories).get_indexer(
+            [category_key(value) for value in series.cat.categories]
+        )
+        lookup[lookup < 0] = unseen
+        series_codes = series.cat.codes.to_numpy()
+        return np.where(series_codes < 0, missing, lookup[series_codes]).astype(np.int64)
+
+    codes = pd.Categorical(series, categories=bins.categories).codes.astype(np.int64)
+    codes[codes < 0] = unseen
+    codes[series.isna().to_numpy()] = missing
+    return codes
+
+
+def histograms(
+    df: pd.DataFrame,
+    layout: List[FeatureBins],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> np.ndarray:
+    """
+    Count every feature of ``df`` into its bins.
+
+    Returns an ``(n_features, max_bins)`` array; bins beyond a feature's own
+    ``n_bins`` stay zero. Features absent from ``df`` have all-zero rows.
+    Rows are processed in chunks so temporary memory is bounded.
+    """
+    width = max((bins.n_bins for bins in layout), default=0)
+    counts = np.zeros(len(layout) * width, dtype=np.int64)
+    present = [(i, bins) for i, bins in enumerate(layout) if bins.name in df.columns]
+    if not present:
+        return counts.reshape(len(layout), width)
+
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        # One contiguous row of offset codes per feature, counted in one call.
+        codes = np.empty((len(present), len(chunk)), dtype=np.int64)
+        for row, (i, bins) in enumerate(present):
+            if bins.kind == "numeric":
+                values = chunk[bins.name].to_numpy(dtype=np.float64, na_value=np.nan)
+                np.add(_numeric_codes(values, bins), i * width, out=codes[row])
+            else:
+                np.add(_categorical_codes(chunk[bins.name], bins), i * width, out=codes[row])
+        counts += np.bincount(codes.ravel(), minlength=counts.size)
+
+    return counts.reshape(len(layout), width)
+
+
+def drift_metrics(
+    reference_counts: np.ndarray,
+    incoming_counts: np.ndarray,
+    n_bins: np.ndarray,
+    is_numeric: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    PSI, KS and Jensen-Shannon distance for every feature at once.
+
+    Args:
+        reference_counts: ``(n_features, width)`` reference bin counts.
+        incoming_counts: ``(n_features, width)`` incoming bin counts.
+        n_bins: Number of valid bins per feature (the rest is padding).
+        is_numeric: Whether each feature is numeric; KS is only defined for
+            ordered bins and is NaN for categorical features.
+
+    Returns:
+        Dict of ``(n_features,)`` arrays: ``psi``, ``ks`` and ``js``
+        (base-2 Jensen-Shannon divergence, in [0, 1]).
+    """
+    width = reference_counts.shape[1]
+    valid = np.arange(width)[None, :] < np.asarray(n_bins)[:, None]
+
+    def proportions(counts: np.ndarray) -> np.ndarray:
+        counts = np.where(valid, counts, 0).astype(np.float64)
+        totals = counts.sum(axis=1, keepdims=True)
+        return np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+
+    p = proportions(reference_counts)
+    q = proportions(incoming_counts)
+
+    # PSI with epsilon smoothing so empty bins do not produce infinities.
+    ratio = np.log((q + PSI_EPSILON) / (p + PSI_EPSILON))
+    psi = np.where(valid, (q - p) * ratio, 0.0).sum(axis=1)
+
+    m = 0.5 * (p + q)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kl_pm = np.where(p > 0, p * np.log2(p / m), 0.0).sum(axis=1)
+        kl_qm = np.where(q > 0, q * np.log2(q / m), 0.0).sum(axis=1)
+    js = 0.5 * (kl_pm + kl_qm)
+
+    # KS over the ordered bins, excluding the trailing missing-value bin.
+    ordered = valid & (np.arange(width)[None, :] < np.asarray(n_bins)[:, None] - 1)
+    cdf_gap = np.abs(np.cumsum(np.where(ordered, p - q, 0.0), axis=1))
+    ks = np.where(np.asarray(is_numeric), cdf_gap.max(axis=1), np.nan)
+
+    return {"psi": psi, "ks": ks, "js": js}
+
+
+def compare_profiles(
+    reference_profile: Dict[str, Any],
+    incoming_profile: Dict[str, Any],
+) -> Dict[str, Dict[str, float]]:
+    """
+    Drift metrics for every feature histogrammed in both profiles.
+    """
+    layout = [
+        bins for bins in layout_from_profile(reference_profile)
+        if bins.name in reference_profile.get("histograms", {})
+        and bins.name in incoming_profile.get("histograms", {})
+    ]
+    if not layout:
+        return {}
+
+    width = max(bins.n_bins for bins in layout)
+
+    def stack(profile: Dict[str, Any]) -> np.ndarray:
+        matrix = np.zeros((len(layout), width), dtype=np.int64)
+        for i, bins in enumerate(layout):
+            counts = profile["histograms"][bins.name]
+            matrix[i, :len(counts)] = counts
+        return matrix
+
+    metrics = drift_metrics(
+        stack(reference_profile),
+        stack(incoming_profile),
+        n_bins=np.array([bins.n_bins for bins in layout]),
+        is_numeric=np.array([bins.kind == "numeric" for bins in layout]),
+    )
+    return {
+        bins.name: {name: float(values[i]) for name, values in metrics.items()}
+        for i, bins in enumerate(layout)
+    }
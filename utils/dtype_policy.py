@@ -0,0 +1,86 @@
+"""
+Schema-driven dtypes for ingested frames and float32 feature matrices.
+
+``apply_dtype_policy`` converts each column named in ``COLUMN_DTYPES``:
+
+* ``"category"``: pandas categoricals (one small integer code per row
+  instead of a Python string);
+* ``"integer"``: the smallest signed or unsigned integer type that holds
+  the values. Columns with missing or non-integral values become float32
+  instead, with a warning;
+* any other name is a NumPy dtype (e.g. ``"float32"``).
+
+Preprocessors must still compute exactly as on untyped data, so
+``as_model_input`` upcasts float32 columns back to float64 (exact) for the
+duration of a fit or transform: sklearn would otherwise scale them in
+float32. Integer and categorical columns already give identical results.
+
+``transform_to_float32`` runs a fitted preprocessor over row chunks and
+writes into one preallocated float32 matrix, so the full float64 output
+never exists. The forest casts its input to float32 anyway, so the model
+sees exactly the same values.
+"""
+
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from constant import COLUMN_DTYPES
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_TRANSFORM_CHUNK_ROWS = 100_000
+
+
+def _smallest_integer(series: pd.Series) -> pd.Series:
+    if series.isna().any():
+        logger.warning(f"Column '{series.name}' has missing values; stored as float32 instead of integer")
+        return series.astype(np.float32)
+    if series.dtype.kind == "f" and not np.all(np.mod(series.to_numpy(), 1) == 0):
+        logger.warning(f"Column '{series.name}' has non-integral values; stored as float32 instead of integer")
+        return series.astype(np.float32)
+    if series.empty:
+        return series.astype(np.uint8)
+    return pd.to_numeric(series, downcast="unsigned" if series.min() >= 0 else "integer")
+
+
+def apply_dtype_policy(df: pd.DataFrame, policy: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Convert the policy's columns in place (columns not in ``df`` are skipped); returns ``df``."""
+    policy = COLUMN_DTYPES if policy is None else policy
+    before = df.memory_usage(deep=True).sum()
+    for column, kind in policy.items():
+        if column not in df.columns:
+            continue
+        if kind == "category":
+            df[column] = df[column].astype("category")
+        elif kind == "integer":
+            df[column] = _smallest_integer(df[column])
+        else:
+            df[column] = df[column].astype(kind)
+    after = df.memory_usage(deep=True).sum()
+    logger.info(f"Dtype policy applied: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+    return df
+
+
+def as_model_input(X: pd.DataFrame) -> pd.DataFrame:
+    """``X`` with float32 columns upcast to float64 (other columns are shared, not copied)."""
+    float32_columns = [column for column, dtype in X.dtypes.items() if dtype == np.float32]
+    if not float32_columns:
+        return X
+    return X.assign(**{column: X[column].astype(np.float64) for column in float32_columns})
+
+
+def transform_to_float32(preprocessor, X: pd.DataFrame, chunk_rows: int = DEFAULT_TRANSFORM_CHUNK_ROWS) -> np.ndarray:
+    """``preprocessor.transform(X)`` as float32, computed chunk by chunk into one array."""
+    out = None
+    for start in range(0, max(len(X), 1), chunk_rows):
+        block = preprocessor.transform(as_model_input(X.iloc[start:start + chunk_rows]))
+        if hasattr(block, "toarray"):
+            block = block.toarray()
+        if out is None:
+            out = np.empty((len(X), block.shape[1]), dtype=np.float32)
+        out[start:start + len(block)] = block
+    return out
@@ -0,0 +1,209 @@
+"""
+Binary classification metrics derived from one set of predicted probabilities.
+
+Everything here works on ``y_true`` (0/1) and the positive-class
+probability ``score``, so the model runs once per evaluation:
+
+* ``threshold_sweep`` sorts the scores once and takes cumulative sums of
+  positives and negatives, giving precision, recall and F1 at every
+  distinct threshold (``score >= threshold``) in O(n log n);
+* ROC-AUC and PR-AUC (average precision) are read off the same sweep and
+  match ``roc_auc_score`` and ``average_precision_score``;
+* ``calibration_bins`` is a reliability table from three ``np.bincount``
+  calls, plus the expected calibration error;
+* ``bootstrap_metrics`` resamples in batches. Every row gets one code
+  combining its distinct-score group, label and prediction. Resampling
+  ``n`` rows with replacement draws each code's count from a multinomial
+  over the codes' frequencies, so a batch of resamples is one
+  ``rng.multinomial`` call giving a ``(batch, groups, 2, 2)`` count table,
+  without drawing row indices. The batch is capped so its tables fit in
+  ``memory_budget_mb``. Each resample's
+  ROC-AUC, PR-AUC, precision, recall and F1 follow from cumulative sums
+  over that small table, with no per-resample sort. Forest probabilities
+  take few distinct values, so the table stays tiny.
+"""
+
+from typing import Any, Dict, NamedTuple, Optional
+
+import numpy as np
+
+DEFAULT_N_BOOTSTRAP = 200
+DEFAULT_BOOTSTRAP_BATCH = 32
+DEFAULT_BOOTSTRAP_MEMORY_MB = 64
+# float64 values held per code and resample: the count table plus the
+# cumulative sums and ratios derived from it.
+BOOTSTRAP_BYTES_PER_CODE = 3 * 8
+DEFAULT_CALIBRATION_BINS = 10
+BOOTSTRAP_METRICS = ("roc_auc", "pr_auc", "precision", "recall", "f1")
+
+
+class ScoreGroups(NamedTuple):
+    """Rows sorted by descending score, grouped by distinct score."""
+    order: np.ndarray
+    starts: np.ndarray
+    thresholds: np.ndarray
+
+
+def group_scores(score: np.ndarray) -> ScoreGroups:
+    order = np.argsort(score, kind="mergesort")[::-1]
+    sorted_score = score[order]
+    starts = np.flatnonzero(np.r_[True, sorted_score[1:] != sorted_score[:-1]])
+    return ScoreGroups(order, starts, sorted_score[starts])
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1), 0.0)
+
+
+def _curve_metrics(pos: np.ndarray, neg: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    ROC-AUC and PR-AUC from per-group positive/negative (weighted) counts
+    in descending score order; the last axis runs over groups.
+    """
+    tps = np.cumsum(pos, axis=-1)
+    fps = np.cumsum(neg, axis=-1)
+    total_pos = tps[..., -1:]
+    total_neg = fps[..., -1:]
+
+    # Ties count half, as in the trapezoidal ROC curve.
+    roc_auc = np.sum(neg * (tps - pos / 2.0), axis=-1) / (total_pos * total_neg)[..., 0]
+    precision = _safe_divide(tps, tps + fps)
+    pr_auc = np.sum(pos * precision, axis=-1) / total_pos[..., 0]
+    return {"roc_auc": roc_auc, "pr_auc": pr_auc}
+
+
+def threshold_sweep(y_true: np.ndarray, score: np.ndarray, groups: Optional[ScoreGroups] = None) -> Dict[str, np.ndarray]:
+    """
+    Precision, recall and F1 for ``score >= threshold`` at every distinct
+    threshold (descending), plus ROC-AUC and PR-AUC.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    groups = groups or group_scores(score)
+    pos = np.add.reduceat(y_true[groups.order].astype(np.float64), groups.starts)
+    sizes = np.diff(np.r_[groups.starts, len(score)])
+    neg = sizes - pos
+
+    tps = np.cumsum(pos)
+    fps = np.cumsum(neg)
+    precision = _safe_divide(tps, tps + fps)
+    recall = _safe_divide(tps, np.full_like(tps, tps[-1]))
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+    curves = _curve_metrics(pos, neg)
+    return {
+        "thresholds": groups.thresholds,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "roc_auc": float(curves["roc_auc"]),
+        "pr_auc": float(curves["pr_auc"]),
+    }
+
+
+def metrics_at(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, Any]:
+    """Confusion matrix ``[[tn, fp], [fn, tp]]``, precision, recall, F1 and accuracy."""
+    y_true = np.asarray(y_true).astype(bool)
+    y_pred = np.asarray(y_pred).astype(bool)
+    cells = np.bincount(2 * y_true + y_pred, minlength=4)
+    tn, fp, fn, tp = (int(c) for c in cells)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {
+        "confusion_matrix": cells.reshape(2, 2),
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "accuracy": (tp + tn) / len(y_true),
+    }
+
+
+def calibration_bins(y_true: np.ndarray, score: np.ndarray, n_bins: int = DEFAULT_CALIBRATION_BINS) -> Dict[str, Any]:
+    """
+    Reliability table over ``n_bins`` equal-width probability bins: count,
+    mean predicted probability and observed positive rate per bin, plus
+    the expected calibration error (count-weighted mean absolute gap).
+    """
+    bins = np.minimum((score * n_bins).astype(np.intp), n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins)
+    mean_score = _safe_divide(np.bincount(bins, weights=score, minlength=n_bins), counts)
+    positive_rate = _safe_divide(np.bincount(bins, weights=np.asarray(y_true, dtype=np.float64), minlength=n_bins), counts)
+    ece = float(np.sum(counts * np.abs(mean_score - positive_rate)) / counts.sum())
+    return {
+        "bin_edges": np.linspace(0.0, 1.0, n_bins + 1),
+        "counts": counts,
+        "mean_predicted": mean_score,
+        "positive_rate": positive_rate,
+        "expected_calibration_error": ece,
+    }
+
+
+def bootstrap_metrics(
+    y_true: np.ndarray,
+    score: np.ndarray,
+    y_pred: np.ndarray,
+    n_bootstrap: int = DEFAULT_N_BOOTSTRAP,
+    batch_size: int = DEFAULT_BOOTSTRAP_BATCH,
+    random_state: Optional[int] = None,
+    groups: Optional[ScoreGroups] = None,
+    memory_budget_mb: float = DEFAULT_BOOTSTRAP_MEMORY_MB,
+) -> Dict[str, np.ndarray]:
+    """
+    Metric values on ``n_bootstrap`` resamples of the rows.
+
+    At most ``batch_size`` resamples are drawn at once, fewer if their
+    count tables would exceed ``memory_budget_mb``. Resamples without both
+    classes get NaN for ROC-AUC and PR-AUC.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    y_pred = np.asarray(y_pred).astype(bool)
+    n = len(y_true)
+    rng = np.random.default_rng(random_state)
+    groups = groups or group_scores(score)
+    n_groups = len(groups.starts)
+
+    # code = (group, label, prediction) of each row, in original row order.
+    group_of_row = np.empty(n, dtype=np.intp)
+    group_of_row[groups.order] = np.repeat(np.arange(n_groups), np.diff(np.r_[groups.starts, n]))
+    codes = group_of_row * 4 + y_true * 2 + y_pred
+    n_codes = n_groups * 4
+    present, counts = np.unique(codes, return_counts=True)
+    frequencies = counts / n
+
+    budget_batch = int(memory_budget_mb * 2**20 // (n_codes * BOOTSTRAP_BYTES_PER_CODE))
+    batch_size = max(1, min(batch_size, budget_batch))
+
+    results = {name: np.empty(n_bootstrap) for name in BOOTSTRAP_METRICS}
+    for start in range(0, n_bootstrap, batch_size):
+        size = min(batch_size, n_bootstrap - start)
+        table = np.zeros((size, n_codes), dtype=np.float64)
+        table[:, present] = rng.multinomial(n, frequencies, size=size)
+        table = table.reshape(size, n_groups, 2, 2)
+
+        pos = table[:, :, 1, :].sum(axis=2)
+        neg = table[:, :, 0, :].sum(axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            curves = _curve_metrics(pos, neg)
+        one_class = (pos.sum(axis=1) == 0) | (neg.sum(axis=1) == 0)
+        for name in ("roc_auc", "pr_auc"):
+            values = curves[name]
+            values[one_class] = np.nan
+            results[name][start:start + size] = values
+
+        by_cell = table.sum(axis=1)
+        tp = by_cell[:, 1, 1]
+        precision = _safe_divide(tp, tp + by_cell[:, 0, 1])
+        recall = _safe_divide(tp, tp + by_cell[:, 1, 0])
+        results["precision"][start:start + size] = precision
+        results["recall"][start:start + size] = recall
+        results["f1"][start:start + size] = _safe_divide(2 * precision * recall, precision + recall)
+    return results
+
+
+def confidence_intervals(samples: Dict[str, np.ndarray], confidence: float = 0.95) -> Dict[str, Dict[str, float]]:
+    """Percentile intervals ``{metric: {"lower", "upper"}}`` from bootstrap samples."""
+    alpha = (1.0 - confidence) / 2.0
+    intervals = {}
+    for name, values in samples.items():
+        lower, upper = np.nanquantile(values, [alpha, 1.0 - alpha])
+        intervals[name] = {"lower": float(lower), "upper": float(upper)}
+    return intervals
@@ -0,0 +1,219 @@
+"""
+Compiled, pandas-free version of the fitted preprocessing pipeline.
+
+``CompiledPreprocessor.from_sklearn`` flattens the fitted
+``Pipeline([ColumnTransformer(...)])`` from ``data_transformation`` into a
+fixed transform plan:
+
+* every numeric output column (``StandardScaler``, ``MinMaxScaler`` and
+  passthrough) is one entry of fused vectors, computed in one vectorized
+  pass as ``((x - sub) / div) * mul + add``. For a standard-scaled column
+  ``sub, div = mean_, scale_`` and ``mul, add = 1, 0``; for a min-max
+  column ``sub, div = 0, 1`` and ``mul, add = scale_, min_``; passthrough
+  uses the identity. These reproduce sklearn's own operation order, so
+  the results are bit-for-bit identical;
+* every one-hot feature is a dict from category to output position
+  (unknown categories produce an all-zero block, as with
+  ``handle_unknown="ignore"``);
+* output positions are precomputed, so a transform fills one
+  preallocated ``float64`` array.
+
+The plan reads columns by name from a dict (one row), a list of dicts, a
+NumPy structured/record array, or anything else indexable by column name.
+Unsupported configurations (sparse output, ``drop``, infrequent
+categories, other transformers) raise ``NotImplementedError`` at compile
+time, so callers can fall back to the sklearn object.
+"""
+
+from typing import Any, Dict, List, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, MinMaxScaler, OneHotEncoder, StandardScaler
+
+Rows = Union[Mapping[str, Any], Sequence[Mapping[str, Any]], np.ndarray]
+
+
+def _column_transformer(preprocessor) -> ColumnTransformer:
+    if isinstance(preprocessor, Pipeline):
+        if len(preprocessor.steps) != 1:
+            raise NotImplementedError("only single-step pipelines can be compiled")
+        preprocessor = preprocessor.steps[0][1]
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise NotImplementedError(f"cannot compile {type(preprocessor).__name__}")
+    return preprocessor
+
+
+def _column_names(ct: ColumnTransformer, columns) -> List[str]:
+    names = np.asarray(ct.feature_names_in_)
+    if isinstance(columns, slice) or np.asarray(columns).dtype.kind in "iub":
+        return list(names[columns])
+    return [str(column) for column in columns]
+
+
+def _is_passthrough(transformer) -> bool:
+    if isinstance(transformer, str):
+        return transformer == "passthrough"
+    return (
+        isinstance(transformer, FunctionTransformer)
+        and transformer.func is None
+        and transformer.inverse_func is None
+    )
+
+
+class CompiledPreprocessor:
+    """
+    Precomputed transform plan equivalent to a fitted ``ColumnTransformer``.
+    """
+
+    def __init__(
+        self,
+        n_outputs: int,
+        numeric_features: List[str],
+        numeric_positions: np.ndarray,
+        affine: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+        clip: Tuple[np.ndarray, np.ndarray],
+        onehot: List[Tuple[str, Dict[Any, int], bool]],
+    ):
+        self.n_outputs = n_outputs
+        self.numeric_features = numeric_features
+        self.numeric_positions = numeric_positions
+        self.sub, self.div, self.mul, self.add = affine
+        self.clip_low, self.clip_high = clip
+        self.needs_clip = bool(np.isfinite(self.clip_low).any() or np.isfinite(self.clip_high).any())
+        self.onehot = onehot
+
+    @classmethod
+    def from_sklearn(cls, preprocessor) -> "CompiledPreprocessor":
+        """Compile a fitted ``ColumnTransformer`` (or one-step ``Pipeline`` around it)."""
+        ct = _column_transformer(preprocessor)
+        numeric_features, positions = [], []
+        sub, div, mul, add, low, high = [], [], [], [], [], []
+        onehot = []
+
+        def numeric(names, start, sub_, div_, mul_, add_, low_=-np.inf, high_=np.inf):
+            for i, name in enumerate(names):
+                numeric_features.append(name)
+                positions.append(start + i)
+                for vector, value in ((sub, sub_), (div, div_), (mul, mul_), (add, add_), (low, low_), (high, high_)):
+                    vector.append(value[i] if np.ndim(value) else value)
+
+        for name, transformer, columns in ct.transformers_:
+            if isinstance(transformer, str) and transformer == "drop":
+                continue
+            names = _column_names(ct, columns)
+            output = ct.output_indices_[name]
+            if not names:
+                continue
+            start = output.start
+
+            if _is_passthrough(transformer):
+                numeric(names, start, 0.0, 1.0, 1.0, 0.0)
+            elif isinstance(transformer, StandardScaler):
+                mean = transformer.mean_ if transformer.with_mean else 0.0
+                scale = transformer.scale_ if transformer.with_std else 1.0
+                numeric(names, start, mean, scale, 1.0, 0.0)
+            elif isinstance(transformer, MinMaxScaler):
+                if transformer.clip:
+                    numeric(names, start, 0.0, 1.0, transformer.scale_, transformer.min_, *transformer.feature_range)
+                else:
+                    numeric(names, start, 0.0, 1.0, transformer.scale_, transformer.min_)
+            elif isinstance(transformer, OneHotEncoder):
+                if transformer.drop_idx_ is not None or getattr(transformer, "_infrequent_enabled", False):
+                    raise NotImplementedError("OneHotEncoder with drop or infrequent categories")
+                if transformer.sparse_output:
+                    raise NotImplementedError("OneHotEncoder with sparse output")
+                offset = start
+                for feature, categories in zip(names, transformer.categories_):
+                    lookup = {category: offset + i for i, category in enumerate(categories.tolist())}
+                    onehot.append((feature, lookup, transformer.handle_unknown == "error"))
+                    offset += len(categories)
+            else:
+                raise NotImplementedError(f"cannot compile transformer {type(transformer).__name__}")
+
+        n_outputs = max(output.stop for output in ct.output_indices_.values())
+        as_array = lambda values: np.asarray(values, dtype=np.float64)
+        return cls(
+            n_outputs=n_outputs,
+            numeric_features=numeric_features,
+            numeric_positions=np.asarray(positions, dtype=np.intp),
+            affine=(as_array(sub), as_array(div), as_array(mul), as_array(add)),
+            clip=(as_array(low), as_array(high)),
+            onehot=onehot,
+        )
+
+    def check_row(self, row: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Validate one row against the plan, before it is batched with others.
+
+        Numeric values are coerced to ``float`` (numeric strings are parsed,
+        ``None`` becomes NaN, as in ``transform``). Categorical values must
+        be scalars, and known categories when the encoder uses
+        ``handle_unknown="error"``. Returns a coerced copy of the row.
+
+        Raises:
+            ValueError: naming the offending column, if the row would make
+                ``transform`` fail.
+        """
+        checked = dict(row)
+        for name in self.numeric_features:
+            value = row[name]
+            if value is None:
+                checked[name] = np.nan
+                continue
+            if not isinstance(value, (bool, int, float, str)):
+                raise ValueError(f"column '{name}' expects a number, got {type(value).__name__}")
+            try:
+                checked[name] = float(value)
+            except ValueError:
+                raise ValueError(f"column '{name}' expects a number, got {value!r}") from None
+        for name, lookup, strict in self.onehot:
+            value = row[name]
+            if value is not None and not isinstance(value, (bool, int, float, str)):
+                raise ValueError(f"column '{name}' expects a category, got {type(value).__name__}")
+            if strict and value not in lookup:
+                raise ValueError(f"unknown category {value!r} in column '{name}'")
+        return checked
+
+    def transform(self, X: Rows) -> np.ndarray:
+        """
+        Transform rows into the model's ``float64`` feature matrix.
+
+        Args:
+            X: A dict (one row), a list of dicts, or a column-indexable
+                batch such as a NumPy record array.
+        """
+        if isinstance(X, Mapping):
+            X = [X]
+        if isinstance(X, (list, tuple)):
+            column = lambda name: [row[name] for row in X]
+            n_rows = len(X)
+        else:
+            column = lambda name: X[name]
+            n_rows = len(X)
+
+        out = np.zeros((n_rows, self.n_outputs), dtype=np.float64)
+
+        if self.numeric_features:
+            values = np.empty((n_rows, len(self.numeric_features)), dtype=np.float64)
+            for j, name in enumerate(self.numeric_features):
+                values[:, j] = column(name)
+            values -= self.sub
+            values /= self.div
+            values *= self.mul
+            values += self.add
+            if self.needs_clip:
+                np.clip(values, self.clip_low, self.clip_high, out=values)
+            out[:, self.numeric_positions] = values
+
+        for name, lookup, strict in self.onehot:
+            positions = np.fromiter(
+                (lookup.get(value, -1) for value in column(name)), dtype=np.intp, count=n_rows
+            )
+            known = positions >= 0
+            if strict and not known.all():
+                raise ValueError(f"Found unknown categories in column '{name}' during transform")
+            out[np.flatnonzero(known), positions[known]] = 1.0
+
+        return out
@@ -0,0 +1,214 @@
+"""
+Array-backed inference engine for a fitted ``RandomForestClassifier``.
+
+``FlatForest.from_sklearn`` concatenates every tree's nodes into flat,
+contiguous arrays:
+
+* ``feature`` (int32), ``threshold`` (float32), ``missing_left`` (bool);
+* ``children`` (int32, ``(n_nodes, 2)`` global ids of the left and right
+  child) and ``is_leaf`` (bool);
+* ``value`` (float64), each node's class probabilities;
+* ``roots`` (int32), the root node id of each tree.
+
+Leaves point to themselves, so one traversal step is a few gathers over
+all active (row, tree) pairs: finished pairs just stay on their leaf.
+Pairs that reached a leaf are dropped from the active set once enough
+have accumulated, so the work follows the actual path lengths rather
+than the deepest tree.
+
+sklearn compares ``float32(x) <= float64(threshold)``. Each float32
+threshold here is the largest float32 not above the float64 one, which
+gives the same decision for every float32 ``x``. Missing values follow
+``missing_left`` as in sklearn. Tree probabilities are accumulated in
+tree order and divided by the number of trees, as in
+``RandomForestClassifier.predict_proba`` with ``n_jobs=None``, so the
+probabilities are identical. With parallel prediction, sklearn's summation
+order varies, which changes only the last bits.
+
+``save``/``load`` use a directory of ``.npy`` files plus ``meta.json``;
+``load(mmap_mode="r")`` maps the arrays instead of reading them, so
+loading is nearly instant and the pages are shared between processes.
+"""
+
+import os
+import json
+from typing import Any, Dict, Optional
+
+import numpy as np
+import sklearn
+from sklearn.utils.fixes import parse_version
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+ARRAYS = ("feature", "threshold", "children", "is_leaf", "missing_left", "value", "roots")
+DEFAULT_CHUNK_ROWS = 8192
+# Finished (row, tree) pairs are compacted away once they exceed this
+# fraction of the active set.
+COMPACT_FRACTION = 0.1
+
+# Since 1.4, sklearn stores class fractions in tree_.value instead of
+# weighted counts, and predict_proba no longer normalizes them.
+_VALUES_ARE_FRACTIONS = parse_version(sklearn.__version__) >= parse_version("1.4")
+
+
+def _float32_at_most(threshold: np.ndarray) -> np.ndarray:
+    """Largest float32 <= each float64 threshold (keeps ``x <= t`` decisions for float32 x)."""
+    rounded = threshold.astype(np.float32)
+    above = rounded.astype(np.float64) > threshold
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+class FlatForest:
+    """
+    Fitted random forest as flat NumPy arrays with a vectorized traversal.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.classes_ = np.asarray(meta["classes"])
+        self.n_features = meta["n_features"]
+        self.max_depth = meta["max_depth"]
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
+
+    @classmethod
+    def from_sklearn(cls, model) -> "FlatForest":
+        """Flatten a fitted single-output ``RandomForestClassifier``."""
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise NotImplementedError("only single-output forests can be flattened")
+
+        n_classes = len(model.classes_)
+        parts = {name: [] for name in ARRAYS}
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left < 0
+
+            parts["roots"].append(offset)
+            parts["feature"].append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            parts["threshold"].append(_float32_at_most(np.where(is_leaf, 0.0, tree.threshold)))
+            parts["children"].append((np.stack([
+                np.where(is_leaf, nodes, tree.children_left),
+                np.where(is_leaf, nodes, tree.children_right),
+            ], axis=1) + offset).astype(np.int32))
+            parts["is_leaf"].append(is_leaf)
+            missing_left = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8))
+            parts["missing_left"].append(np.asarray(missing_left).astype(bool))
+
+            value = tree.value[:, 0, :n_classes].astype(np.float64)
+            if not _VALUES_ARE_FRACTIONS:
+                normalizer = value.sum(axis=1)[:, None]
+                normalizer[normalizer == 0.0] = 1.0
+                value = value / normalizer
+            parts["value"].append(value)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        if offset >= np.iinfo(np.int32).max:
+            raise NotImplementedError("forest too large for int32 node ids")
+
+        arrays = {
+            name: np.ascontiguousarray(np.concatenate(chunks) if name != "roots" else np.asarray(chunks, dtype=np.int32))
+            for name, chunks in parts.items()
+        }
+        meta = {
+            "classes": model.classes_.tolist(),
+            "n_features": int(model.n_features_in_),
+            "max_depth": int(max_depth),
+        }
+        return cls(arrays, meta)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node id reached by every row in every tree, shape ``(n_rows, n_estimators)``."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        has_nan = bool(np.isnan(flat_X).any())
+        children = self.children.ravel()
+
+        # One entry per (row, tree) pair: current node and the row's offset in flat_X.
+        nodes = np.tile(self.roots.astype(np.intp), n_rows)
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.intp) * n_features, self.n_estimators)
+        active = np.arange(nodes.size)
+        leaves = np.empty(nodes.size, dtype=np.intp)
+
+        while active.size:
+            x = flat_X[row_offsets + self.feature[nodes]]
+            go_right = ~(x <= self.threshold[nodes])
+            if has_nan:
+                is_nan = np.isnan(x)
+                go_right[is_nan] = ~self.missing_left[nodes[is_nan]]
+            nodes = children[2 * nodes + go_right]
+
+            done = self.is_leaf[nodes]
+            n_done = np.count_nonzero(done)
+            if n_done == done.size:
+                leaves[active] = nodes
+                break
+            if n_done > COMPACT_FRACTION * done.size:
+                leaves[active[done]] = nodes[done]
+                keep = ~done
+                active, nodes, row_offsets = active[keep], nodes[keep], row_offsets[keep]
+
+        return leaves.reshape(n_rows, self.n_estimators)
+
+    def predict_proba(self, X: np.ndarray, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+        """Class probabilities, identical to ``RandomForestClassifier.predict_proba``."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X has shape {X.shape}, expected (n_rows, {self.n_features})")
+
+        proba = np.zeros((len(X), len(self.classes_)), dtype=np.float64)
+        for start in range(0, len(X), chunk_rows):
+            leaves = self.apply(X[start:start + chunk_rows])
+            out = proba[start:start + chunk_rows]
+            # Tree-ordered accumulation, as in sklearn's _accumulate_prediction.
+            for tree in range(self.n_estimators):
+                out += self.value[leaves[:, tree]]
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, directory: str) -> None:
+        """Write the arrays as ``.npy`` files plus ``meta.json`` into ``directory``."""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "classes": self.classes_.tolist(),
+            "n_features": self.n_features,
+            "max_depth": self.max_depth,
+        }
+        with open(os.path.join(directory, META_FILE), "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "FlatForest":
+        """Load a saved forest; arrays are memory-mapped unless ``mmap_mode`` is None."""
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported flat forest format {meta.get('format_version')}")
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ARRAYS
+        }
+        return cls(arrays, meta)
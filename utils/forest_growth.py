@@ -0,0 +1,161 @@
+"""
+Incremental RandomForest growth with out-of-bag (OOB) early stopping.
+
+``grow_forest`` fits the forest in increments of ``increment`` trees with
+``warm_start=True``. After each increment it scores the out-of-bag
+predictions and stops once the OOB ROC-AUC has not improved by more than
+``tolerance`` for ``patience`` increments, or when ``max_estimators`` is
+reached. The forest is then trimmed to the tree count of the best score.
+
+Setting ``oob_score=True`` on a warm-started forest would recompute the
+OOB predictions of *every* tree after each increment, which is quadratic
+in the number of trees. ``OOBAccumulator`` instead adds only the new
+trees' predictions to running per-row sums, so the whole curve costs one
+OOB pass over the final forest. It uses the same bootstrap indices as
+sklearn's own OOB computation (the private ``_generate_unsampled_indices``),
+so the accumulated probabilities equal ``oob_decision_function_``.
+"""
+
+import inspect
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble._forest import _generate_unsampled_indices, _get_n_samples_bootstrap
+
+from utils.evaluation_engine import threshold_sweep
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# sklearn >= 1.7 threads sample weights through the bootstrap index helpers.
+_SAMPLING_TAKES_WEIGHT = "sample_weight" in inspect.signature(_generate_unsampled_indices).parameters
+
+
+def _unsampled_indices(model: RandomForestClassifier, estimator, n_samples: int) -> np.ndarray:
+    n_samples_bootstrap = getattr(model, "_n_samples_bootstrap", None)
+    if _SAMPLING_TAKES_WEIGHT:
+        sample_weight = getattr(model, "_sample_weight", None)
+        if n_samples_bootstrap is None:
+            n_samples_bootstrap = _get_n_samples_bootstrap(n_samples, model.max_samples, sample_weight)
+        return _generate_unsampled_indices(estimator.random_state, n_samples, n_samples_bootstrap, sample_weight)
+    if n_samples_bootstrap is None:
+        n_samples_bootstrap = _get_n_samples_bootstrap(n_samples, model.max_samples)
+    return _generate_unsampled_indices(estimator.random_state, n_samples, n_samples_bootstrap)
+
+
+class OOBAccumulator:
+    """
+    Running out-of-bag class-probability sums of a growing forest.
+    """
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, n_classes: int):
+        self.X = np.asarray(X, dtype=np.float32)
+        self.y = np.asarray(y)
+        self.proba_sum = np.zeros((len(self.y), n_classes), dtype=np.float64)
+        self.n_trees = np.zeros(len(self.y), dtype=np.int64)
+        self.n_seen = 0
+
+    def add_new_trees(self, model: RandomForestClassifier) -> None:
+        """Add the OOB predictions of trees fitted since the last call."""
+        n_samples = len(self.y)
+        for estimator in model.estimators_[self.n_seen:]:
+            rows = _unsampled_indices(model, estimator, n_samples)
+            self.proba_sum[rows] += estimator.predict_proba(self.X[rows], check_input=False)
+            self.n_trees[rows] += 1
+        self.n_seen = len(model.estimators_)
+
+    def decision_function(self) -> np.ndarray:
+        """OOB class probabilities; rows never out of bag are NaN."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.proba_sum / self.n_trees[:, None]
+
+    def scores(self, classes: np.ndarray) -> Dict[str, float]:
+        covered = self.n_trees > 0
+        proba = self.proba_sum[covered] / self.n_trees[covered, None]
+        y = self.y[covered]
+        y_pred = classes[np.argmax(proba, axis=1)]
+        return {
+            "oob_roc_auc": threshold_sweep(y == classes[1], proba[:, 1])["roc_auc"],
+            "oob_accuracy": float(np.mean(y_pred == y)),
+            "oob_coverage": float(covered.mean()),
+        }
+
+
+def grow_forest(
+    model: RandomForestClassifier,
+    X: np.ndarray,
+    y: np.ndarray,
+    increment: int = 25,
+    max_estimators: int = 350,
+    min_estimators: int = 50,
+    tolerance: float = 1e-4,
+    patience: int = 2,
+) -> Tuple[RandomForestClassifier, Dict[str, Any]]:
+    """
+    Grow ``model`` (an unfitted, bootstrapped forest) until its OOB
+    ROC-AUC plateaus, then trim it to the best tree count.
+
+    Returns:
+        ``(model, oob_curve)``; the curve holds the tree counts, OOB
+        ROC-AUC/accuracy and cumulative fit seconds per increment, plus
+        the chosen tree count and whether growth stopped before
+        ``max_estimators``.
+    """
+    if not model.bootstrap:
+        raise ValueError("OOB early stopping needs bootstrap=True")
+
+    model.set_params(warm_start=True, oob_score=False)
+    curve = {"n_estimators": [], "oob_roc_auc": [], "oob_accuracy": [], "fit_seconds": []}
+    accumulator = None
+    best_score, best_n, stale = -np.inf, 0, 0
+    elapsed = 0.0
+
+    n_estimators = 0
+    while n_estimators < max_estimators:
+        n_estimators = min(n_estimators + increment, max_estimators)
+        start = time.perf_counter()
+        model.set_params(n_estimators=n_estimators)
+        model.fit(X, y)
+        elapsed += time.perf_counter() - start
+
+        if accumulator is None:
+            accumulator = OOBAccumulator(X, y, len(model.classes_))
+        accumulator.add_new_trees(model)
+        scores = accumulator.scores(model.classes_)
+
+        curve["n_estimators"].append(n_estimators)
+        curve["oob_roc_auc"].append(scores["oob_roc_auc"])
+        curve["oob_accuracy"].append(scores["oob_accuracy"])
+        curve["fit_seconds"].append(elapsed)
+        logger.info(
+            f"{n_estimators} trees | OOB ROC-AUC {scores['oob_roc_auc']:.5f} | "
+            f"OOB accuracy {scores['oob_accuracy']:.5f} | {elapsed:.1f}s"
+        )
+
+        if scores["oob_roc_auc"] > best_score + tolerance:
+            best_score, best_n, stale = scores["oob_roc_auc"], n_estimators, 0
+        else:
+            stale += 1
+        if stale >= patience and n_estimators >= min_estimators:
+            break
+
+    stopped_early = n_estimators < max_estimators
+    model.estimators_ = model.estimators_[:best_n]
+    model.set_params(n_estimators=best_n, warm_start=False)
+    logger.info(
+        f"Chose {best_n} trees (OOB ROC-AUC {best_score:.5f}); grew {n_estimators} of at most {max_estimators}"
+    )
+
+    curve.update(
+        chosen_n_estimators=best_n,
+        best_oob_roc_auc=float(best_score),
+        grown_n_estimators=n_estimators,
+        max_estimators=max_estimators,
+        stopped_early=stopped_early,
+        tolerance=tolerance,
+        patience=patience,
+    )
+    return model, curve
@@ -0,0 +1,95 @@
+"""
+Incremental refresh of a fitted RandomForest with trees trained on new data.
+
+``refresh_forest`` fits ``n_new_trees`` trees on the new rows, with the
+same hyperparameters as the production forest, and appends them to its
+trees. It then retires the oldest trees so the forest keeps
+``forest_size`` trees. Trees are kept in age order (original trees first,
+each refresh appends at the end), so repeated refreshes turn the forest
+over gradually.
+
+The new rows must be transformed with the production preprocessor, since
+the existing trees split on its feature layout; the preprocessor is
+therefore reused, not refitted.
+
+The refreshed forest has no out-of-bag statistics: its trees were grown on
+different training sets, so the old forest's ``oob_score_`` no longer
+describes it.
+"""
+
+import copy
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Fitted attributes that describe the old forest's out-of-bag rows.
+OOB_ATTRIBUTES = ("oob_score_", "oob_decision_function_", "oob_prediction_")
+
+
+def refresh_forest(
+    model: RandomForestClassifier,
+    X_new: np.ndarray,
+    y_new: np.ndarray,
+    n_new_trees: int,
+    forest_size: Optional[int] = None,
+    class_weight: Optional[str] = None,
+    random_state: Optional[int] = None,
+    n_jobs: Optional[int] = None,
+) -> Tuple[RandomForestClassifier, Dict[str, Any]]:
+    """
+    Append ``n_new_trees`` trees fitted on ``(X_new, y_new)`` to ``model``
+    and drop the oldest so that ``forest_size`` (default: the current
+    size) trees remain. ``model`` itself is not modified.
+
+    Returns:
+        ``(refreshed_model, report)`` with the tree counts involved.
+    """
+    forest_size = forest_size or len(model.estimators_)
+    if n_new_trees > forest_size:
+        raise ValueError(f"n_new_trees={n_new_trees} exceeds forest_size={forest_size}")
+    if X_new.shape[1] != model.n_features_in_:
+        raise ValueError(
+            f"New rows have {X_new.shape[1]} features, the model expects {model.n_features_in_}; "
+            "transform them with the model's own preprocessor"
+        )
+
+    params = model.get_params()
+    params.update(
+        n_estimators=n_new_trees,
+        random_state=random_state,
+        n_jobs=n_jobs,
+        warm_start=False,
+        oob_score=False,
+    )
+    if class_weight is not None:
+        params["class_weight"] = class_weight
+    new_forest = RandomForestClassifier(**params).fit(X_new, y_new)
+    if not np.array_equal(new_forest.classes_, model.classes_):
+        raise ValueError(
+            f"New rows have classes {new_forest.classes_.tolist()}, the model has {model.classes_.tolist()}"
+        )
+
+    kept = model.estimators_[max(0, len(model.estimators_) + n_new_trees - forest_size):]
+    refreshed = copy.copy(model)
+    refreshed.estimators_ = list(kept) + list(new_forest.estimators_)
+    refreshed.set_params(n_estimators=len(refreshed.estimators_), n_jobs=None, oob_score=False)
+    for name in OOB_ATTRIBUTES:
+        refreshed.__dict__.pop(name, None)
+
+    report = {
+        "previous_trees": len(model.estimators_),
+        "retired_trees": len(model.estimators_) - len(kept),
+        "new_trees": n_new_trees,
+        "forest_size": len(refreshed.estimators_),
+        "new_rows": int(len(y_new)),
+    }
+    logger.info(
+        f"Refreshed forest: +{report['new_trees']} new trees, -{report['retired_trees']} oldest "
+        f"-> {report['forest_size']} trees"
+    )
+    return refreshed, report
@@ -0,0 +1,108 @@
+"""
+Class-imbalance strategies for the training step.
+
+* ``smoteenn``: SMOTE over-sampling followed by Edited Nearest Neighbours
+  cleaning on the full training matrix (the original behaviour). Both
+  neighbour searches grow superlinearly with the number of rows.
+* ``smoteenn_subsample``: the same, on a stratified subsample of at most
+  ``max_rows`` rows, so the neighbour searches have a fixed cost.
+* ``undersample``: random undersampling of the majority class; no
+  neighbour search at all.
+* ``class_weight``: no resampling; the forest reweights the classes
+  instead (``class_weight="balanced"`` or ``"balanced_subsample"``).
+
+``rebalance`` returns the (possibly resampled) training rows together
+with the ``class_weight`` the classifier should be fitted with.
+"""
+
+from typing import Optional, Tuple, Union
+
+import numpy as np
+from imblearn.combine import SMOTEENN
+from imblearn.over_sampling import SMOTE
+from imblearn.under_sampling import EditedNearestNeighbours, RandomUnderSampler
+from sklearn.neighbors import NearestNeighbors
+
+IMBALANCE_STRATEGIES = ("smoteenn", "smoteenn_subsample", "undersample", "class_weight")
+
+
+def build_smoteenn(
+    sampling_strategy: str = "minority",
+    random_state: Optional[int] = None,
+    k_neighbors: int = 5,
+    enn_n_neighbors: int = 3,
+    n_jobs: Optional[int] = None,
+) -> SMOTEENN:
+    """
+    ``SMOTEENN`` whose SMOTE and ENN neighbour searches both run on
+    ``n_jobs`` threads (SMOTE has no ``n_jobs`` of its own). Each
+    ``NearestNeighbors`` asks for one extra neighbour because the query
+    point is its own nearest neighbour.
+    """
+    return SMOTEENN(
+        smote=SMOTE(
+            sampling_strategy=sampling_strategy,
+            random_state=random_state,
+            k_neighbors=NearestNeighbors(n_neighbors=k_neighbors + 1, n_jobs=n_jobs),
+        ),
+        enn=EditedNearestNeighbours(
+            sampling_strategy="all",
+            n_neighbors=NearestNeighbors(n_neighbors=enn_n_neighbors + 1),
+            n_jobs=n_jobs,
+        ),
+        random_state=random_state,
+    )
+
+
+def stratified_subsample(
+    X: np.ndarray, y: np.ndarray, max_rows: int, random_state: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """At most ``max_rows`` rows, keeping each class's share of the data."""
+    if len(y) <= max_rows:
+        return X, y
+    rng = np.random.default_rng(random_state)
+    fraction = max_rows / len(y)
+    keep = []
+    for label in np.unique(y):
+        rows = np.flatnonzero(y == label)
+        n_keep = max(1, int(round(len(rows) * fraction)))
+        keep.append(rng.choice(rows, size=n_keep, replace=False))
+    keep = np.sort(np.concatenate(keep))
+    return X[keep], y[keep]
+
+
+def rebalance(
+    X: np.ndarray,
+    y: np.ndarray,
+    strategy: str = "smoteenn",
+    sampling_strategy: str = "minority",
+    random_state: Optional[int] = None,
+    k_neighbors: int = 5,
+    enn_n_neighbors: int = 3,
+    subsample_rows: int = 200_000,
+    undersampling_ratio: Union[float, str] = "auto",
+    class_weight: str = "balanced",
+    n_jobs: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray, Optional[str]]:
+    """
+    Apply the imbalance ``strategy`` to the training rows.
+
+    Returns:
+        ``(X, y, class_weight)``; ``class_weight`` is None unless the
+        strategy is ``class_weight``.
+    """
+    if strategy not in IMBALANCE_STRATEGIES:
+        raise ValueError(f"Unknown imbalance strategy '{strategy}'; expected one of {IMBALANCE_STRATEGIES}")
+
+    if strategy == "class_weight":
+        return X, y, class_weight
+    if strategy == "undersample":
+        sampler = RandomUnderSampler(sampling_strategy=undersampling_ratio, random_state=random_state)
+        X_resampled, y_resampled = sampler.fit_resample(X, y)
+        return X_resampled, y_resampled, None
+
+    if strategy == "smoteenn_subsample":
+        X, y = stratified_subsample(X, y, subsample_rows, random_state)
+    smt = build_smoteenn(sampling_strategy, random_state, k_neighbors, enn_n_neighbors, n_jobs)
+    X_resampled, y_resampled = smt.fit_resample(X, y)
+    return X_resampled, y_resampled, None
@@ -0,0 +1,65 @@
+"""
+Memory-mapped storage for NumPy arrays and pandas objects.
+
+* Arrays are written as raw ``.npy`` and read back with
+  ``np.load(mmap_mode="c")``. The array is backed by the file's pages in
+  the OS page cache, which every process reading the same file shares,
+  and only the pages actually touched are read. Copy-on-write mode keeps
+  the array writable, but writes land in private pages and never reach
+  the file.
+* DataFrames and Series are written as uncompressed Arrow IPC files
+  (Feather v2) and read through ``pa.memory_map``. Numeric columns without
+  nulls are views of the mapped file (read-only); categorical and string
+  columns are built from it.
+
+Object arrays cannot be mapped, so ``save_array`` rejects them.
+"""
+
+import json
+from typing import BinaryIO, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+ARRAY_FILENAME = "array.npy"
+FRAME_FILENAME = "frame.arrow"
+
+_SERIES_COLUMN = "__series__"
+_SERIES_NAME_KEY = b"series_name"
+
+
+def save_array(array: np.ndarray, file: BinaryIO) -> None:
+    """Write ``array`` as ``.npy``; raises ``TypeError`` for object arrays."""
+    if array.dtype.hasobject:
+        raise TypeError(f"Arrays of dtype {array.dtype} hold Python objects and cannot be memory-mapped")
+    np.save(file, array, allow_pickle=False)
+
+
+def load_array(path: str) -> np.ndarray:
+    """Map the ``.npy`` file at ``path`` copy-on-write."""
+    return np.load(path, mmap_mode="c", allow_pickle=False)
+
+
+def save_frame(data: Union[pd.DataFrame, pd.Series], file: BinaryIO) -> None:
+    """Write a DataFrame or Series as an uncompressed Arrow IPC file."""
+    if isinstance(data, pd.Series):
+        table = pa.Table.from_pandas(data.to_frame(name=_SERIES_COLUMN))
+        metadata = dict(table.schema.metadata or {})
+        metadata[_SERIES_NAME_KEY] = json.dumps(data.name).encode()
+        table = table.replace_schema_metadata(metadata)
+    else:
+        table = pa.Table.from_pandas(data)
+    feather.write_feather(table, file, compression="uncompressed")
+
+
+def load_frame(path: str) -> Union[pd.DataFrame, pd.Series]:
+    """Read an Arrow IPC file written by ``save_frame`` through a memory map."""
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    frame = table.to_pandas(split_blocks=True)
+    metadata = table.schema.metadata or {}
+    if _SERIES_NAME_KEY in metadata:
+        return frame[_SERIES_COLUMN].rename(json.loads(metadata[_SERIES_NAME_KEY]))
+    return frame
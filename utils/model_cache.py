@@ -0,0 +1,278 @@
+"""
+Local on-disk cache of registry model versions, with background hot reload.
+
+Each cached version lives in ``<cache_dir>/<version_id>/`` as one
+uncompressed joblib file holding ``(model, preprocessor)`` plus a
+``manifest.json`` with the file's SHA-256. The file is verified on every
+load, and corrupted or partial entries are discarded and fetched again.
+
+``load_cached_model`` first makes a cheap version check: it resolves the
+"current" (else "latest") model version id without loading any
+artifacts. If that id is cached, both objects are read from local disk;
+otherwise they are loaded from the ZenML registry and cached. When the
+ZenML store cannot be reached, the most recently cached version is used.
+
+Versions are written under ``<cache_dir>/.staging/`` and renamed into
+place; names starting with ``.`` are never listed as cached versions.
+
+``ModelReloader`` repeats the version check on a background thread and
+hands a newly promoted version to a callback once it is fully loaded, so
+a server can swap models without dropping requests.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import joblib
+
+from constant import MODEL_CACHE_DIR, MODEL_NAME
+from utils.disk_cache import STAGING_DIR
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MODEL_FILE = "model.joblib"
+MANIFEST_FILE = "manifest.json"
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelCache:
+    """
+    Version-keyed cache of ``(model, preprocessor)`` pairs on local disk.
+    """
+
+    def __init__(self, cache_dir: str = MODEL_CACHE_DIR, keep_versions: int = 3):
+        self.cache_dir = cache_dir
+        self.keep_versions = keep_versions
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def model_file(self, version_id: str) -> Optional[str]:
+        """Path of the verified joblib file for ``version_id``, or None if not cached."""
+        entry_dir = os.path.join(self.cache_dir, str(version_id))
+        manifest = self._read_manifest(entry_dir)
+        if manifest is None:
+            return None
+
+        path = os.path.join(entry_dir, MODEL_FILE)
+        if not os.path.exists(path) or _sha256(path) != manifest["sha256"]:
+            logger.warning(f"Cached model version {version_id} failed its integrity check; discarding")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        return path
+
+    def get(self, version_id: str, mmap_mode: Optional[str] = None) -> Optional[Tuple[Any, Any]]:
+        """Load ``(model, preprocessor)`` for ``version_id`` if cached and intact."""
+        path = self.model_file(version_id)
+        if path is None:
+            return None
+        os.utime(os.path.join(self.cache_dir, str(version_id), MANIFEST_FILE))
+        return joblib.load(path, mmap_mode=mmap_mode)
+
+    def put(self, version_id: str, model, preprocessor, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Store a version atomically and prune old versions; returns the file path."""
+        entry_dir = os.path.join(self.cache_dir, str(version_id))
+        tmp_dir = os.path.join(
+            self.cache_dir, STAGING_DIR, f"{version_id}-{os.getpid()}-{threading.get_ident()}"
+        )
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        path = os.path.join(tmp_dir, MODEL_FILE)
+        joblib.dump((model, preprocessor), path)
+        manifest = dict(
+            metadata or {},
+            version_id=str(version_id),
+            sha256=_sha256(path),
+            cached_at=datetime.now(timezone.utc).isoformat(),
+        )
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f)
+
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        try:
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            # Another writer cached the same version first; keep theirs.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        logger.info(f"Cached model version {version_id} in {entry_dir}")
+        self._prune(keep=str(version_id))
+        return os.path.join(entry_dir, MODEL_FILE)
+
+    def latest_version(self) -> Optional[str]:
+        """Most recently used cached version id."""
+        entries = self._entries()
+        return entries[0][1] if entries else None
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(".") or ".tmp-" in name:
+                # Staging directories, including ones left by a crashed writer.
+                continue
+            manifest_path = os.path.join(self.cache_dir, name, MANIFEST_FILE)
+            if os.path.exists(manifest_path):
+                entries.append((os.path.getmtime(manifest_path), name))
+        return sorted(entries, reverse=True)
+
+    def _prune(self, keep: str) -> None:
+        stale = [name for _, name in self._entries() if name != keep][self.keep_versions - 1:]
+        for name in stale:
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+            logger.info(f"Evicted cached model version {name}")
+
+    @staticmethod
+    def _read_manifest(entry_dir: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(entry_dir, MANIFEST_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+def resolve_model_version(model_name: str = MODEL_NAME):
+    """
+    The registry's "current" model version, else "latest".
+
+    Only version metadata is fetched, no artifacts, so this is cheap
+    enough to poll.
+    """
+    from zenml.client import Client
+
+    client = Client()
+    try:
+        return client.get_model_version(model_name, "current")
+    except Exception:
+        return client.get_model_version(model_name, "latest")
+
+
+def _current_version_id(model_name: str, cache: ModelCache) -> Tuple[Optional[Any], str]:
+    """
+    Registry version and id of the current model. Falls back to the most
+    recently cached id (with no version object) when the registry is down.
+    """
+    try:
+        version = resolve_model_version(model_name)
+    except Exception as exc:
+        version_id = cache.latest_version()
+        if version_id is None:
+            raise
+        logger.warning(f"Model registry unreachable ({exc}); using cached version {version_id}")
+        return None, version_id
+    return version, str(version.id)
+
+
+def _fetch_into_cache(version, model_name: str, cache: ModelCache) -> Tuple[Any, Any]:
+    model = version.get_artifact("model").load()
+    preprocessor = version.get_artifact("preprocessor").load()
+    cache.put(str(version.id), model, preprocessor, {"model_name": model_name, "version": str(version.name)})
+    logger.info(f"Loaded model version {version.name} ({version.id}) from the registry")
+    return model, preprocessor
+
+
+def load_cached_model(
+    model_name: str = MODEL_NAME,
+    cache: Optional[ModelCache] = None,
+    mmap_mode: Optional[str] = None,
+) -> Tuple[Any, Any, str]:
+    """
+    Load the current model version through the local cache.
+
+    Returns:
+        ``(model, preprocessor, version_id)``.
+    """
+    cache = cache or ModelCache()
+    version, version_id = _current_version_id(model_name, cache)
+
+    cached = cache.get(version_id, mmap_mode=mmap_mode)
+    if cached is not None:
+        logger.info(f"Loaded model version {version_id} from local cache")
+        return cached[0], cached[1], version_id
+    if version is None:
+        raise RuntimeError(f"Cached model version {version_id} is unusable and the registry is unreachable")
+
+    model, preprocessor = _fetch_into_cache(version, model_name, cache)
+    return model, preprocessor, version_id
+
+
+def cached_model_file(model_name: str = MODEL_NAME, cache: Optional[ModelCache] = None) -> Tuple[str, str]:
+    """
+    ``(path, version_id)`` of the verified joblib file of the current
+    version, fetching it into the cache first if needed.
+    """
+    cache = cache or ModelCache()
+    version, version_id = _current_version_id(model_name, cache)
+
+    path = cache.model_file(version_id)
+    if path is None:
+        if version is None:
+            raise RuntimeError(f"Cached model version {version_id} is unusable and the registry is unreachable")
+        _fetch_into_cache(version, model_name, cache)
+        path = cache.model_file(version_id)
+    return path, version_id
+
+
+class ModelReloader:
+    """
+    Background thread that polls the registry and hot-swaps new versions.
+
+    ``on_new_version(model, preprocessor, version_id)`` is called only
+    after the new version is fully loaded; until then the caller keeps
+    serving the previous one.
+    """
+
+    def __init__(
+        self,
+        on_new_version: Callable[[Any, Any, str], None],
+        current_version_id: Optional[str],
+        interval_seconds: float = 60.0,
+        model_name: str = MODEL_NAME,
+        cache: Optional[ModelCache] = None,
+    ):
+        self.on_new_version = on_new_version
+        self.current_version_id = current_version_id
+        self.interval_seconds = interval_seconds
+        self.model_name = model_name
+        self.cache = cache or ModelCache()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+
+    def start(self) -> "ModelReloader":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def check_once(self) -> bool:
+        """Swap to the registry's current version if it changed; returns whether it did."""
+        version_id = str(resolve_model_version(self.model_name).id)
+        if version_id == self.current_version_id:
+            return False
+
+        model, preprocessor, version_id = load_cached_model(self.model_name, self.cache)
+        self.on_new_version(model, preprocessor, version_id)
+        logger.info(f"Hot-swapped model {self.current_version_id} -> {version_id}")
+        self.current_version_id = version_id
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.check_once()
+            except Exception as exc:
+                logger.warning(f"Model version check failed: {exc}")
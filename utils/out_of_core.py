@@ -0,0 +1,332 @@
+"""
+Out-of-core training of the preprocessor and a RandomForest.
+
+The data is never materialized: ``chunks`` is a callable returning a
+fresh iterator of DataFrame chunks (e.g. ``MongoDBClient.iter_dataframes``),
+and it is read twice.
+
+* Split: every row's ``id`` is hashed (splitmix64) to a number in [0, 1),
+  and rows below ``test_size`` are test rows. The split does not depend on
+  chunk boundaries or read order, so both passes (and later runs) agree.
+  Rows without an ``id`` cannot be placed reproducibly; they are skipped
+  in both passes and counted as ``missing_ids``.
+* Pass 1 fits the preprocessor on the training rows. Transformers with
+  ``partial_fit`` (the scalers) are updated chunk by chunk, and one-hot
+  categories are collected as the union of the values seen. The
+  ``ColumnTransformer`` is then fitted on a small sample with those
+  categories fixed, and the incrementally fitted scalers replace the ones
+  it fitted. Categories come out sorted, as in an in-memory fit, and the
+  scaler statistics match an in-memory fit to rounding.
+* Pass 2 transforms the training rows into a float32 buffer. Pass 1's row
+  count divides them into sub-forests of about ``rows_per_subforest`` rows
+  each; whenever the buffer holds the next sub-forest's rows, they are
+  rebalanced and fitted with a small forest of their own. ``n_estimators``
+  is shared out between the sub-forests (at least one tree each), and
+  their trees are merged into one ``RandomForestClassifier`` at the end.
+  The last sub-forest is capped at its planned size like the others;
+  training rows beyond pass 1's count (documents inserted between the
+  passes) are dropped and reported as ``overflow_rows``.
+* Test rows are subsampled by the same hash to at most ``eval_rows`` rows,
+  kept both raw and transformed for evaluation.
+
+Memory is bounded by one chunk, one sub-forest buffer, the evaluation
+sample and the merged forest, whatever the number of rows.
+"""
+
+import copy
+import logging
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from utils.dtype_policy import apply_dtype_policy, as_model_input, transform_to_float32
+from utils.imbalance import rebalance
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+ID_COLUMN = "id"
+NON_FEATURE_COLUMNS = (ID_COLUMN, "batch_tag", "_id")
+TEMPLATE_ROWS = 1_000
+
+ChunkSource = Callable[[], Iterator[pd.DataFrame]]
+
+
+def hash_unit(ids: np.ndarray, seed: int = 0) -> np.ndarray:
+    """splitmix64 of ``ids`` (offset by ``seed``), mapped to [0, 1)."""
+    ids = np.asarray(ids)
+    if ids.dtype.kind == "f" and not np.isfinite(ids).all():
+        raise ValueError("Cannot hash NaN or infinite ids")
+    with np.errstate(over="ignore"):
+        z = ids.astype(np.uint64) + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+def _split_chunk(chunk: pd.DataFrame, target_column: str) -> Tuple[np.ndarray, pd.DataFrame, np.ndarray, int]:
+    """``(ids, features, y, missing)`` of the rows with an id; ``missing`` rows had none."""
+    if ID_COLUMN not in chunk.columns:
+        raise ValueError(f"Out-of-core training needs an '{ID_COLUMN}' column to split on")
+    has_id = chunk[ID_COLUMN].notna().to_numpy()
+    missing = int(len(has_id) - has_id.sum())
+    if missing:
+        chunk = chunk[has_id]
+    features = chunk.drop(columns=[target_column, *NON_FEATURE_COLUMNS], errors="ignore")
+    y = pd.to_numeric(chunk[target_column], downcast="unsigned").to_numpy()
+    return chunk[ID_COLUMN].to_numpy(), features, y, missing
+
+
+def _column_transformer(preprocessor: Any) -> ColumnTransformer:
+    last = preprocessor[-1] if isinstance(preprocessor, Pipeline) else preprocessor
+    if not isinstance(last, ColumnTransformer):
+        raise TypeError(f"Expected a ColumnTransformer (or a Pipeline ending in one), got {type(last).__name__}")
+    return last
+
+
+def fit_preprocessor_streaming(
+    preprocessor: Any,
+    chunks: ChunkSource,
+    target_column: str,
+    test_size: float = 0.2,
+    split_seed: int = 0,
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Pass 1: fit the unfitted ``preprocessor`` on the training rows of
+    ``chunks``.
+
+    Returns:
+        ``(preprocessor, counts)``; the counts hold the training/test rows,
+        the rows skipped for a missing id, the training class counts and
+        the number of chunks.
+    """
+    column_transformer = _column_transformer(preprocessor)
+    incremental = {}
+    categories: Dict[str, List[Tuple[str, set]]] = {}
+    for name, estimator, columns in column_transformer.transformers:
+        if isinstance(estimator, OneHotEncoder):
+            categories[name] = [(column, set()) for column in columns]
+        elif hasattr(estimator, "partial_fit"):
+            incremental[name] = (clone(estimator), columns)
+        elif estimator not in ("passthrough", "drop"):
+            raise TypeError(f"Transformer '{name}' ({type(estimator).__name__}) cannot be fitted incrementally")
+
+    template = None
+    n_train = n_test = n_chunks = n_missing = 0
+    class_counts: Dict[Any, int] = {}
+    for chunk in chunks():
+        n_chunks += 1
+        ids, features, y, missing = _split_chunk(chunk, target_column)
+        n_missing += missing
+        train = hash_unit(ids, split_seed) >= test_size
+        n_test += int(len(ids) - train.sum())
+        if not train.any():
+            continue
+        features = as_model_input(features[train])
+        n_train += len(features)
+        for label, count in zip(*np.unique(y[train], return_counts=True)):
+            class_counts[label.item()] = class_counts.get(label.item(), 0) + int(count)
+
+        for estimator, columns in incremental.values():
+            estimator.partial_fit(features[columns])
+        for seen_per_column in categories.values():
+            for column, seen in seen_per_column:
+                seen.update(features[column].dropna().unique().tolist())
+        if template is None:
+            template = features.head(TEMPLATE_ROWS)
+
+    if template is None:
+        raise ValueError("No training rows found")
+
+    for name, estimator, columns in column_transformer.transformers:
+        if name in categories:
+            estimator.set_params(categories=[np.array(sorted(seen), dtype=object) for _, seen in categories[name]])
+    preprocessor.fit(template)
+    for i, (name, _, columns) in enumerate(column_transformer.transformers_):
+        if name in incremental:
+            column_transformer.transformers_[i] = (name, incremental[name][0], columns)
+
+    counts = {
+        "train_rows": n_train,
+        "test_rows": n_test,
+        "missing_ids": n_missing,
+        "chunks": n_chunks,
+        "train_class_counts": class_counts,
+    }
+    if n_missing:
+        logger.warning(f"Pass 1: skipped {n_missing} rows without an '{ID_COLUMN}'")
+    logger.info(f"Pass 1: preprocessor fitted on {n_train} training rows in {n_chunks} chunks ({n_test} test rows)")
+    return preprocessor, counts
+
+
+def merge_forests(forests: List[RandomForestClassifier]) -> RandomForestClassifier:
+    """One forest holding the trees of ``forests``, which must share their classes."""
+    merged = copy.copy(forests[0])
+    for forest in forests[1:]:
+        if not np.array_equal(forest.classes_, merged.classes_):
+            raise ValueError(f"Cannot merge forests with classes {forest.classes_} and {merged.classes_}")
+    merged.estimators_ = [tree for forest in forests for tree in forest.estimators_]
+    merged.set_params(n_estimators=len(merged.estimators_), n_jobs=None)
+    return merged
+
+
+def train_out_of_core(
+    preprocessor: Any,
+    chunks: ChunkSource,
+    target_column: str,
+    n_estimators: int = 350,
+    rows_per_subforest: int = 200_000,
+    test_size: float = 0.2,
+    split_seed: int = 0,
+    eval_rows: int = 200_000,
+    forest_params: Optional[Dict[str, Any]] = None,
+    imbalance_params: Optional[Dict[str, Any]] = None,
+    random_state: int = 42,
+    n_jobs: Optional[int] = None,
+) -> Tuple[RandomForestClassifier, Any, pd.DataFrame, np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    Fit ``preprocessor`` (unfitted) and a merged forest of sub-forests on
+    ``chunks`` without holding all rows in memory.
+
+    Args:
+        forest_params: Extra ``RandomForestClassifier`` arguments
+            (``max_depth``, ``min_samples_leaf``, ``max_features``).
+        imbalance_params: Keyword arguments for ``rebalance`` (strategy and
+            its settings), applied to every sub-forest's rows.
+
+    Returns:
+        ``(model, preprocessor, X_eval_raw, X_eval, y_eval, report)``: the
+        evaluation sample of test rows as raw features, transformed
+        float32 features and labels, and a report of row, chunk and tree
+        counts (including the rows each sub-forest was fitted on and the
+        overflow rows dropped) with per-pass wall times.
+    """
+    start = time.perf_counter()
+    preprocessor, counts = fit_preprocessor_streaming(preprocessor, chunks, target_column, test_size, split_seed)
+    pass1_seconds = time.perf_counter() - start
+
+    n_subforests = max(1, round(counts["train_rows"] / rows_per_subforest))
+    # Near-equal row counts and tree counts per sub-forest, summing to the totals.
+    subforest_rows = [
+        round(counts["train_rows"] * (k + 1) / n_subforests) - round(counts["train_rows"] * k / n_subforests)
+        for k in range(n_subforests)
+    ]
+    subforest_trees = [
+        max(1, n_estimators * (k + 1) // n_subforests - n_estimators * k // n_subforests)
+        for k in range(n_subforests)
+    ]
+    eval_fraction = min(1.0, eval_rows / counts["test_rows"]) if counts["test_rows"] else 0.0
+    forest_params = forest_params or {}
+    imbalance_params = imbalance_params or {}
+
+    forests: List[RandomForestClassifier] = []
+    fitted_rows: List[int] = []
+    overflow_rows = 0
+    buffer_X: List[np.ndarray] = []
+    buffer_y: List[np.ndarray] = []
+    eval_raw: List[pd.DataFrame] = []
+    eval_X: List[np.ndarray] = []
+    eval_y: List[np.ndarray] = []
+
+    def fit_subforest(X: np.ndarray, y: np.ndarray) -> None:
+        index = len(forests)
+        n_trees = subforest_trees[min(index, n_subforests - 1)]
+        X_res, y_res, class_weight = rebalance(X, y, random_state=random_state + index, n_jobs=n_jobs, **imbalance_params)
+        forest = RandomForestClassifier(
+            n_estimators=n_trees,
+            random_state=random_state + index,
+            class_weight=class_weight,
+            n_jobs=n_jobs,
+            **forest_params,
+        ).fit(X_res, y_res)
+        forests.append(forest)
+        fitted_rows.append(len(y))
+        logger.info(f"Sub-forest {index + 1}/{n_subforests}: {n_trees} trees on {len(y_res)} rows ({len(y)} before resampling)")
+
+    def flush(final: bool) -> None:
+        nonlocal overflow_rows
+        buffered = sum(len(y) for y in buffer_y)
+        while buffered and len(forests) < n_subforests:
+            if not final and buffered < subforest_rows[len(forests)]:
+                return
+            X = np.concatenate(buffer_X)
+            y = np.concatenate(buffer_y)
+            take = min(subforest_rows[len(forests)], len(y))
+            if len(np.unique(y[:take])) < 2 and len(np.unique(y)) > 1:
+                # Extend to the rows that bring the other class.
+                take = len(y)
+            if len(np.unique(y[:take])) < 2:
+                if not final:
+                    # Wait for the next chunk rather than fit a single-class forest.
+                    return
+                logger.warning(f"Dropped {take} final training rows with a single class")
+            else:
+                fit_subforest(X[:take], y[:take])
+            buffer_X[:] = [X[take:]] if take < len(y) else []
+            buffer_y[:] = [y[take:]] if take < len(y) else []
+            buffered = len(y) - take
+        if buffered:
+            # Every planned sub-forest is fitted: these rows were not in pass 1.
+            overflow_rows += buffered
+            buffer_X.clear()
+            buffer_y.clear()
+
+    start = time.perf_counter()
+    for chunk in chunks():
+        ids, features, y, _ = _split_chunk(chunk, target_column)
+        u = hash_unit(ids, split_seed)
+        train = u >= test_size
+        if train.any():
+            buffer_X.append(transform_to_float32(preprocessor, features[train]))
+            buffer_y.append(y[train])
+            flush(final=False)
+        sample = u < test_size * eval_fraction
+        if sample.any():
+            eval_raw.append(features[sample])
+            eval_X.append(transform_to_float32(preprocessor, features[sample]))
+            eval_y.append(y[sample])
+    flush(final=True)
+    pass2_seconds = time.perf_counter() - start
+    if overflow_rows:
+        logger.warning(
+            f"Pass 2: dropped {overflow_rows} training rows beyond the {counts['train_rows']} counted in pass 1 "
+            f"(the source grew between the passes)"
+        )
+
+    if not forests:
+        raise ValueError("No sub-forest could be fitted; the training rows hold a single class")
+    model = merge_forests(forests)
+
+    if eval_raw:
+        X_eval_raw = apply_dtype_policy(pd.concat(eval_raw, ignore_index=True))
+        X_eval = np.concatenate(eval_X)
+        y_eval = np.concatenate(eval_y)
+    else:
+        X_eval_raw = pd.DataFrame()
+        X_eval = np.empty((0, 0), dtype=np.float32)
+        y_eval = np.empty(0, dtype=np.uint8)
+
+    report = dict(
+        counts,
+        subforests=len(forests),
+        trees_per_subforest=subforest_trees,
+        rows_per_subforest=fitted_rows,
+        overflow_rows=overflow_rows,
+        n_estimators=model.n_estimators,
+        eval_rows=int(len(y_eval)),
+        pass1_seconds=pass1_seconds,
+        pass2_seconds=pass2_seconds,
+    )
+    logger.info(
+        f"Pass 2: {len(forests)} sub-forests merged into {model.n_estimators} trees in {pass2_seconds:.1f}s | "
+        f"evaluation sample of {len(y_eval)} test rows"
+    )
+    return model, preprocessor, X_eval_raw, X_eval, y_eval, report
@@ -0,0 +1,43 @@
+"""
+CPU core detection and thread budgeting for training and scoring.
+
+``available_cores`` counts the cores this process may actually use: it
+honours CPU affinity and cgroup (container) CPU quotas through joblib's
+``cpu_count``, unlike ``os.cpu_count`` which reports every core of the
+host. ``resolve_n_jobs`` maps sklearn-style ``n_jobs`` values (``None``,
+``-1``, ``-2``, ...) onto that count, and ``blas_threads_per_job`` splits
+the cores between parallel jobs and the BLAS pool each job would start,
+so ``n_jobs`` workers don't each spawn a full-size BLAS pool.
+"""
+
+from typing import Optional
+
+from joblib import cpu_count
+
+
+def available_cores() -> int:
+    """Cores usable by this process (affinity and container quotas applied)."""
+    return max(1, cpu_count(only_physical_cores=False))
+
+
+def resolve_n_jobs(n_jobs: Optional[int]) -> int:
+    """
+    Concrete worker count for an sklearn-style ``n_jobs``: ``None`` or
+    ``-1`` means all available cores, ``-2`` all but one, and so on.
+    Positive values are capped at the available cores.
+    """
+    cores = available_cores()
+    if n_jobs is None or n_jobs == -1:
+        return cores
+    if n_jobs < 0:
+        return max(1, cores + 1 + n_jobs)
+    if n_jobs == 0:
+        raise ValueError("n_jobs == 0 has no meaning")
+    return min(n_jobs, cores)
+
+
+def blas_threads_per_job(n_jobs: int, blas_threads: Optional[int] = None) -> int:
+    """BLAS/OpenMP threads each of ``n_jobs`` workers may use without oversubscribing."""
+    if blas_threads is not None:
+        return max(1, blas_threads)
+    return max(1, available_cores() // max(1, n_jobs))
@@ -0,0 +1,106 @@
+# Utilities for compact statistical profiles of a dataset.
+# Profiles summarize features so drift checks never need the raw reference data.
+
+"""Builds JSON-serializable per-feature profiles: moments, quantiles, frequencies."""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.drift_engine import category_key, histograms, layout_from_profile
+
+NUMERIC_FEATURES = ["Age", "Annual_Premium", "Vintage"]
+CATEGORICAL_FEATURES = [
+    "Gender",
+    "Vehicle_Age",
+    "Vehicle_Damage",
+    "Region_Code",
+    "Policy_Sales_Channel",
+]
+
+# Percentile grid stored for every numeric feature (0%, 1%, ..., 100%).
+QUANTILE_LEVELS = np.linspace(0.0, 1.0, 101)
+
+
+def numeric_profile(values: np.ndarray) -> Dict[str, Any]:
+    """Moments and the percentile grid of one numeric column (NaNs ignored)."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {"count": 0, "mean": None, "var": None, "min": None, "max": None, "quantiles": None}
+
+    return {
+        "count": int(values.size),
+        "mean": float(values.mean()),
+        "var": float(values.var(ddof=1)) if values.size > 1 else 0.0,
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "quantiles": np.quantile(values, QUANTILE_LEVELS).tolist(),
+    }
+
+
+def categorical_profile(series: pd.Series) -> Dict[str, Any]:
+    """Category frequencies of one column (missing values ignored)."""
+    counts = series.dropna().value_counts(sort=False)
+    counts = counts[counts > 0]  # categorical columns also list unobserved categories
+    frequencies: Dict[str, int] = {}
+    for value, count in counts.items():
+        key = category_key(value)
+        frequencies[key] = frequencies.get(key, 0) + int(count)
+    return {"count": int(counts.sum()), "frequencies": frequencies}
+
+
+def build_profile(
+    df: pd.DataFrame,
+    numeric_features: Optional[List[str]] = None,
+    categorical_features: Optional[List[str]] = None,
+    reference: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Build a profile of ``df``.
+
+    Features absent from ``df`` are skipped, so the same feature lists can be
+    used for frames read with a narrower projection.
+
+    The profile also holds per-feature ``histograms`` binned on the layout of
+    ``reference`` (or of the profile itself when building a reference), which
+    the drift engine compares bin by bin.
+    """
+    numeric_features = NUMERIC_FEATURES if numeric_features is None else numeric_features
+    categorical_features = CATEGORICAL_FEATURES if categorical_features is None else categorical_features
+
+    profile = {
+        "n_rows": int(len(df)),
+        "quantile_levels": QUANTILE_LEVELS.tolist(),
+        "numeric": {
+            feature: numeric_profile(df[feature].to_numpy(dtype=np.float64, na_value=np.nan))
+            for feature in numeric_features
+            if feature in df.columns
+        },
+        "categorical": {
+            feature: categorical_profile(df[feature])
+            for feature in categorical_features
+            if feature in df.columns
+        },
+    }
+
+    layout = [
+        bins for bins in layout_from_profile(reference or profile)
+        if bins.name in df.columns
+    ]
+    counts = histograms(df, layout)
+    profile["histograms"] = {
+        bins.name: counts[i, :bins.n_bins].tolist() for i, bins in enumerate(layout)
+    }
+    return profile
+
+
+def profile_quantile(feature_profile: Dict[str, Any], level: float, levels: List[float]) -> float:
+    """Interpolate the quantile at ``level`` from a feature's percentile grid."""
+    return float(np.interp(level, levels, feature_profile["quantiles"]))
+
+
+def profile_iqr(feature_profile: Dict[str, Any], levels: List[float]) -> float:
+    """Interquartile range of a numeric feature profile."""
+    return profile_quantile(feature_profile, 0.75, levels) - profile_quantile(feature_profile, 0.25, levels)
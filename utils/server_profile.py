@@ -0,0 +1,215 @@
+# Server-side data profiling with MongoDB aggregation pipelines.
+# Only per-feature summaries travel over the network, never the documents.
+
+"""Builds a data profile inside MongoDB using one ``$facet`` aggregation.
+
+Per numeric feature the server computes count, mean, sample variance,
+min/max, the percentile grid and the bin counts on the reference layout
+(``$bucket``). Per categorical feature it returns the category counts
+(``$sortByCount``). The result has the same format as
+``profile_utils.build_profile``, so it can be compared with
+``drift_engine.compare_profiles``.
+
+Percentiles use ``$percentile`` (MongoDB >= 7.0, approximate t-digest). On
+older servers they are interpolated from ``$bucketAuto`` equal-frequency
+buckets instead.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pymongo
+
+from constant import DATABASE_NAME
+from utils.db_utils import MongoDBClient
+from utils.drift_engine import category_key, layout_from_profile
+from utils.profile_utils import QUANTILE_LEVELS
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+FALLBACK_BUCKETS = 100
+
+
+def _field(feature: str) -> str:
+    return f"${feature}"
+
+
+def _numeric_facets(
+    feature: str,
+    edges: Optional[np.ndarray],
+    use_percentile: bool,
+) -> Dict[str, List[Dict[str, Any]]]:
+    field = _field(feature)
+    is_number = {feature: {"$type": "number"}}
+
+    summary = {
+        "_id": None,
+        "count": {"$sum": 1},
+        "mean": {"$avg": field},
+        "std": {"$stdDevSamp": field},
+        "min": {"$min": field},
+        "max": {"$max": field},
+    }
+    if use_percentile:
+        summary["quantiles"] = {
+            "$percentile": {"input": field, "p": QUANTILE_LEVELS.tolist(), "method": "approximate"}
+        }
+
+    facets = {f"{feature}__summary": [{"$match": is_number}, {"$group": summary}]}
+
+    if not use_percentile:
+        facets[f"{feature}__buckets"] = [
+            {"$match": is_number},
+            {"$bucketAuto": {"groupBy": field, "buckets": FALLBACK_BUCKETS}},
+        ]
+
+    if edges is not None:
+        # Same bins as drift_engine: (-inf, e0), [e0, e1), ..., [e_last, inf), missing.
+        boundaries = [float("-inf")] + [float(edge) for edge in edges] + [float("inf")]
+        facets[f"{feature}__histogram"] = [
+            {"$bucket": {"groupBy": field, "boundaries": boundaries, "default": "missing"}},
+        ]
+
+    return facets
+
+
+def _quantiles_from_buckets(buckets: List[Dict[str, Any]], count: int) -> List[float]:
+    """Interpolate the percentile grid from equal-frequency ``$bucketAuto`` buckets."""
+    buckets = sorted(buckets, key=lambda bucket: bucket["_id"]["min"])
+    boundaries = [buckets[0]["_id"]["min"]] + [bucket["_id"]["max"] for bucket in buckets]
+    ranks = np.concatenate([[0], np.cumsum([bucket["count"] for bucket in buckets])])
+    return np.interp(QUANTILE_LEVELS * count, ranks, boundaries).tolist()
+
+
+def _histogram_counts(buckets: List[Dict[str, Any]], edges: np.ndarray) -> List[int]:
+    counts = np.zeros(len(edges) + 2, dtype=np.int64)
+    lower_bounds = np.concatenate([[-np.inf], edges])
+    for bucket in buckets:
+        if bucket["_id"] == "missing":
+            counts[-1] += bucket["count"]
+        else:
+            counts[int(np.searchsorted(lower_bounds, bucket["_id"]))] += bucket["count"]
+    return counts.tolist()
+
+
+def _run_facets(collection, query: Dict[str, Any], facets: Dict[str, Any]) -> Dict[str, Any]:
+    pipeline = [{"$match": query}, {"$facet": facets}]
+    return next(collection.aggregate(pipeline, allowDiskUse=True))
+
+
+def profile_collection_server_side(
+    collection_name: str,
+    query: Optional[Dict[str, Any]],
+    numeric_features: List[str],
+    categorical_features: List[str],
+    reference: Optional[Dict[str, Any]] = None,
+    use_percentile: Optional[bool] = None,
+    database_name: str = DATABASE_NAME,
+) -> Dict[str, Any]:
+    """
+    Profile a MongoDB query with aggregation pushdown.
+
+    Args:
+        reference: Reference profile whose layout the histograms follow.
+        use_percentile: Force (True) or disable (False) ``$percentile``;
+            None tries it and falls back to ``$bucketAuto`` if the server
+            rejects it.
+    """
+    if query is None:
+        query = {}
+
+    collection = MongoDBClient(database_name=database_name).get_collection(collection_name)
+    layout = {} if reference is None else {
+        bins.name: bins for bins in layout_from_profile(reference)
+    }
+
+    def build_facets(percentile: bool) -> Dict[str, Any]:
+        facets: Dict[str, Any] = {"__rows": [{"$count": "n"}]}
+        for feature in numeric_features:
+            edges = layout[feature].edges if feature in layout else None
+            facets.update(_numeric_facets(feature, edges, percentile))
+        for feature in categorical_features:
+            facets[f"{feature}__frequencies"] = [{"$sortByCount": _field(feature)}]
+        return facets
+
+    if use_percentile is None or use_percentile:
+        try:
+            result = _run_facets(collection, query, build_facets(percentile=True))
+            use_percentile = True
+        except pymongo.errors.OperationFailure as exc:
+            if use_percentile:
+                raise
+            logger.info(f"$percentile unavailable ({exc.code}); falling back to $bucketAuto")
+            use_percentile = False
+
+    if not use_percentile:
+        result = _run_facets(collection, query, build_facets(percentile=False))
+
+    rows = result["__rows"][0]["n"] if result["__rows"] else 0
+    profile: Dict[str, Any] = {
+        "n_rows": int(rows),
+        "quantile_levels": QUANTILE_LEVELS.tolist(),
+        "numeric": {},
+        "categorical": {},
+        "histograms": {},
+    }
+
+    for feature in numeric_features:
+        summary = result[f"{feature}__summary"]
+        if not summary:
+            profile["numeric"][feature] = {
+                "count": 0, "mean": None, "var": None,
+                "min": None, "max": None, "quantiles": None,
+            }
+            continue
+
+        summary = summary[0]
+        count = int(summary["count"])
+        if use_percentile:
+            quantiles = [float(value) for value in summary["quantiles"]]
+        else:
+            quantiles = _quantiles_from_buckets(result[f"{feature}__buckets"], count)
+        # The extremes are exact.
+        quantiles[0], quantiles[-1] = float(summary["min"]), float(summary["max"])
+
+        std = summary["std"]
+        profile["numeric"][feature] = {
+            "count": count,
+            "mean": float(summary["mean"]),
+            "var": float(std) ** 2 if std is not None else 0.0,
+            "min": float(summary["min"]),
+            "max": float(summary["max"]),
+            "quantiles": quantiles,
+        }
+        if feature in layout:
+            profile["histograms"][feature] = _histogram_counts(
+                result[f"{feature}__histogram"], layout[feature].edges
+            )
+
+    for feature in categorical_features:
+        frequencies: Dict[str, int] = {}
+        missing = 0
+        for entry in result[f"{feature}__frequencies"]:
+            if entry["_id"] is None:
+                missing += int(entry["count"])
+                continue
+            key = category_key(entry["_id"])
+            frequencies[key] = frequencies.get(key, 0) + int(entry["count"])
+        profile["categorical"][feature] = {
+            "count": int(sum(frequencies.values())),
+            "frequencies": frequencies,
+        }
+
+        if feature in layout:
+            categories = layout[feature].categories
+            counts = [frequencies.get(category, 0) for category in categories]
+            unseen = sum(frequencies.values()) - sum(counts)
+            profile["histograms"][feature] = counts + [unseen, missing]
+
+    logger.info(
+        f"Server-side profile of collection='{collection_name}' with query={query} "
+        f"| rows={rows} | percentile={'$percentile' if use_percentile else '$bucketAuto'}"
+    )
+    return profile
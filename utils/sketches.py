@@ -0,0 +1,178 @@
+# Mergeable streaming summaries for numeric features.
+# Used to profile data chunk by chunk with memory independent of row count.
+
+"""Running moments and a KLL quantile sketch, both mergeable across workers.
+
+Error bounds relative to the exact pandas computation:
+
+* ``RunningMoments`` is exact up to floating-point rounding: count, min and
+  max are exact, and mean/variance use Chan et al.'s pairwise update, whose
+  relative error is on the order of 1e-12 for this data.
+* ``KLLSketch`` (Karnin, Lang & Liberty, 2016) answers quantiles with a
+  bounded *rank* error. While fewer than ``k`` values have been seen, no
+  compaction happens and ``quantiles`` equals ``numpy.quantile`` (and so
+  ``Series.quantile``) exactly. After that, the returned value for level
+  ``q`` lies between the exact quantiles at ``q - eps`` and ``q + eps``,
+  where eps is roughly 1.7 / k with high probability (about 0.9% for the
+  default ``k=200``). The error in value units depends on the data density
+  around ``q``. ``benchmarks/bench_streaming_profile.py`` measures the
+  observed error against pandas.
+"""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_SKETCH_K = 200
+
+
+class RunningMoments:
+    """
+    Count, mean, variance, min and max over a stream of values.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+
+        chunk = RunningMoments()
+        chunk.count = int(values.size)
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(np.square(values - chunk.mean).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """Combine with another summary in place (Chan et al. parallel update)."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (ddof=1), matching ``Series.var``."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch.
+
+    Values are kept in a hierarchy of compactors; level ``h`` holds items of
+    weight ``2**h``. When the sketch exceeds its total capacity, the lowest
+    full level is sorted and every other item (random offset) is promoted to
+    the next level. Memory is O(k) items regardless of stream length.
+    """
+
+    def __init__(self, k: int = DEFAULT_SKETCH_K, seed: Optional[int] = None):
+        if k < 8:
+            raise ValueError(f"k must be at least 8, got {k}")
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+
+        self.n += int(values.size)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Combine with another sketch in place."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self) -> None:
+        # Lazy compaction: only when the whole sketch is over budget, and then
+        # only the lowest level that is over its own capacity.
+        while self.size > sum(self._capacity(level) for level in range(len(self.levels))):
+            level = next(
+                level for level in range(len(self.levels))
+                if len(self.levels[level]) >= self._capacity(level)
+            )
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+
+            items = np.sort(self.levels[level])
+            # An odd item stays behind so total weight is preserved exactly.
+            keep, items = items[: len(items) % 2], items[len(items) % 2:]
+            promoted = items[self._rng.integers(2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def quantiles(self, levels: Sequence[float]) -> np.ndarray:
+        """
+        Approximate quantiles at ``levels`` (linear interpolation on the
+        weighted ranks, identical to ``numpy.quantile`` before compaction).
+        """
+        if self.n == 0:
+            return np.full(len(levels), np.nan)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(level_items), 2.0 ** level)
+            for level, level_items in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind="mergesort")
+        items, weights = items[order], weights[order]
+
+        if self.n == 1:
+            return np.full(len(levels), items[0])
+
+        # Centre rank of each item, scaled like numpy's "linear" method.
+        positions = (np.cumsum(weights) - (weights + 1.0) / 2.0) / (self.n - 1)
+        return np.interp(np.asarray(levels, dtype=np.float64), positions, items)
+
+    def histogram(self, edges: np.ndarray) -> np.ndarray:
+        """
+        Approximate counts in the bins ``(-inf, e0), [e0, e1), ..., [e_last, inf)``
+        (exact before compaction; total weight is always exactly ``n``).
+        """
+        counts = np.zeros(len(edges) + 1, dtype=np.int64)
+        for level, items in enumerate(self.levels):
+            codes = np.searchsorted(edges, items, side="right")
+            counts += np.bincount(codes, minlength=len(counts)) * (1 << level)
+        return counts
+
+    @property
+    def size(self) -> int:
+        """Number of items currently retained."""
+        return sum(len(items) for items in self.levels)
@@ -0,0 +1,140 @@
+"""
+Local snapshot cache for MongoDB query results.
+
+Query results are stored on disk as uncompressed Arrow IPC files, keyed by
+database, collection, query and projection. Each entry records a cheap
+freshness fingerprint (matching document count plus the maximum ``_id``):
+
+* unchanged fingerprint  -> hit, the snapshot is read back memory-mapped;
+* documents appended     -> refresh, only documents with a larger ``_id``
+                            are fetched and stored as an extra part;
+* anything else          -> miss, the full result is fetched again.
+
+Every read is bounded by the fingerprint's ``max_id``, so documents inserted
+while a snapshot is being read are picked up by the next refresh, once.
+
+In-place updates that keep both the count and the maximum ``_id`` are not
+detected by the fingerprint; clear the cache directory after such updates.
+"""
+
+import os
+import shutil
+import hashlib
+from collections import Counter
+from typing import Any, Callable, ClassVar, Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+from bson import json_util
+
+from utils.disk_cache import META_FILE, DiskCache
+
+
+class SnapshotCache(DiskCache):
+    """
+    Size-bounded, on-disk cache of query results as Arrow snapshots.
+    """
+
+    label: ClassVar[str] = "Snapshot cache"
+    stats: ClassVar[Counter] = Counter(hits=0, misses=0, refreshes=0, evictions=0)
+
+    @staticmethod
+    def make_key(**key_parts: Any) -> str:
+        """Stable hash of everything that identifies a query result."""
+        payload = json_util.dumps(key_parts, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fingerprint: Dict[str, Any],
+        fetch: Callable[[Optional[Any], Optional[Any]], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """
+        Return the cached result for ``key`` or fetch it.
+
+        Args:
+            key: Cache key from ``make_key``.
+            fingerprint: Current ``{"count": int, "max_id": Any}`` of the query.
+            fetch: Called as ``fetch(after_id, max_id)`` and must return only
+                documents with ``after_id < _id <= max_id`` (``after_id`` is
+                None for a full read). Bounding the read by the fingerprint's
+                ``max_id`` keeps documents inserted during the read out of the
+                snapshot, so the next refresh does not append them twice.
+        """
+        entry_dir = self.entry_dir(key)
+        meta = self._read_meta(entry_dir)
+
+        if meta is not None and meta["count"] == fingerprint["count"] \
+                and meta["max_id"] == fingerprint["max_id"]:
+            self.record("hit", key)
+            self.touch(key)
+            return self._load(entry_dir, meta["parts"])
+
+        if meta is not None and meta["max_id"] is not None \
+                and fingerprint["max_id"] is not None \
+                and fingerprint["max_id"] > meta["max_id"] \
+                and fingerprint["count"] > meta["count"]:
+            appended = fetch(meta["max_id"], fingerprint["max_id"])
+            if len(appended) == fingerprint["count"] - meta["count"]:
+                part = f"part-{len(meta['parts']):05d}.arrow"
+                self._write_part(entry_dir, part, appended)
+                meta.update(fingerprint, parts=meta["parts"] + [part])
+                self._write_meta(entry_dir, meta)
+                self.record("refresh", key, f" (+{len(appended)} documents)")
+                self.evict(keep=key)
+                return self._load(entry_dir, meta["parts"])
+            # Count does not add up (deletes or out-of-order _ids): refetch.
+
+        self.record("miss", key)
+        df = fetch(None, fingerprint["max_id"])
+
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        if not df.empty:
+            self._write_part(entry_dir, "part-00000.arrow", df)
+            # The fetched rows, not the earlier count, describe the snapshot.
+            meta = dict(fingerprint, count=len(df), parts=["part-00000.arrow"])
+            self._write_meta(entry_dir, meta)
+            self.evict(keep=key)
+        return df
+
+    def _load(self, entry_dir: str, parts: List[str]) -> pd.DataFrame:
+        tables = []
+        for part in parts:
+            with pa.memory_map(os.path.join(entry_dir, part), "r") as source:
+                tables.append(pa.ipc.open_file(source).read_all())
+        table = pa.concat_tables(tables, promote_options="permissive")
+        return table.to_pandas(split_blocks=True)
+
+    @staticmethod
+    def _write_part(entry_dir: str, part: str, df: pd.DataFrame) -> None:
+        os.makedirs(entry_dir, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        tmp_path = os.path.join(entry_dir, part + ".tmp")
+        # Uncompressed IPC so the file can be memory-mapped on read.
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, os.path.join(entry_dir, part))
+
+    @staticmethod
+    def _read_meta(entry_dir: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(entry_dir, META_FILE)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                meta = json_util.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        parts_present = all(
+            os.path.exists(os.path.join(entry_dir, part)) for part in meta["parts"]
+        )
+        return meta if parts_present else None
+
+    @staticmethod
+    def _write_meta(entry_dir: str, meta: Dict[str, Any]) -> None:
+        tmp_path = os.path.join(entry_dir, META_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            f.write(json_util.dumps(meta))
+        os.replace(tmp_path, os.path.join(entry_dir, META_FILE))
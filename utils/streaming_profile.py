@@ -0,0 +1,228 @@
+# Streaming, bounded-memory data profiling.
+# Builds the same profile as profile_utils.build_profile from a chunked source.
+
+"""Profiles data chunk by chunk with mergeable sketches, optionally in parallel."""
+
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from constant import DATABASE_NAME
+from utils.db_utils import MongoDBClient, build_projection
+from utils.drift_engine import histograms, layout_from_profile
+from utils.profile_utils import QUANTILE_LEVELS, category_key
+from utils.sketches import DEFAULT_SKETCH_K, KLLSketch, RunningMoments
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class StreamingProfiler:
+    """
+    Mergeable profile accumulator.
+
+    Numeric features keep ``RunningMoments`` and a ``KLLSketch``;
+    categorical features keep a frequency counter. When a ``reference``
+    profile is given, bin counts on its layout are accumulated as well
+    (exactly, since counts simply add up). Without one, the profile is
+    itself a reference: its histograms are binned on its own layout (as in
+    ``build_profile``), categorical counts from the counters and numeric
+    counts from the KLL sketches, exact until the first compaction and
+    within the sketch's rank error after it. Memory does not grow with the
+    number of rows seen.
+    """
+
+    def __init__(
+        self,
+        numeric_features: List[str],
+        categorical_features: List[str],
+        sketch_k: int = DEFAULT_SKETCH_K,
+        seed: Optional[int] = None,
+        reference: Optional[Dict[str, Any]] = None,
+    ):
+        self.n_rows = 0
+        self.moments = {feature: RunningMoments() for feature in numeric_features}
+        self.sketches = {
+            feature: KLLSketch(k=sketch_k, seed=None if seed is None else seed + i)
+            for i, feature in enumerate(numeric_features)
+        }
+        self.frequencies = {feature: Counter() for feature in categorical_features}
+        # Rows of chunks holding each feature; the rest of them are missing values.
+        self.rows_seen = Counter()
+
+        self.reference = reference
+        features = set(numeric_features) | set(categorical_features)
+        self.layout = [] if reference is None else [
+            bins for bins in layout_from_profile(reference) if bins.name in features
+        ]
+        self.bin_counts = histograms(pd.DataFrame(), self.layout)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add one chunk of rows; features missing from the chunk are skipped."""
+        self.n_rows += len(chunk)
+        for feature in (*self.moments, *self.frequencies):
+            if feature in chunk.columns:
+                self.rows_seen[feature] += len(chunk)
+
+        for feature in self.moments:
+            if feature not in chunk.columns:
+                continue
+            values = chunk[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+            self.moments[feature].update(values)
+            self.sketches[feature].update(values)
+
+        for feature, counter in self.frequencies.items():
+            if feature not in chunk.columns:
+                continue
+            for value, count in chunk[feature].dropna().value_counts(sort=False).items():
+                if count:
+                    counter[category_key(value)] += int(count)
+
+        if self.layout:
+            self.bin_counts += histograms(chunk, self.layout)
+
+    def merge(self, other: "StreamingProfiler") -> "StreamingProfiler":
+        """Combine with a profiler built over a disjoint part of the data."""
+        self.n_rows += other.n_rows
+        self.rows_seen.update(other.rows_seen)
+        for feature, moments in other.moments.items():
+            self.moments[feature].merge(moments)
+            self.sketches[feature].merge(other.sketches[feature])
+        for feature, counter in other.frequencies.items():
+            self.frequencies[feature].update(counter)
+        self.bin_counts += other.bin_counts
+        return self
+
+    def to_profile(self) -> Dict[str, Any]:
+        """Finalize into the ``profile_utils.build_profile`` format."""
+        numeric = {}
+        for feature, moments in self.moments.items():
+            if moments.count == 0:
+                numeric[feature] = {
+                    "count": 0, "mean": None, "var": None,
+                    "min": None, "max": None, "quantiles": None,
+                }
+                continue
+
+            quantiles = self.sketches[feature].quantiles(QUANTILE_LEVELS)
+            # The extremes are tracked exactly.
+            quantiles[0], quantiles[-1] = moments.min, moments.max
+            numeric[feature] = {
+                "count": moments.count,
+                "mean": moments.mean,
+                "var": moments.variance,
+                "min": moments.min,
+                "max": moments.max,
+                "quantiles": quantiles.tolist(),
+            }
+
+        categorical = {
+            feature: {"count": int(sum(counter.values())), "frequencies": dict(counter)}
+            for feature, counter in self.frequencies.items()
+        }
+
+        profile = {
+            "n_rows": int(self.n_rows),
+            "quantile_levels": QUANTILE_LEVELS.tolist(),
+            "numeric": numeric,
+            "categorical": categorical,
+        }
+        if self.reference is None:
+            profile["histograms"] = self._own_histograms(profile)
+        else:
+            profile["histograms"] = {
+                bins.name: self.bin_counts[i, :bins.n_bins].tolist()
+                for i, bins in enumerate(self.layout)
+            }
+        return profile
+
+    def _own_histograms(self, profile: Dict[str, Any]) -> Dict[str, List[int]]:
+        """Bin counts on the layout of ``profile`` itself, from the sketches and counters."""
+        counts = {}
+        for bins in layout_from_profile(profile):
+            if not self.rows_seen[bins.name]:
+                continue
+            if bins.kind == "numeric":
+                sketch = self.sketches[bins.name]
+                observed = sketch.histogram(bins.edges).tolist()
+                missing = self.rows_seen[bins.name] - sketch.n
+            else:
+                counter = self.frequencies[bins.name]
+                observed = [counter[category] for category in bins.categories] + [0]
+                missing = self.rows_seen[bins.name] - sum(counter.values())
+            counts[bins.name] = [int(count) for count in observed] + [int(missing)]
+        return counts
+
+
+def profile_chunks(
+    chunks: Iterable[pd.DataFrame],
+    numeric_features: List[str],
+    categorical_features: List[str],
+    sketch_k: int = DEFAULT_SKETCH_K,
+    seed: Optional[int] = None,
+    reference: Optional[Dict[str, Any]] = None,
+) -> StreamingProfiler:
+    """Feed an iterable of DataFrame chunks through a new ``StreamingProfiler``."""
+    profiler = StreamingProfiler(numeric_features, categorical_features, sketch_k, seed, reference)
+    for chunk in chunks:
+        profiler.update(chunk)
+    return profiler
+
+
+def profile_collection(
+    collection_name: str,
+    query: Optional[Dict[str, Any]],
+    numeric_features: List[str],
+    categorical_features: List[str],
+    batch_size: int = 50_000,
+    n_workers: int = 1,
+    partition_key: str = "id",
+    sketch_k: int = DEFAULT_SKETCH_K,
+    database_name: str = DATABASE_NAME,
+    reference: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Profile a MongoDB query without materializing it.
+
+    Each worker streams one ``partition_key`` range into its own profiler;
+    the partial profilers are merged at the end. Peak memory is roughly
+    ``n_workers * batch_size`` rows plus the fixed-size sketches.
+    """
+    if query is None:
+        query = {}
+
+    mongo_client = MongoDBClient(database_name=database_name)
+    columns = list(numeric_features) + list(categorical_features)
+
+    partitions = [query]
+    if n_workers > 1:
+        partitions = mongo_client.partition_queries(
+            collection_name, query, partition_key, n_workers
+        )
+
+    logger.info(
+        f"Streaming profile of collection='{collection_name}' with query={query} "
+        f"| projection={build_projection(columns)} | partitions={len(partitions)}"
+    )
+
+    def profile_partition(index: int) -> StreamingProfiler:
+        chunks = mongo_client.iter_dataframes(
+            collection_name, partitions[index], columns=columns, batch_size=batch_size
+        )
+        return profile_chunks(
+            chunks, numeric_features, categorical_features, sketch_k,
+            seed=index, reference=reference,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, n_workers)) as executor:
+        partials = list(executor.map(profile_partition, range(len(partitions))))
+
+    profiler = partials[0]
+    for partial in partials[1:]:
+        profiler.merge(partial)
+
+    return profiler.to_profile()
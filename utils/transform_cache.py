@@ -0,0 +1,144 @@
+"""
+Local cache of fitted preprocessors and the arrays they produced.
+
+``ingest_data`` is never cached by ZenML, so every run hands
+``data_transformation`` new artifacts, even when their content is
+unchanged. This cache is keyed by content instead: ``frame_fingerprint``
+hashes the column names, dtypes and raw value buffers of each split
+(numeric columns and categorical codes are hashed directly from memory,
+other columns through ``pd.util.hash_pandas_object``). ``make_key``
+combines these fingerprints with the transformation parameters and the
+scikit-learn version.
+
+Each entry is a directory holding the preprocessor (joblib), one ``.npy``
+file per array and a ``meta.json``. A hit loads the arrays memory-mapped.
+Entries are evicted least recently used first once the cache exceeds
+``max_bytes``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from collections import Counter
+from typing import Any, Callable, ClassVar, Dict, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+from utils.disk_cache import META_FILE, DiskCache
+from utils.mmap_io import load_array, save_array
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+PREPROCESSOR_FILE = "preprocessor.joblib"
+# Bump when the step's output for identical inputs changes.
+CACHE_FORMAT_VERSION = 1
+
+
+def frame_fingerprint(data: Any) -> str:
+    """Content hash of a DataFrame, Series or array (values and dtypes; index ignored)."""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(data, np.ndarray):
+        digest.update(f"{data.dtype.str}{data.shape}".encode())
+        digest.update(np.ascontiguousarray(data).view(np.uint8))
+        return digest.hexdigest()
+
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    digest.update(repr(len(frame)).encode())
+    for column in frame.columns:
+        series = frame[column]
+        digest.update(f"{column!r}:{series.dtype}".encode())
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            digest.update(repr(series.cat.categories.tolist()).encode())
+            digest.update(np.ascontiguousarray(series.cat.codes.to_numpy()).view(np.uint8))
+        elif series.dtype.kind in "biuf":
+            digest.update(np.ascontiguousarray(series.to_numpy()).view(np.uint8))
+        else:
+            digest.update(pd.util.hash_pandas_object(series, index=False).to_numpy().view(np.uint8))
+    return digest.hexdigest()
+
+
+class TransformCache(DiskCache):
+    """
+    Size-bounded, on-disk cache of ``(preprocessor, arrays)`` results.
+    """
+
+    label: ClassVar[str] = "Transform cache"
+    stats: ClassVar[Counter] = Counter(hits=0, misses=0, evictions=0)
+
+    @staticmethod
+    def make_key(fingerprints: Dict[str, str], params: Dict[str, Any]) -> str:
+        """Stable hash of the input fingerprints, parameters and library version."""
+        payload = json.dumps(
+            {
+                "fingerprints": fingerprints,
+                "params": params,
+                "sklearn": sklearn.__version__,
+                "format": CACHE_FORMAT_VERSION,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Tuple[Any, Dict[str, np.ndarray]]],
+    ) -> Tuple[Any, Dict[str, np.ndarray], bool]:
+        """
+        Return the cached ``(preprocessor, arrays)`` for ``key`` or compute
+        and store them.
+
+        Args:
+            key: Cache key from ``make_key``.
+            compute: Returns ``(preprocessor, {name: array})``.
+
+        Returns:
+            ``(preprocessor, arrays, hit)``.
+        """
+        entry_dir = self.entry_dir(key)
+        cached = self._load(entry_dir)
+        if cached is not None:
+            self.record("hit", key)
+            self.touch(key)
+            return cached[0], cached[1], True
+
+        self.record("miss", key)
+        preprocessor, arrays = compute()
+        self._store(key, preprocessor, arrays)
+        self.evict(keep=key)
+        return preprocessor, arrays, False
+
+    @staticmethod
+    def _load(entry_dir: str) -> Optional[Tuple[Any, Dict[str, np.ndarray]]]:
+        meta_path = os.path.join(entry_dir, META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            preprocessor = joblib.load(os.path.join(entry_dir, PREPROCESSOR_FILE))
+            arrays = {name: load_array(os.path.join(entry_dir, f"{name}.npy")) for name in meta["arrays"]}
+        except Exception as e:
+            logger.warning(f"Discarding unreadable transform cache entry {entry_dir}: {e}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        return preprocessor, arrays
+
+    def _store(self, key: str, preprocessor: Any, arrays: Dict[str, np.ndarray]) -> None:
+        # Written in a private staging directory and renamed, so readers never see a partial entry.
+        tmp_dir = self.staging_dir(key)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        joblib.dump(preprocessor, os.path.join(tmp_dir, PREPROCESSOR_FILE))
+        for name, array in arrays.items():
+            with open(os.path.join(tmp_dir, f"{name}.npy"), "wb") as f:
+                save_array(np.asarray(array), f)
+        with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+            json.dump({"arrays": list(arrays)}, f)
+        self.publish(tmp_dir, key)
@@ -0,0 +1,235 @@
+"""
+Successive-halving search over RandomForest and resampling settings.
+
+The training rows are split once into a stratified fit/validation pair
+and written as ``.npy`` files to a work directory. Every distinct
+resampling setting among the candidates (imbalance strategy and its
+neighbour counts) is applied once, in parallel, and its output is
+written there as well. Worker processes open all of these with
+``mmap_mode="r"``, so however many workers and candidates there are,
+the arrays exist once, in the page cache.
+
+The budget is the number of trees. The first rung fits every candidate
+with ``min_trees`` trees and scores ROC-AUC on the validation split; only
+the best ``1/eta`` of them go on to the next rung with ``eta`` times as
+many trees, up to ``max_trees``. An optional wall-clock budget stops the
+search after the rung that exceeds it, and the best candidate of the
+highest finished rung wins.
+"""
+
+import itertools
+import logging
+import math
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from threadpoolctl import threadpool_limits
+
+from utils.evaluation_engine import threshold_sweep
+from utils.imbalance import rebalance
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Settings that change the resampled training set; candidates sharing them
+# share one resampled copy.
+RESAMPLING_FIELDS = (
+    "imbalance_strategy",
+    "sampling_strategy",
+    "smote_k_neighbors",
+    "enn_n_neighbors",
+    "subsample_rows",
+    "undersampling_ratio",
+    "class_weight",
+)
+FOREST_FIELDS = ("max_depth", "min_samples_leaf", "max_features")
+
+DEFAULT_SEARCH_SPACE: Dict[str, List[Any]] = {
+    "max_depth": [None, 12, 24],
+    "min_samples_leaf": [1, 3, 10],
+    "max_features": ["sqrt", 0.5],
+    "imbalance_strategy": ["smoteenn", "smoteenn_subsample", "undersample", "class_weight"],
+}
+
+_worker_limits = None
+_mapped: Dict[str, np.ndarray] = {}
+
+
+def _init_worker() -> None:
+    # Parallelism comes from the pool; keep every worker's BLAS single-threaded.
+    global _worker_limits
+    _worker_limits = threadpool_limits(limits=1, user_api="blas")
+
+
+def _mapped_array(path: str) -> np.ndarray:
+    if path not in _mapped:
+        _mapped[path] = np.load(path, mmap_mode="r")
+    return _mapped[path]
+
+
+def _resampling_key(config: Dict[str, Any]) -> Tuple:
+    return tuple(config[name] for name in RESAMPLING_FIELDS)
+
+
+def _resample_task(work_dir: str, key_index: int, config: Dict[str, Any], random_state: int) -> Tuple[int, Optional[str], int, float]:
+    start = time.perf_counter()
+    X_fit = _mapped_array(os.path.join(work_dir, "X_fit.npy"))
+    y_fit = _mapped_array(os.path.join(work_dir, "y_fit.npy"))
+    X_res, y_res, class_weight = rebalance(
+        np.asarray(X_fit),
+        np.asarray(y_fit),
+        strategy=config["imbalance_strategy"],
+        sampling_strategy=config["sampling_strategy"],
+        random_state=random_state,
+        k_neighbors=config["smote_k_neighbors"],
+        enn_n_neighbors=config["enn_n_neighbors"],
+        subsample_rows=config["subsample_rows"],
+        undersampling_ratio=config["undersampling_ratio"],
+        class_weight=config["class_weight"],
+        n_jobs=1,
+    )
+    np.save(os.path.join(work_dir, f"X_res_{key_index}.npy"), X_res)
+    np.save(os.path.join(work_dir, f"y_res_{key_index}.npy"), y_res)
+    return key_index, class_weight, len(y_res), time.perf_counter() - start
+
+
+def _evaluate_task(
+    work_dir: str, key_index: int, forest: Dict[str, Any], class_weight: Optional[str], n_trees: int, random_state: int
+) -> Tuple[float, float]:
+    start = time.perf_counter()
+    X_res = _mapped_array(os.path.join(work_dir, f"X_res_{key_index}.npy"))
+    y_res = _mapped_array(os.path.join(work_dir, f"y_res_{key_index}.npy"))
+    X_val = _mapped_array(os.path.join(work_dir, "X_val.npy"))
+    y_val = _mapped_array(os.path.join(work_dir, "y_val.npy"))
+
+    model = RandomForestClassifier(
+        n_estimators=n_trees, random_state=random_state, class_weight=class_weight, n_jobs=1, **forest
+    )
+    model.fit(X_res, y_res)
+    score = model.predict_proba(X_val)[:, 1]
+    roc_auc = threshold_sweep(np.asarray(y_val) == model.classes_[1], score)["roc_auc"]
+    return roc_auc, time.perf_counter() - start
+
+
+def sample_candidates(search_space: Dict[str, List[Any]], n_candidates: int, random_state: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Up to ``n_candidates`` distinct settings drawn from the grid ``search_space``."""
+    names = sorted(search_space)
+    grid = list(itertools.product(*(search_space[name] for name in names)))
+    if len(grid) > n_candidates:
+        rng = np.random.default_rng(random_state)
+        grid = [grid[i] for i in sorted(rng.choice(len(grid), size=n_candidates, replace=False))]
+    return [dict(zip(names, values)) for values in grid]
+
+
+def successive_halving(
+    X: np.ndarray,
+    y: np.ndarray,
+    base_config: Dict[str, Any],
+    search_space: Dict[str, List[Any]] = DEFAULT_SEARCH_SPACE,
+    n_candidates: int = 16,
+    min_trees: int = 25,
+    max_trees: int = 200,
+    eta: int = 3,
+    n_workers: int = 1,
+    time_budget_seconds: Optional[float] = None,
+    validation_fraction: float = 0.2,
+    random_state: int = 42,
+    work_dir: Optional[str] = None,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Search ``search_space`` (settings overriding ``base_config``) with
+    successive halving on ``n_workers`` processes.
+
+    Returns:
+        ``(best_settings, leaderboard)``; the leaderboard has one entry per
+        (candidate, rung) evaluation with its tree count, validation
+        ROC-AUC and fit seconds.
+    """
+    unknown = set(search_space) - set(RESAMPLING_FIELDS) - set(FOREST_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot tune {sorted(unknown)}; tunable settings are {RESAMPLING_FIELDS + FOREST_FIELDS}")
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+
+    started = time.perf_counter()
+    candidates = sample_candidates(search_space, n_candidates, random_state)
+    configs = [dict(base_config, **candidate) for candidate in candidates]
+    logger.info(f"Tuning {len(candidates)} candidates on {n_workers} workers, {min_trees} -> {max_trees} trees, eta={eta}")
+
+    work_dir = tempfile.mkdtemp(prefix="tuning-", dir=work_dir)
+    try:
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X, y, test_size=validation_fraction, stratify=y, random_state=random_state
+        )
+        for name, array in (("X_fit", X_fit), ("y_fit", y_fit), ("X_val", X_val), ("y_val", y_val)):
+            np.save(os.path.join(work_dir, f"{name}.npy"), array)
+        del X_fit, X_val, y_fit, y_val
+
+        keys = sorted({_resampling_key(config) for config in configs}, key=repr)
+        key_index = {key: i for i, key in enumerate(keys)}
+        class_weights: Dict[int, Optional[str]] = {}
+
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker) as pool:
+            representatives = {key_index[_resampling_key(config)]: config for config in configs}
+            futures = [
+                pool.submit(_resample_task, work_dir, index, config, random_state)
+                for index, config in representatives.items()
+            ]
+            for future in futures:
+                index, class_weight, n_rows, seconds = future.result()
+                class_weights[index] = class_weight
+                logger.info(f"Resampling set {index} ({keys[index][0]}): {n_rows} rows in {seconds:.1f}s")
+
+            leaderboard: List[Dict[str, Any]] = []
+            survivors = list(range(len(configs)))
+            n_trees = min(min_trees, max_trees)
+            rung = 0
+            best = survivors[0]
+            while True:
+                futures = {
+                    i: pool.submit(
+                        _evaluate_task,
+                        work_dir,
+                        key_index[_resampling_key(configs[i])],
+                        {name: configs[i][name] for name in FOREST_FIELDS},
+                        class_weights[key_index[_resampling_key(configs[i])]],
+                        n_trees,
+                        random_state,
+                    )
+                    for i in survivors
+                }
+                scores = {}
+                for i, future in futures.items():
+                    roc_auc, seconds = future.result()
+                    scores[i] = roc_auc
+                    leaderboard.append(dict(candidates[i], candidate=i, rung=rung, n_trees=n_trees,
+                                            roc_auc=roc_auc, fit_seconds=seconds))
+
+                survivors = sorted(survivors, key=lambda i: scores[i], reverse=True)
+                best = survivors[0]
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"Rung {rung}: {len(scores)} candidates x {n_trees} trees | best ROC-AUC "
+                    f"{scores[best]:.5f} ({candidates[best]}) | {elapsed:.0f}s"
+                )
+
+                if len(survivors) == 1 or n_trees >= max_trees:
+                    break
+                if time_budget_seconds is not None and elapsed >= time_budget_seconds:
+                    logger.info(f"Time budget of {time_budget_seconds:.0f}s reached after rung {rung}")
+                    break
+                survivors = survivors[:max(1, math.ceil(len(survivors) / eta))]
+                n_trees = min(n_trees * eta, max_trees)
+                rung += 1
+    finally:
+        _mapped.clear()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return dict(candidates[best]), leaderboard